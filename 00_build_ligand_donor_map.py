@@ -1,30 +1,15 @@
-import pandas as pd
+# ==========================================================
+# 00_build_ligand_donor_map.py
+# CLI wrapper: opt_D.csv -> ligand_donor_modes.npz
+# ==========================================================
 
-df = pd.read_csv("opt_D.csv")
+from engine.artifacts import read_table
+from engine.paths import DONOR_MODES_NPZ
+from engine.seeding import donor_map_stage
 
-ligand_modes = {}
+# compiled once per opt_D.csv version (engine/stage_cache.py)
+cached = donor_map_stage(DONOR_MODES_NPZ)
+out = read_table(DONOR_MODES_NPZ)
 
-for _, row in df.iterrows():
-    for i in range(1, 7):
-        lig = row.get(f"L{i}")
-        d   = row.get(f"D{i}")
-
-        if not isinstance(lig, str):
-            continue
-        if lig == "X":
-            continue
-        if pd.isna(d):
-            continue
-
-        ligand_modes.setdefault(lig, set()).add(int(d))
-
-rows = []
-for lig, modes in ligand_modes.items():
-    for m in modes:
-        rows.append({"smiles": lig, "donors": m})
-
-out = pd.DataFrame(rows)
-out.to_csv("ligand_donor_modes.csv", index=False)
-
-print("[INFO] ligand_donor_modes.csv created")
+print(f"[INFO] {DONOR_MODES_NPZ} {'restored' if cached else 'created'}")
 print(out.groupby("donors").size())
@@ -0,0 +1,15 @@
+# ==========================================================
+# 00_compile_databases.py
+# CLI wrapper: GA.csv / opt_D.csv -> .db_snapshots/
+# (readers also rebuild them on their own when a CSV changes)
+# ==========================================================
+
+from engine.db_snapshot import build_snapshot
+from engine.modes import MODE_CONFIG
+
+for mode in MODE_CONFIG:
+    snap = build_snapshot(mode, force=True)
+    print(
+        f"[INFO] {snap.name}: {len(snap.table)} complexes, "
+        f"{len(snap.donor_modes)} donor modes"
+    )
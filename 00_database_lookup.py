@@ -4,18 +4,15 @@
 # ==========================================================
 
 import os
-import pandas as pd
+
+from engine.database_lookup import load_database
+from engine.modes import mode_config
 
 MODE = os.environ.get("MODE", "crystal")
 
-if MODE == "crystal":
-    CSV_FILE = "GA.csv"
-    ZFS_COL = "zfs"
-else:
-    CSV_FILE = "opt_D.csv"
-    ZFS_COL = "opt_zfs"
+CSV_FILE = mode_config(MODE)["database"]
 
-df = pd.read_csv(CSV_FILE)
+df, ZFS_COL = load_database(MODE)
 df.to_csv("working_database.csv", index=False)
 
 print(f"[INFO] Loaded database: {CSV_FILE}")
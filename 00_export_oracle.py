@@ -0,0 +1,48 @@
+# ==========================================================
+# 00_export_oracle.py
+# Export the GNN checkpoints for CPU inference
+#
+#   python 00_export_oracle.py [--int8] [--rows N]
+#
+# Writes .oracle_export/<checkpoint>.<fp32|int8>.pt and reports
+# the accuracy of the exported models against the float32
+# checkpoints on the GA.csv / opt_D.csv rows. Use them with
+#   ORACLE_EXPORT=fp32 (or int8)
+# ==========================================================
+
+import argparse
+import os
+
+import pandas as pd
+
+from engine.export import EXPORT_DIR, accuracy_report
+from engine.modes import MODE_CONFIG
+from engine.oracle import checkpoint_specs, load_exported_checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--int8", action="store_true",
+                        help="dynamic int8 quantization of the linear layers")
+    parser.add_argument("--rows", type=int, default=0,
+                        help="database rows per MODE in the report (0 = all)")
+    args = parser.parse_args()
+    kind = "int8" if args.int8 else "fp32"
+
+    for mode in MODE_CONFIG:
+        for _, model, scaler in checkpoint_specs(mode):
+            load_exported_checkpoint(model, scaler, kind)
+
+    report = pd.concat(
+        [accuracy_report(mode, kind, args.rows) for mode in MODE_CONFIG],
+        ignore_index=True
+    )
+    path = os.path.join(EXPORT_DIR, f"accuracy_{kind}.csv")
+    report.to_csv(path, index=False)
+
+    print(report.to_string(index=False))
+    print(f"[INFO] Accuracy report saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
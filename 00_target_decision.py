@@ -6,7 +6,10 @@
 
 import os
 import sys
-import pandas as pd
+
+from engine import load_index
+from engine.modes import mode_config, normalize_mode
+from engine.target_decision import HIT_TOL
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -14,50 +17,18 @@ if len(sys.argv) < 2:
     sys.exit(2)
 
 TARGET_ZFS = float(sys.argv[1])
-MODE = os.environ.get("MODE", "X-ray")
-
-if MODE == "X-ray":
-    CSV_FILE = os.path.join(BASE_DIR, "GA.csv")
-    ZFS_COL = "zfs"
-
-elif MODE == "DFT":
-    CSV_FILE = os.path.join(BASE_DIR, "opt_D.csv")
-    ZFS_COL = "opt_zfs"
+MODE = normalize_mode(os.environ.get("MODE", "X-ray"))
 
-else:
-    raise ValueError(f"Unknown MODE: {MODE}")
-
-TOL = 10.0
+TOL = HIT_TOL
 
 print(f"[INFO] MODE = {MODE}")
-print(f"[INFO] DB = {CSV_FILE}")
+print(f"[INFO] DB = {mode_config(MODE)['database']}")
 print(f"[INFO] Target = {TARGET_ZFS}")
 
-df = pd.read_csv(CSV_FILE)
-
-# Ensure numeric ZFS
-df[ZFS_COL] = pd.to_numeric(df[ZFS_COL], errors="coerce")
-df = df.dropna(subset=[ZFS_COL])
-
-# Distance from target
-df["dist"] = (df[ZFS_COL] - TARGET_ZFS).abs()
-
-# Hit within tolerance
-hits = df[df["dist"] <= TOL].copy()
-
-# =========================
-# ⭐ KEEP ONLY NUMERIC FILENAMES
-# =========================
-if "FileName" in hits.columns:
-    hits = hits[
-        hits["FileName"].astype(str).str.fullmatch(r"\d+")
-    ]
-
-# =========================
+# Sorted index, numeric FileNames only
+hits = load_index(MODE).hits(TARGET_ZFS, TOL)
 
 if len(hits) > 0:
-    hits = hits.sort_values("dist").reset_index(drop=True)
-
     hits.to_csv(
         os.path.join(BASE_DIR, "retrieved_solution.csv"),
         index=False
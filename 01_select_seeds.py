@@ -1,39 +1,25 @@
-import pandas as pd
-import os
+# ==========================================================
+# 01_select_seeds.py
+# CLI wrapper: strong negative ZFS seeds -> seed_complexes.npz
+# ==========================================================
 
-# ----------------------------------------------------------
-# Detect mode from Streamlit
-# ----------------------------------------------------------
+import os
 
-mode = os.getenv("MODE", "crystal")
+from engine.artifacts import read_table
+from engine.modes import mode_config, normalize_mode
+from engine.paths import SEED_COMPLEXES_NPZ
+from engine.seeding import seeds_stage
 
 # ----------------------------------------------------------
-# Load correct database
+# Detect mode from Streamlit
 # ----------------------------------------------------------
 
-if mode == "optimized":
-
-    df = pd.read_csv("opt_D.csv")
-    zfs_col = "opt_zfs"
-
-else:  # crystal
-
-    df = pd.read_csv("GA.csv")
-    zfs_col = "zfs"
+mode = normalize_mode(os.getenv("MODE", "crystal"))
 
 print("MODE =", mode)
-print("Database loaded:", "opt_D.csv" if mode=="optimized" else "GA.csv")
-
-# ----------------------------------------------------------
-# Select strong negative ZFS seeds
-# ----------------------------------------------------------
+print("Database:", mode_config(mode)["database"])
 
-seed_df = df[df[zfs_col] <= -120].reset_index(drop=True)
-
-print("Seed complexes:", len(seed_df))
-
-# ----------------------------------------------------------
-# Save seeds
-# ----------------------------------------------------------
+cached = seeds_stage(mode, SEED_COMPLEXES_NPZ)
+seed_df = read_table(SEED_COMPLEXES_NPZ)
 
-seed_df.to_csv("seed_complexes.csv", index=False)
+print(f"Seed complexes: {len(seed_df)}{' (cached)' if cached else ''}")
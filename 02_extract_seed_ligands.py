@@ -1,15 +1,13 @@
-import pandas as pd
+# ==========================================================
+# 02_extract_seed_ligands.py
+# CLI wrapper: seed_complexes.npz -> seed_ligands.npz
+# ==========================================================
 
-df = pd.read_csv("seed_complexes.csv")
+from engine.artifacts import read_table
+from engine.paths import SEED_COMPLEXES_NPZ, SEED_LIGANDS_NPZ
+from engine.seeding import seed_ligands_stage
 
-ligands = set()
-for i in range(1, 7):
-    ligands.update(df[f"L{i}"].dropna().astype(str))
+cached = seed_ligands_stage(SEED_COMPLEXES_NPZ, SEED_LIGANDS_NPZ)
+out = read_table(SEED_LIGANDS_NPZ)
 
-ligands = sorted(ligands)
-
-pd.DataFrame({"smiles": ligands}).to_csv(
-    "seed_ligands.csv", index=False
-)
-
-print("Seed ligands:", len(ligands))
+print(f"Seed ligands: {len(out)}{' (cached)' if cached else ''}")
@@ -5,100 +5,100 @@
 
 import os
 import sys
-import pandas as pd
 
-if len(sys.argv) < 3:
-    print("Usage: python 06_run_until_target.py <TARGET_ZFS> <MODE>")
-    sys.exit(2)
+from engine import load_index
+from engine.campaign import GACampaign
+from engine.paths import RETRIEVED_CSV
 
-TARGET = float(sys.argv[1])
-MODE = sys.argv[2].lower()
 
-if MODE not in ["crystal", "optimized"]:
-    print("❌ MODE must be crystal or optimized")
-    sys.exit(2)
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python 06_run_until_target.py <TARGET_ZFS> <MODE>")
+        sys.exit(2)
 
-os.environ["MODE"] = MODE
-os.environ["TARGET_ZFS"] = str(TARGET)
+    TARGET = float(sys.argv[1])
+    MODE = sys.argv[2].lower()
 
-print(f"[INFO] MODE = {MODE}")
-print(f"[INFO] TARGET ZFS = {TARGET}")
+    if MODE not in ["crystal", "optimized"]:
+        print("❌ MODE must be crystal or optimized")
+        sys.exit(2)
 
-# ----------------------------------------------------------
-# Database lookup
-# ----------------------------------------------------------
-ret = os.system(f"python 00_target_decision.py {TARGET}")
+    os.environ["MODE"] = MODE
+    os.environ["TARGET_ZFS"] = str(TARGET)
 
-if ret == 0:
-    print("\n🎯 Solution retrieved directly from database")
-    print(pd.read_csv("retrieved_solution.csv"))
-    sys.exit(0)
+    print(f"[INFO] MODE = {MODE}")
+    print(f"[INFO] TARGET ZFS = {TARGET}")
 
-print("⚠️ No database match — switching to GA")
+    # ----------------------------------------------------------
+    # Database lookup
+    # ----------------------------------------------------------
+    # sorted index, built once per process (numeric FileNames only)
+    hits = load_index(MODE).hits(TARGET)
 
-# ----------------------------------------------------------
-# GA loop
-# ----------------------------------------------------------
-MAX_GEN = 3000
+    if len(hits) > 0:
+        hits.to_csv(RETRIEVED_CSV, index=False)
+        print("\n🎯 Solution retrieved directly from database")
+        print(hits)
+        sys.exit(0)
 
-for gen in range(1, MAX_GEN + 1):
+    print("⚠️ No database match — switching to GA")
 
-    print(f"\n==============================")
-    print(f"🚀 GENERATION {gen}")
-    print(f"==============================")
+    # ----------------------------------------------------------
+    # GA loop (models / databases loaded once)
+    # ----------------------------------------------------------
+    MAX_GEN = 3000
 
-    os.environ["GA_GEN"] = str(gen)
+    campaign = GACampaign(TARGET, MODE)
 
-    # ------------------------------------------------------
-    # FIRST GENERATION → full pipeline
-    # ------------------------------------------------------
-    if gen == 1:
+    for gen in range(1, MAX_GEN + 1):
 
-        print("🔹 Building donor map")
-        os.system("python 00_build_ligand_donor_map.py")
+        print(f"\n==============================")
+        print(f"🚀 GENERATION {gen}")
+        print(f"==============================")
 
-        print("🔹 Selecting seed complexes")
-        os.system("python 01_select_seeds.py")
+        os.environ["GA_GEN"] = str(gen)
 
-        print("🔹 Extracting seed ligands")
-        os.system("python 02_extract_seed_ligands.py")
+        # ------------------------------------------------------
+        # FIRST GENERATION → full pipeline
+        # ------------------------------------------------------
+        if gen == 1:
+            print("🔹 Building donor map, seeds and seed ligands")
+            campaign.setup()
 
-    # ------------------------------------------------------
-    # ALL GENERATIONS
-    # ------------------------------------------------------
-    print("🔹 Ligand mutation")
-    os.system("python 03_ligand_mutation.py")
+        # ------------------------------------------------------
+        # ALL GENERATIONS
+        # ------------------------------------------------------
+        print("🔹 Ligand mutation")
+        campaign.mutate(gen)
 
-    print("🔹 Building complexes")
-    os.system("python 04_build_complexes.py")
+        print("🔹 Building complexes")
+        campaign.build()
 
-    print("🔹 Oracle screening")
-    ret = os.system("python 05_oracle_screen.py")
+        print("🔹 Oracle screening")
+        try:
+            campaign.screen()
+        except Exception as e:
+            print(f"❌ Oracle failed: {e}")
+            sys.exit(1)
 
-    if ret != 0:
-        print("❌ Oracle failed")
-        sys.exit(1)
+        # ------------------------------------------------------
+        # ELITE CHECK
+        # ------------------------------------------------------
+        if campaign.elite is None or campaign.elite.empty:
+            print("❌ elite_parents.npz is empty → no survivors")
+            sys.exit(1)
 
-    # ------------------------------------------------------
-    # ELITE CHECK
-    # ------------------------------------------------------
-    if not os.path.exists("elite_parents.csv"):
-        print("❌ elite_parents.csv NOT created → pipeline broken")
-        sys.exit(1)
+        best = campaign.elite["zfs_pred"].min()
 
-    elite = pd.read_csv("elite_parents.csv")
+        print(f"🏆 Best predicted ZFS so far: {best:.2f}")
 
-    if elite.empty:
-        print("❌ elite_parents.csv is empty → no survivors")
-        sys.exit(1)
+        # ------------------------------------------------------
+        # TARGET CHECK
+        # ------------------------------------------------------
+        if best <= TARGET:
+            print("\n🎯 TARGET ACHIEVED")
+            break
 
-    best = elite["zfs_pred"].min()
 
-    print(f"🏆 Best predicted ZFS so far: {best:.2f}")
-
-    # ------------------------------------------------------
-    # TARGET CHECK
-    # ------------------------------------------------------
-    if best <= TARGET:
-        print("\n🎯 TARGET ACHIEVED")
-        break
+if __name__ == "__main__":
+    main()
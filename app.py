@@ -1,16 +1,15 @@
 import streamlit as st
-import subprocess
-import sys
 import os
 import pandas as pd
 
+from engine import load_index
+from engine.campaign import GACampaign
+from engine.oracle import ALL_CHECKPOINTS
 from gdrive_save import (
     download_pipeline_from_drive,
     upload_pipeline_to_drive,
 )
 
-PYTHON = sys.executable
-
 st.set_page_config(page_title="ZFS-driven Ligand SMILES Generator", layout="wide")
 
 st.title("🔬 ZFS-driven Ligand SMILES Generator")
@@ -24,6 +23,11 @@ target_zfs = st.sidebar.number_input("Target ZFS (cm⁻¹)", value=-180.0)
 mode = st.sidebar.selectbox("Mode", ["X-ray", "DFT"])
 max_gen = st.sidebar.number_input("Max GA generations", 1, 1000, 5)
 
+# off by default: every extra checkpoint is another GNN pass per generation
+all_checkpoints = st.sidebar.checkbox(
+    "Also predict with the other mode's models (X-ray + DFT)", value=ALL_CHECKPOINTS
+)
+
 run = st.sidebar.button("🚀 Run")
 
 # ================= RUN =================
@@ -35,11 +39,12 @@ if run:
 
     st.info("Checking database...")
 
-    db_ret = subprocess.call([PYTHON, "00_target_decision.py", str(target_zfs)])
+    # sorted index, built once per process (numeric FileNames only)
+    hits = load_index(mode).hits(target_zfs)
 
-    if db_ret == 0:
+    if len(hits) > 0:
         st.success("🎯 Direct database match found")
-        st.dataframe(pd.read_csv("retrieved_solution.csv"))
+        st.dataframe(hits)
         st.stop()
 
     st.warning("⚠️ No suitable database hit found → 🚀 Entering AI-guided design mode")
@@ -57,6 +62,11 @@ if run:
 
     progress = st.progress(0)
 
+    # Models, databases and ligand maps are loaded once for all generations;
+    # with the toggle on, the other MODE's checkpoints ride along in the
+    # same fused forward
+    campaign = GACampaign(target_zfs, mode, all_checkpoints=all_checkpoints)
+
     # ================= GA LOOP =================
 
     for gen in range(1, int(max_gen) + 1):
@@ -68,28 +78,22 @@ if run:
 
         if gen == 1 and first_run:
 
-            st.write("Building donor map")
-            subprocess.call([PYTHON, "00_build_ligand_donor_map.py"])
-
-            st.write("Selecting seed complexes")
-            subprocess.call([PYTHON, "01_select_seeds.py"])
+            st.write("Building donor map, seed complexes and seed ligands")
+            campaign.setup()
 
-            st.write("Extracting seed ligands")
-            subprocess.call([PYTHON, "02_extract_seed_ligands.py"])
-
-        subprocess.call([PYTHON, "03_ligand_mutation.py"])
-        subprocess.call([PYTHON, "04_build_complexes.py"])
-        subprocess.call([PYTHON, "05_oracle_screen.py"])
+        campaign.mutate(gen)
+        campaign.build()
+        campaign.screen()
 
         # ================= SHOW BEST RESULT =================
 
-        if os.path.exists("elite_parents.csv"):
+        if campaign.elite is not None:
 
-            elite = pd.read_csv("elite_parents.csv")
+            elite = campaign.elite
 
             if not elite.empty:
 
-                best_row = elite.sort_values("zfs_pred").iloc[0]
+                best_row = campaign.best
 
                 ligand_combo = best_row["ligands"]
                 donor_list = best_row["donor_list"]
@@ -99,16 +103,40 @@ if run:
 
                 st.success(f"Best ZFS so far: {D_value:.2f}")
 
-                result_df = pd.DataFrame([{
+                result = {
                     "Ligand Combination": ligand_combo,
                     "Donor Pattern": donor_list,
                     "Total Donors": donor_sum,
                     "Predicted D": D_value,
                     "E/D": ED_value
-                }])
+                }
+
+                # crystal + DFT predictions side by side
+                for other, label in [("crystal", "X-ray"), ("optimized", "DFT")]:
+                    if f"zfs_pred_{other}" in best_row:
+                        result[f"Predicted D ({label})"] = best_row[f"zfs_pred_{other}"]
+                        result[f"E/D ({label})"] = best_row[f"ed_pred_{other}"]
+
+                result_df = pd.DataFrame([result])
 
                 st.dataframe(result_df)
 
+                with st.expander("🧬 Provenance of the best complex"):
+                    provenance = campaign.provenance()
+                    if provenance.empty:
+                        st.write("All ligands come from the database")
+                    else:
+                        st.dataframe(provenance)
+
+                # CSV only for display / download; stages use .npz
+                st.download_button(
+                    "⬇️ Elite complexes (CSV)",
+                    elite.to_csv(index=False).encode("utf-8"),
+                    file_name="elite_parents.csv",
+                    mime="text/csv",
+                    key=f"elite_csv_{gen}",
+                )
+
                 # stop if target achieved
                 if D_value <= target_zfs:
                     st.success("🎯 Target achieved")
@@ -118,10 +146,10 @@ if run:
         # ================= SAVE STATE =================
 
         if any(os.path.exists(f) for f in [
-            "mutated_ligands.csv",
-            "mutation_lineage.csv",
-            "generated_complexes.csv",
-            "elite_parents.csv",
+            "mutated_ligands.npz",
+            "mutation_lineage.sqlite",
+            "generated_complexes.npz",
+            "elite_parents.npz",
         ]):
 
             upload_pipeline_to_drive(target_zfs, mode)
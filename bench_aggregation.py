@@ -0,0 +1,84 @@
+# ==========================================================
+# bench_aggregation.py
+# Microbenchmark: GNN neighbour aggregation on oracle batches
+#
+#   python bench_aggregation.py [--mode optimized] [--repeat 20]
+#
+# Times the conv stack (embed_nodes) on full-complex batches
+# of database rows for
+#   pyg      LigandGNN, GraphConv.propagate (one per checkpoint)
+#   scatter  StackedLigandGNN, index_add_ over edge_index
+#   csr      StackedLigandGNN, one CSR adjacency, sparse matmuls
+# and reports ms per batch, the max deviation of csr from
+# scatter and of both from pyg (BatchNorm folding included).
+# ==========================================================
+
+import argparse
+import time
+
+import torch
+
+from engine.database_lookup import load_database
+from engine.export import database_ligand_lists
+from engine.graph_store import get_store
+from engine.oracle import checkpoint_specs, load_checkpoint
+from ligand_dataset import ligand_slot_key
+from model import StackedLigandGNN
+
+BATCH_SIZES = (64, 256, 1024)
+
+
+def timed(fn, repeat):
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - t0) / repeat * 1e3, out
+
+
+@torch.no_grad()
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", default="optimized")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cpu = torch.device("cpu")
+    loaded = [load_checkpoint(m, s, cpu) for _, m, s in checkpoint_specs(args.mode)]
+    models = [m for m, _ in loaded]
+    stacked = {
+        agg: StackedLigandGNN(models, [s for _, s in loaded], agg)
+        for agg in ("scatter", "csr")
+    }
+    H = stacked["csr"].hidden_dim
+
+    db, _ = load_database(args.mode)
+    ligand_lists = [l for l in database_ligand_lists(db) if l]
+    store = get_store()
+
+    print(f"{'batch':>6} {'nodes':>7} {'edges':>7} {'pyg ms':>8} {'scatter ms':>10} "
+          f"{'csr ms':>8} {'csr-scatter':>12} {'csr-pyg':>9}")
+    for size in BATCH_SIZES:
+        lists = ligand_lists[:size]
+        keys = [ligand_slot_key(row, [], i) for row in lists for i in range(6)]
+        x, edge_index, _ = store.batch(store.rows(keys).reshape(-1, 6))
+
+        t_pyg, ref = timed(
+            lambda: torch.cat([m.embed_nodes(x, edge_index) for m in models], dim=1),
+            args.repeat
+        )
+        t_sc, out_sc = timed(lambda: stacked["scatter"].embed_nodes(x, edge_index), args.repeat)
+        t_csr, out = timed(lambda: stacked["csr"].embed_nodes(x, edge_index), args.repeat)
+
+        # StackedLigandGNN folds BatchNorm, so compare per-model embeddings
+        dev = max(
+            float((out[:, m * H:(m + 1) * H] - ref[:, m * H:(m + 1) * H]).abs().max())
+            for m in range(len(models))
+        )
+        print(f"{len(lists):>6} {x.size(0):>7} {edge_index.size(1):>7} {t_pyg:>8.2f} "
+              f"{t_sc:>10.2f} {t_csr:>8.2f} {float((out - out_sc).abs().max()):>12.2e} "
+              f"{dev:>9.2e}")
+
+
+if __name__ == "__main__":
+    main()
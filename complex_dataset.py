@@ -13,7 +13,7 @@ from torch_geometric.data import Data
 import pandas as pd
 import numpy as np
 
-from graph_features import smiles_to_graph
+from graph_features import smiles_to_graphs
 
 class ComplexDataset(Dataset):
     def __init__(self, csv_file):
@@ -54,6 +54,15 @@ class ComplexDataset(Dataset):
         if len(self.df) == 0:
             raise RuntimeError("No valid complexes with ligands found!")
 
+        # Featurize every distinct (ligand, donor atom) once, in one batch
+        pairs = sorted({
+            (smi, da)
+            for i in range(1, 7)
+            for smi, da in zip(self.df[f"L{i}"], self.df[f"DA{i}"])
+            if smi.upper() != "X"
+        })
+        self.graphs = dict(zip(pairs, smiles_to_graphs(pairs)))
+
         print(f"[INFO] Loaded {len(self.df)} valid complexes")
 
     def __len__(self):
@@ -71,7 +80,7 @@ class ComplexDataset(Dataset):
             if smi.upper() == "X":
                 continue
 
-            g = smiles_to_graph(smi, da)
+            g = self.graphs[(smi, da)]
             if g is None:
                 continue
 
@@ -0,0 +1,31 @@
+# ==========================================================
+# conftest.py
+# Tests keep every cache / store in a temporary directory
+# ==========================================================
+
+import pytest
+
+import graph_cache
+from engine import graph_store, novelty, prediction_store
+
+
+@pytest.fixture(autouse=True, scope="session")
+def cache_dir(tmp_path_factory):
+    """
+    Graph cache, graph store, prediction store and novelty index of
+    the test session, instead of the files in the working directory. The
+    environment is set too, for spawned oracle / featurizer workers.
+    """
+    tmp = tmp_path_factory.mktemp("caches")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("LIGAND_GRAPH_CACHE", str(tmp / "ligand_graph_cache.sqlite"))
+        mp.setenv("LIGAND_GRAPH_STORE", str(tmp / "ligand_graph_store.npz"))
+        mp.setenv("PREDICTION_STORE", str(tmp / "prediction_store.sqlite"))
+        mp.setenv("NOVELTY_INDEX", str(tmp / "novelty_index.u64"))
+        mp.setattr(graph_cache, "CACHE_PATH", str(tmp / "ligand_graph_cache.sqlite"))
+        mp.setattr(graph_cache, "_CACHE", None)
+        mp.setattr(graph_store, "STORE_PATH", str(tmp / "ligand_graph_store.npz"))
+        mp.setattr(graph_store, "_STORE", None)
+        mp.setattr(prediction_store, "STORE_PATH", str(tmp / "prediction_store.sqlite"))
+        mp.setattr(novelty, "NOVELTY_PATH", str(tmp / "novelty_index.u64"))
+        yield tmp
@@ -0,0 +1,8 @@
+# ==========================================================
+# engine
+# GA inverse-design pipeline (mutate -> build -> screen)
+# ==========================================================
+
+from engine.target_decision import HIT_TOL, ZFSIndex, load_index
+
+__all__ = ["HIT_TOL", "ZFSIndex", "load_index"]
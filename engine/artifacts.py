@@ -0,0 +1,167 @@
+# ==========================================================
+# engine/artifacts.py
+# Columnar stage artifacts (.npz)
+#
+# Stages hand their tables to each other as uncompressed .npz
+# files: one typed array per column, string columns as a UTF-8
+# byte buffer plus offsets (repetitive ones as their distinct
+# strings plus int32 codes). Members are stored (not deflated),
+# so mmap=True maps them straight from the file instead of
+# reading and parsing it. CSV is only produced for display /
+# download in the Streamlit app.
+# ==========================================================
+
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+SCHEMA = "__schema__"
+
+
+# ----------------------------------------------------------
+# Named arrays
+# ----------------------------------------------------------
+def write_arrays(path: str, **arrays):
+    """
+    Atomically replace path with an uncompressed .npz of arrays;
+    readers holding a map of the old file keep a valid view.
+    """
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def _mapped(f, path, info):
+    # local file header: 30 fixed bytes, then name and extra field
+    f.seek(info.header_offset)
+    n_name, n_extra = struct.unpack("<HH", f.read(30)[26:30])
+    f.seek(info.header_offset + 30 + n_name + n_extra)
+
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+
+    if int(np.prod(shape)) == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=f.tell(),
+                     shape=shape, order="F" if fortran else "C")
+
+
+def read_arrays(path: str, mmap: bool = False) -> dict:
+    """
+    name -> array. With mmap=True stored members are read-only
+    np.memmap views of the file (compressed ones are loaded).
+    """
+    if not mmap:
+        with np.load(path, allow_pickle=False) as z:
+            return {name: z[name] for name in z.files}
+
+    out = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = info.filename[:-len(".npy")]
+            if info.compress_type == zipfile.ZIP_STORED:
+                out[name] = _mapped(f, path, info)
+            else:
+                with zf.open(info) as member:
+                    out[name] = np.lib.format.read_array(member, allow_pickle=False)
+    return out
+
+
+# ----------------------------------------------------------
+# Tables
+# ----------------------------------------------------------
+def encode_strings(values):
+    isnull = pd.isna(values)
+    encoded = [b"" if nul else str(v).encode("utf-8") for v, nul in zip(values, isnull)]
+
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return data, offsets, np.asarray(isnull, dtype=bool)
+
+
+def decode_strings(data, offsets, isnull):
+    data = np.asarray(data)
+    bounds = np.asarray(offsets).tolist()
+    if data.size and data.max() >= 0x80:
+        buf = data.tobytes()
+        out = [buf[a:b].decode("utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
+    else:
+        # ASCII (SMILES): byte offsets are character offsets
+        text = data.tobytes().decode("ascii")
+        out = [text[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    if isnull is not None:
+        for i in np.flatnonzero(isnull):
+            out[i] = None
+    return np.array(out, dtype=object)
+
+
+def write_table(df: pd.DataFrame, path: str):
+    """
+    DataFrame -> columnar .npz. Numeric / bool columns keep their
+    dtype; everything else is stored as (nullable) strings.
+    """
+    schema, arrays = [], {}
+    for i, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        key = f"c{i}"
+        if values.dtype.kind in "biuf":
+            schema.append({"name": str(col), "kind": "num"})
+            arrays[key] = values
+            continue
+
+        codes, uniques = pd.factorize(values)
+        if 2 * len(uniques) < len(values):
+            # repetitive (SMILES, donor atoms): distinct strings + int32 codes, -1 = null
+            data, offsets, _ = encode_strings(np.asarray(uniques, dtype=object))
+            schema.append({"name": str(col), "kind": "cat"})
+            arrays[f"{key}_codes"] = codes.astype(np.int32)
+            arrays[f"{key}_data"] = data
+            arrays[f"{key}_offsets"] = offsets
+        else:
+            data, offsets, isnull = encode_strings(values)
+            schema.append({"name": str(col), "kind": "str"})
+            arrays[f"{key}_data"] = data
+            arrays[f"{key}_offsets"] = offsets
+            if isnull.any():
+                arrays[f"{key}_null"] = isnull
+
+    arrays[SCHEMA] = np.array(json.dumps(schema))
+    write_arrays(path, **arrays)
+
+
+def read_table(path: str, mmap: bool = False) -> pd.DataFrame:
+    """
+    Inverse of write_table. With mmap=True numeric columns are
+    views of the file; string columns are always decoded.
+    """
+    arrays = read_arrays(path, mmap)
+    schema = json.loads(str(arrays[SCHEMA][()]))
+
+    columns = {}
+    for i, col in enumerate(schema):
+        key = f"c{i}"
+        if col["kind"] == "num":
+            columns[col["name"]] = arrays[key]
+        elif col["kind"] == "cat":
+            uniques = decode_strings(arrays[f"{key}_data"], arrays[f"{key}_offsets"], None)
+            columns[col["name"]] = np.append(uniques, None)[arrays[f"{key}_codes"]]
+        else:
+            columns[col["name"]] = decode_strings(
+                arrays[f"{key}_data"], arrays[f"{key}_offsets"], arrays.get(f"{key}_null")
+            )
+
+    n = len(next(iter(columns.values()))) if columns else 0
+    return pd.DataFrame(columns, index=pd.RangeIndex(n), copy=False)
+
+
+def read_table_if_exists(path: str, mmap: bool = False):
+    return read_table(path, mmap) if os.path.exists(path) else None
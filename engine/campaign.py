@@ -0,0 +1,235 @@
+# ==========================================================
+# engine/campaign.py
+# In-process GA: mutate -> build -> screen
+#
+# Models, databases and ligand maps are loaded once per
+# campaign; every stage still writes its artifact (.npz, see
+# engine/artifacts.py) so campaigns can be checkpointed /
+# resumed exactly as before. Generated complexes are
+# ligand-registry id arrays.
+#
+# STREAM_SCREEN=1: build() only sets up a chunked generator and
+# screen() pulls it through the oracle into a bounded elite, so
+# memory no longer grows with N_COMPLEXES (no generated file).
+# ==========================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine import artifacts
+from engine.complexes import N_COMPLEXES, build_complexes, iter_complexes, ligand_pool
+from engine.database_lookup import load_database
+from engine.modes import mode_config, normalize_mode
+from engine.lineage import LINEAGE_PATH, LineageStore
+from engine.mutation import MolCache, mode_map_from_df, mutate, select_parents
+from engine import novelty
+from engine.oracle import ALL_CHECKPOINTS, load_oracle, select_elite, select_elite_stream
+from engine.paths import (
+    ANCHOR_MODE,
+    DONOR_MODES_NPZ,
+    ELITE_NPZ,
+    GENERATED_NPZ,
+    MUTATED_NPZ,
+    REGISTRY_NPZ,
+    SEED_COMPLEXES_NPZ,
+    SEED_LIGANDS_NPZ,
+)
+from engine.registry import DONOR_COLUMNS, ID_COLUMNS, ComplexArrays, LigandRegistry
+from engine.seeding import donor_map_stage, seed_ligands_stage, seeds_stage
+
+STREAMING = os.environ.get("STREAM_SCREEN", "0") == "1"
+
+
+class GACampaign:
+    """
+    One inverse-design campaign for a (target ZFS, MODE) pair.
+
+        campaign = GACampaign(-180, "crystal")
+        for gen in range(1, 11):
+            elite = campaign.run_generation(gen, setup=(gen == 1))
+    """
+
+    def __init__(self, target_zfs: float, mode: str, seed: int = 42,
+                 n_complexes: int = N_COMPLEXES, workdir: str = ".",
+                 all_checkpoints: bool = ALL_CHECKPOINTS,
+                 streaming: bool = STREAMING):
+        self.target_zfs = float(target_zfs)
+        self.mode = normalize_mode(mode)
+        self.cfg = mode_config(self.mode)
+        self.n_complexes = n_complexes
+        self.workdir = workdir
+        self.all_checkpoints = all_checkpoints
+        self.streaming = streaming
+
+        # Mutation draws per-parent streams from (seed, gen, parent);
+        # the builder keeps one stream for the whole campaign
+        self.seed = seed
+        self.build_rng = np.random.default_rng(seed)
+        self.mol_cache = MolCache()
+        self.novelty = novelty.NoveltyIndex() if novelty.ENABLED else None
+
+        self.donor_modes = None
+        self.mutated = None
+        self.lineage = None
+        self.registry = None
+        self.generated = None
+        self.elite = None
+        self._stream = None
+
+        self._oracle = None
+
+        self.load_state()
+
+    # ------------------------------------------------------
+    # State
+    # ------------------------------------------------------
+    def path(self, name):
+        return os.path.join(self.workdir, name)
+
+    def _read(self, name):
+        return artifacts.read_table_if_exists(self.path(name))
+
+    def _write(self, df, name):
+        artifacts.write_table(df, self.path(name))
+
+    def load_state(self):
+        """
+        Pick up whatever a previous run (or a Drive restore) left behind.
+        """
+        self.donor_modes = self._read(DONOR_MODES_NPZ)
+        self.lineage = LineageStore(self.path(LINEAGE_PATH))
+        self.elite = self._read(ELITE_NPZ)
+
+        p = self.path(REGISTRY_NPZ)
+        self.registry = LigandRegistry.load(p) if os.path.exists(p) else LigandRegistry()
+
+    @property
+    def oracle(self):
+        if self._oracle is None:
+            self._oracle = load_oracle(self.mode, self.all_checkpoints)
+        return self._oracle
+
+    @property
+    def best(self):
+        if self.elite is None or self.elite.empty:
+            return None
+        return self.elite.sort_values("zfs_pred").iloc[0]
+
+    def provenance(self, ligands=None) -> pd.DataFrame:
+        """
+        Mutation ancestry of each ligand of a complex (default: the
+        best elite complex), as lineage rows with a ligand column.
+        """
+        if ligands is None:
+            if self.best is None:
+                return pd.DataFrame(columns=["ligand", "parent", "child", "mutation", "generation"])
+            ligands = self.best["ligands"].split(";")
+
+        parts = [self.lineage.ancestry(lig).assign(ligand=lig) for lig in dict.fromkeys(ligands)]
+        df = pd.concat(parts, ignore_index=True)
+        return df[["ligand", "parent", "child", "mutation", "generation"]]
+
+    # ------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------
+    def setup(self):
+        """
+        Donor map, seed complexes, seed ligands: each restored from the
+        stage cache when its inputs were seen before.
+        """
+        cached = donor_map_stage(self.path(DONOR_MODES_NPZ))
+        self.donor_modes = self._read(DONOR_MODES_NPZ)
+        print(f"[INFO] {DONOR_MODES_NPZ} {'restored' if cached else 'created'}")
+
+        cached = seeds_stage(self.mode, self.path(SEED_COMPLEXES_NPZ))
+        seeds = self._read(SEED_COMPLEXES_NPZ)
+        print(f"[INFO] Seed complexes: {len(seeds)}{' (cached)' if cached else ''}")
+
+        cached = seed_ligands_stage(self.path(SEED_COMPLEXES_NPZ), self.path(SEED_LIGANDS_NPZ))
+        seed_ligands = self._read(SEED_LIGANDS_NPZ)
+        print(f"[INFO] Seed ligands: {len(seed_ligands)}{' (cached)' if cached else ''}")
+
+    def mutate(self, gen: int):
+        if self.donor_modes is None:
+            raise RuntimeError(f"{DONOR_MODES_NPZ} missing: run setup() first")
+
+        mode_map = mode_map_from_df(self.donor_modes)
+
+        anchor_db, zfs_col = load_database(ANCHOR_MODE)
+        parents = select_parents(
+            anchor_db, mode_map, self.target_zfs, self.elite, zfs_col=zfs_col
+        )
+        print("[INFO] Parent ligands:", len(parents))
+
+        self.mutated, new_lineage = mutate(
+            parents, mode_map, gen, self.seed, self.mol_cache, novelty=self.novelty
+        )
+        n_new = self.lineage.add(new_lineage)
+
+        self._write(self.mutated, MUTATED_NPZ)
+
+        print("[INFO] Mutated ligands:", self.mutated["smiles"].nunique())
+        print(f"[INFO] Lineage entries: {len(self.lineage)} (+{n_new})")
+
+    def build(self):
+        pool = ligand_pool(self.donor_modes, self.mutated)
+
+        if self.streaming:
+            self.generated = None
+            self._stream = iter_complexes(
+                self.registry, pool, self.elite, self.n_complexes, self.build_rng
+            )
+            print("[INFO] Streaming complexes:", self.n_complexes)
+            return
+
+        self.generated = build_complexes(
+            self.registry, pool, self.elite, self.n_complexes, self.build_rng
+        )
+        self.generated.save(self.path(GENERATED_NPZ))
+        self.registry.save(self.path(REGISTRY_NPZ))
+        print("[INFO] Generated complexes:", len(self.generated))
+
+    def screen(self):
+        if self._stream is not None:
+            # ids travel as integer columns; SMILES only for the elite
+            chunks = (
+                pd.concat([
+                    c.columns(),
+                    self.oracle.screen_arrays(c, self.registry, verbose=False,
+                                              target_zfs=self.target_zfs),
+                ], axis=1)
+                for c in self._stream
+            )
+            best = select_elite_stream(
+                chunks, self.target_zfs, self.n_complexes,
+                columns=ID_COLUMNS + DONOR_COLUMNS + self.oracle.columns,
+            )
+            self._stream = None
+            self.oracle.report()
+
+            self.elite = ComplexArrays.from_columns(best).to_frame(
+                self.registry, best.drop(columns=ID_COLUMNS + DONOR_COLUMNS)
+            )
+            # ligands registered while streaming
+            self.registry.save(self.path(REGISTRY_NPZ))
+        else:
+            scored = self.oracle.screen_arrays(self.generated, self.registry,
+                                               target_zfs=self.target_zfs)
+            best = select_elite(scored, self.target_zfs)
+            self.elite = self.generated.take(best.index.to_numpy()).to_frame(self.registry, best)
+
+        self._write(self.elite, ELITE_NPZ)
+
+        print("[INFO] Elite saved:", len(self.elite))
+        if not self.elite.empty:
+            print("[INFO] Best predicted ZFS:", self.elite.iloc[0]["zfs_pred"])
+
+    def run_generation(self, gen: int, setup: bool = False) -> pd.DataFrame:
+        if setup:
+            self.setup()
+        self.mutate(gen)
+        self.build()
+        self.screen()
+        return self.elite
@@ -0,0 +1,216 @@
+# ==========================================================
+# engine/complexes.py
+# Memory-augmented complex construction
+#
+# Complexes come out as ComplexArrays (registry ids + donor
+# denticities), see engine/registry.py.
+# ==========================================================
+
+import json
+import math
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from engine.registry import N_SLOTS, ComplexArrays, LigandRegistry
+
+TARGET = 6
+N_COMPLEXES = int(os.environ.get("N_COMPLEXES", 5000))
+TEMP = 1.5
+
+# Complexes per chunk in streaming mode (iter_complexes)
+STREAM_CHUNK = int(os.environ.get("STREAM_CHUNK", 50000))
+
+ALLOWED_PATTERNS = [
+    (6,), (3,3), (4,1,1), (2,2,2),
+    (1,2,3), (1,1,1,1,1,1), (5,1)
+]
+
+
+def ligand_pool(df_real: pd.DataFrame, df_mut: pd.DataFrame) -> dict:
+    """
+    smiles -> list of denticities for database + mutated ligands
+    """
+    df = pd.concat([df_real, df_mut], ignore_index=True)
+    return df.groupby("smiles")["donors"].apply(list).to_dict()
+
+
+def pattern_weights(elite: pd.DataFrame = None) -> Counter:
+    """
+    Uniform over ALLOWED_PATTERNS, with a soft bonus for the
+    donor pattern of the best elite complex.
+    """
+    weights = Counter({p: 1.0 for p in ALLOWED_PATTERNS})
+
+    if elite is not None and not elite.empty:
+        best = elite.sort_values("zfs_pred").iloc[0]
+        try:
+            best_pattern = tuple(sorted(json.loads(best["donor_list"])))
+            weights[best_pattern] = min(weights[best_pattern] + 1.5, 4.0)
+        except Exception:
+            pass
+
+    return weights
+
+
+class ComplexSampler:
+    """
+    Donor-denticity index over the ligand pool:
+        denticity -> array of registry ids
+
+    Whole populations of one pattern are drawn at once with NumPy,
+    without replacement inside a complex (a ligand with several
+    modes is still used at most once), so there is no rejection
+    loop and no per-slot scan of the ligand list.
+    """
+
+    def __init__(self, registry: LigandRegistry, mode_map: dict):
+        members = {}
+        for lig, modes in mode_map.items():
+            i = registry.add(lig, modes)
+            for d in set(modes):
+                members.setdefault(int(d), []).append(i)
+
+        n = len(registry)
+
+        self.pools = {d: np.asarray(ids, dtype=np.int64) for d, ids in members.items()}
+
+        # ligand id -> position inside each pool (-1 = not in pool)
+        self.positions = {}
+        for d, pool in self.pools.items():
+            pos = np.full(n, -1, dtype=np.int64)
+            pos[pool] = np.arange(len(pool))
+            self.positions[d] = pos
+
+    def feasible(self, pattern) -> bool:
+        """
+        Hall's condition: every subset of the pattern's denticities
+        has at least as many distinct ligands as slots to fill.
+        """
+        need = Counter(pattern)
+        dents = list(need)
+        for mask in range(1, 2 ** len(dents)):
+            subset = [d for i, d in enumerate(dents) if mask >> i & 1]
+            pools = [self.pools.get(d, np.zeros(0, dtype=np.int64)) for d in subset]
+            if len(np.unique(np.concatenate(pools))) < sum(need[d] for d in subset):
+                return False
+        return True
+
+    def _draw(self, pattern, n, rng):
+        """
+        One sequential uniform draw per slot among ligands of that
+        denticity not used yet; rows that run dry are returned as dead.
+        """
+        k = len(pattern)
+        chosen = np.empty((n, k), dtype=np.int64)
+        alive = np.ones(n, dtype=bool)
+
+        for j, d in enumerate(pattern):
+            pool = self.pools[d]
+            P = len(pool)
+
+            # previously chosen ligands, as sorted positions in this pool
+            excl = self.positions[d][chosen[:, :j]]
+            excl = np.where(excl >= 0, excl, P)
+            excl.sort(axis=1)
+            avail = P - (excl < P).sum(axis=1)
+
+            alive &= avail > 0
+            r = np.floor(rng.random(n) * np.maximum(avail, 1)).astype(np.int64)
+            for c in range(j):
+                r += r >= excl[:, c]
+
+            chosen[:, j] = pool[np.minimum(r, P - 1)]
+
+        return chosen[alive]
+
+    def sample_pattern(self, pattern, n, rng, max_rounds=1000):
+        """
+        (n, len(pattern)) ligand ids for one donor pattern.
+        """
+        out = []
+        missing = n
+        for _ in range(max_rounds):
+            if missing <= 0:
+                break
+            got = self._draw(pattern, missing, rng)
+            out.append(got)
+            missing -= len(got)
+        else:
+            raise RuntimeError(f"Could not fill donor pattern {pattern}")
+
+        return np.concatenate(out)[:n]
+
+
+def pattern_probs(sampler: ComplexSampler, elite: pd.DataFrame = None):
+    """
+    Feasible donor patterns and their sampling probabilities.
+    """
+    pw = pattern_weights(elite)
+    patterns = []
+    for p in pw:
+        if sampler.feasible(p):
+            patterns.append(p)
+        else:
+            print(f"[WARN] Donor pattern {p} cannot be filled from the ligand pool")
+
+    if not patterns:
+        raise ValueError("No donor pattern can be filled from the ligand pool")
+
+    weights = np.array([math.exp(pw[p] / TEMP) for p in patterns])
+    return patterns, weights / weights.sum()
+
+
+def sample_complexes(sampler: ComplexSampler, patterns, probs, n: int, rng) -> ComplexArrays:
+    counts = rng.multinomial(n, probs)
+
+    ids = np.full((n, N_SLOTS), -1, dtype=np.int32)
+    donors = np.zeros((n, N_SLOTS), dtype=np.uint8)
+
+    row = 0
+    for pattern, count in zip(patterns, counts):
+        if count == 0:
+            continue
+        k = len(pattern)
+        ids[row:row + count, :k] = sampler.sample_pattern(pattern, count, rng)
+        donors[row:row + count, :k] = pattern
+        row += count
+
+    order = rng.permutation(n)
+    return ComplexArrays(ids[order], donors[order])
+
+
+def build_complexes(registry: LigandRegistry, mode_map: dict, elite: pd.DataFrame = None,
+                    n_complexes: int = N_COMPLEXES, rng=None) -> ComplexArrays:
+    """
+    n_complexes drawn from the mode_map ligands; their ids are
+    added to the registry.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    sampler = ComplexSampler(registry, mode_map)
+    patterns, probs = pattern_probs(sampler, elite)
+    return sample_complexes(sampler, patterns, probs, n_complexes, rng)
+
+
+def iter_complexes(registry: LigandRegistry, mode_map: dict, elite: pd.DataFrame = None,
+                   n_complexes: int = N_COMPLEXES, rng=None,
+                   chunk_size: int = STREAM_CHUNK):
+    """
+    Same population as build_complexes, generated chunk_size rows at
+    a time so it never has to be held in memory at once.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    sampler = ComplexSampler(registry, mode_map)
+    patterns, probs = pattern_probs(sampler, elite)
+
+    remaining = n_complexes
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        yield sample_complexes(sampler, patterns, probs, n, rng)
+        remaining -= n
@@ -1,26 +1,23 @@
-import pandas as pd
-import os
+from engine.db_snapshot import load_snapshot
+from engine.modes import mode_config, normalize_mode
 
-DATA_DIR = "data"
 
 def load_database(mode: str):
     """
-    Load GA.csv and return dataframe + correct ZFS column
-    """
-
-    path = os.path.join(DATA_DIR, "GA.csv")
+    Load the MODE database (GA.csv or opt_D.csv) and return
+    dataframe + correct ZFS column.
 
-    if not os.path.exists(path):
-        raise FileNotFoundError("GA.csv not found in data/")
+    The dataframe comes from the compiled snapshot (numeric ZFS
+    and E/D), loaded once per process and shared: treat it as
+    read-only.
+    """
 
-    df = pd.read_csv(path)
+    cfg = mode_config(normalize_mode(mode))
+    df = load_snapshot(mode).table
 
-    if mode == "crystal":
-        zfs_col = "zfs"
-    else:
-        zfs_col = "zfs_opt"
+    zfs_col = cfg["zfs_col"]
 
     if zfs_col not in df.columns:
-        raise ValueError(f"Column '{zfs_col}' missing in GA.csv")
+        raise ValueError(f"Column '{zfs_col}' missing in {cfg['database']}")
 
     return df, zfs_col
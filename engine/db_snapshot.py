@@ -0,0 +1,200 @@
+# ==========================================================
+# engine/db_snapshot.py
+# Compiled database snapshots (GA.csv / opt_D.csv)
+#
+# Each MODE database is parsed, cleaned and validated once
+# into .db_snapshots/<name>/ (engine/artifacts tables):
+#   table        the database, ZFS / E/D coerced to numbers
+#   donor_modes  every (SMILES, denticity) pair
+# and rebuilt whenever the CSV's hash changes. The hash is only
+# computed again when the CSV's size or mtime changed.
+# ==========================================================
+
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from engine import artifacts
+from engine.ingest import donor_modes, ligand_occurrences
+from engine.modes import base_path, mode_config, normalize_mode
+
+SNAPSHOT_DIR = os.environ.get("DB_SNAPSHOT_DIR", base_path(".db_snapshots"))
+
+# bump when the compiled layout changes
+SNAPSHOT_VERSION = 3
+
+N_SLOTS = 6
+TABLES = ("table", "donor_modes")
+
+
+class DatabaseSnapshot:
+    """
+    The compiled tables of one database. Tables of a snapshot read
+    from disk are loaded on first access.
+    """
+
+    def __init__(self, name, zfs_col, ed_col, tables=None, path=None):
+        self.name = name
+        self.zfs_col = zfs_col
+        self.ed_col = ed_col
+        self.path = path
+        self._tables = dict(tables or {})
+
+    def _table(self, name) -> pd.DataFrame:
+        if name not in self._tables:
+            self._tables[name] = artifacts.read_table(os.path.join(self.path, f"{name}.npz"))
+        return self._tables[name]
+
+    table = property(lambda self: self._table("table"))
+    donor_modes = property(lambda self: self._table("donor_modes"))
+
+    def tables(self) -> dict:
+        return {name: self._table(name) for name in TABLES}
+
+
+def _hash(csv_file: str) -> str:
+    h = hashlib.sha1()
+    with open(base_path(csv_file), "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat(csv_file: str) -> list:
+    st = os.stat(base_path(csv_file))
+    return [st.st_size, st.st_mtime_ns]
+
+
+def source_digest(csv_file: str) -> str:
+    """
+    sha1 of the CSV, read from the snapshot meta while the file's
+    size and mtime are still the ones recorded there.
+    """
+    meta = _read_meta(_snapshot_path(csv_file))
+    if meta is not None and meta.get("stat") == _stat(csv_file):
+        return meta["sha1"]
+    return _hash(csv_file)
+
+
+# ----------------------------------------------------------
+# Compile
+# ----------------------------------------------------------
+def compile_database(csv_file: str, zfs_col: str, ed_col: str) -> DatabaseSnapshot:
+    """
+    Parse + clean + validate one database CSV.
+    """
+    df = pd.read_csv(base_path(csv_file))
+
+    missing = [c for c in [zfs_col, ed_col]
+               + [f"{p}{i}" for p in ("L", "D") for i in range(1, N_SLOTS + 1)]
+               if c not in df.columns]
+    if missing:
+        raise ValueError(f"{csv_file}: missing columns {missing}")
+
+    for col in (zfs_col, ed_col):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    bad = int(df[zfs_col].isna().sum())
+    if bad:
+        print(f"[WARN] {csv_file}: {bad} rows without a numeric {zfs_col}")
+
+    occ = ligand_occurrences(df)
+    donors = occ["donors"].to_numpy()
+    known = donors[~np.isnan(donors)]
+    if np.any((known < 0) | (known > N_SLOTS)):
+        raise ValueError(f"{csv_file}: denticity outside 0..{N_SLOTS}")
+
+    return DatabaseSnapshot(csv_file, zfs_col, ed_col, {
+        "table": df,
+        "donor_modes": donor_modes(occ),
+    })
+
+
+# ----------------------------------------------------------
+# Disk cache
+# ----------------------------------------------------------
+def _snapshot_path(csv_file: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, os.path.splitext(os.path.basename(csv_file))[0])
+
+
+def _read_meta(path):
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(path, meta):
+    tmp = os.path.join(path, f"meta.json.tmp{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+def _write_snapshot(snap: DatabaseSnapshot, path: str, meta: dict):
+    tmp = f"{path}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, df in snap.tables().items():
+        artifacts.write_table(df, os.path.join(tmp, f"{name}.npz"))
+    _write_meta(tmp, meta)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+
+def build_snapshot(mode: str, force: bool = False) -> DatabaseSnapshot:
+    """
+    Snapshot of the MODE database, compiled again only when the CSV
+    (or the snapshot layout) changed since the last build.
+    """
+    cfg = mode_config(normalize_mode(mode))
+    csv_file = cfg["database"]
+    path = _snapshot_path(csv_file)
+
+    meta = {
+        "source": csv_file,
+        "sha1": source_digest(csv_file),
+        "stat": _stat(csv_file),
+        "version": SNAPSHOT_VERSION,
+        "zfs_col": cfg["zfs_col"],
+        "ed_col": cfg["ed_col"],
+    }
+
+    old = _read_meta(path)
+    if not force and old is not None and dict(old, stat=None) == dict(meta, stat=None):
+        if old.get("stat") != meta["stat"]:
+            # touched / copied, same content: only the meta is stale
+            try:
+                _write_meta(path, meta)
+            except OSError:
+                pass
+        return DatabaseSnapshot(csv_file, cfg["zfs_col"], cfg["ed_col"], path=path)
+
+    snap = compile_database(csv_file, cfg["zfs_col"], cfg["ed_col"])
+    try:
+        _write_snapshot(snap, path, meta)
+        snap.path = path
+        print(f"[INFO] Database snapshot compiled: {csv_file} -> {path}")
+    except OSError as e:
+        print(f"[WARN] Could not write database snapshot ({e}); using it in memory")
+    return snap
+
+
+@lru_cache(maxsize=None)
+def _load_snapshot(mode: str) -> DatabaseSnapshot:
+    return build_snapshot(mode)
+
+
+def load_snapshot(mode: str) -> DatabaseSnapshot:
+    """
+    Process-wide snapshot of the MODE database: treat as read-only.
+    """
+    return _load_snapshot(normalize_mode(mode))
+
@@ -0,0 +1,133 @@
+# ==========================================================
+# engine/embedding_cache.py
+# Per-ligand GNN embedding cache
+#
+# A complex graph is a disjoint union of ligand graphs and, in
+# eval mode, the GraphConv + BatchNorm stack never mixes nodes
+# across ligands. The mean-pooled vector of any complex is
+# therefore
+#
+#     sum_l S_l / sum_l n_l
+#
+# with S_l the node-embedding sum and n_l the node count of
+# ligand slot l. Both are computed once per (ligand, donor atom)
+# and reused for every complex and every generation. Ligand
+# graphs come from the packed graph store (engine/graph_store.py).
+# ==========================================================
+
+import time
+
+import torch
+
+from engine.graph_store import budget_batches, get_store
+from ligand_dataset import ligand_slot_key
+
+N_SLOTS = 6
+
+
+class LigandEmbeddingCache:
+    """
+    (smiles, donor atom) -> (node-embedding sum, node count)
+    for one or more LigandGNN / StackedLigandGNN models sharing
+    the same features.
+    """
+
+    def __init__(self, models, device, batch_size: int = 256, graph_store=None,
+                 node_budget: int = 0):
+        self.models = list(models)
+        self.device = device
+        self.batch_size = batch_size
+        self.node_budget = node_budget
+        self.graph_store = graph_store if graph_store is not None else get_store()
+
+        self.index = {}
+        self.sums = [None] * len(self.models)
+        self.counts = torch.zeros(0, device=device)
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def ligand_ids(self, smiles_lists, da_lists=None):
+        """
+        (n_complexes, 6) LongTensor of cache rows; empty slots map
+        to the fallback-node entry exactly like _build_row_graph.
+        """
+        keys = []
+        for r, smiles_row in enumerate(smiles_lists):
+            da_row = da_lists[r] if da_lists is not None else ["X"] * N_SLOTS
+            keys.extend(ligand_slot_key(smiles_row, da_row, i) for i in range(N_SLOTS))
+
+        return self.rows(keys).view(-1, N_SLOTS)
+
+    def rows(self, keys):
+        """
+        1-D LongTensor of cache rows for (smiles, donor atom) keys,
+        embedding the ones not seen yet.
+        """
+        new = {k for k in keys if k not in self.index}
+        self.misses += len(new)
+        self.hits += len(keys) - len(new)
+        if new:
+            self._embed(sorted(new))
+
+        return torch.tensor([self.index[k] for k in keys], dtype=torch.long, device=self.device)
+
+    @torch.no_grad()
+    def _embed(self, keys):
+        for chunk, sums, counts in self._forward(keys, self.node_budget):
+            for m, s in enumerate(sums):
+                self.sums[m] = s if self.sums[m] is None else torch.cat([self.sums[m], s])
+
+            self.counts = torch.cat([self.counts, counts])
+            for k in chunk:
+                self.index[k] = len(self.index)
+
+    @torch.no_grad()
+    def _forward(self, keys, node_budget):
+        """
+        Yields (keys, per-model node-embedding sums, node counts) batch
+        by batch, one ligand per graph; nothing is cached.
+        """
+        store_rows = self.graph_store.rows(keys)[:, None]
+        if node_budget:
+            batches = budget_batches(*self.graph_store.sizes(store_rows), node_budget)
+        else:
+            batches = [range(a, min(a + self.batch_size, len(keys)))
+                       for a in range(0, len(keys), self.batch_size)]
+
+        for rows in batches:
+            chunk = [keys[i] for i in rows]
+            x, edge_index, batch = (
+                t.to(self.device) for t in self.graph_store.batch(store_rows[rows])
+            )
+
+            n = len(chunk)
+            counts = torch.bincount(batch, minlength=n).to(self.counts.dtype)
+
+            sums = []
+            for model in self.models:
+                h = model.embed_nodes(x, edge_index)
+                sums.append(h.new_zeros((n, h.size(1))).index_add_(0, batch, h))
+
+            yield chunk, sums, counts
+
+    def rate(self, keys, node_budget) -> float:
+        """
+        Ligands embedded per second with this node budget (0 = fixed
+        batches), without caching them.
+        """
+        t0 = time.perf_counter()
+        for _ in self._forward(keys, node_budget):
+            pass
+        return len(keys) / max(time.perf_counter() - t0, 1e-9)
+
+    def pooled(self, ids, model_index: int = 0):
+        """
+        global_mean_pool of the full complex graphs, from cached sums.
+        """
+        s = self.sums[model_index][ids].sum(dim=1)
+        c = self.counts[ids].sum(dim=1).clamp(min=1)
+        return s / c.unsqueeze(-1)
@@ -0,0 +1,155 @@
+# ==========================================================
+# engine/export.py
+# Exported CPU inference artifacts for the GNN checkpoints
+#
+# Each *_gnn_*.pth (+ its scaler) becomes a TorchScript
+# FoldedLigandGNN under .oracle_export/: BatchNorm folded into
+# the conv weights, output already in original units, and with
+# "int8" the linear layers after the first conv dynamically
+# quantized. Artifacts are rebuilt when the checkpoint or
+# scaler changes.
+#
+#   ORACLE_EXPORT=fp32|int8   oracle uses the exported models
+#   python 00_export_oracle.py [--int8]   export + accuracy report
+# ==========================================================
+
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+
+from engine.modes import base_path
+from model import FoldedLigandGNN
+
+EXPORT_DIR = os.environ.get("ORACLE_EXPORT_DIR", base_path(".oracle_export"))
+
+# "" = eager float32 checkpoints
+EXPORT = os.environ.get("ORACLE_EXPORT", "")
+KINDS = ("fp32", "int8")
+
+# bump when FoldedLigandGNN or the quantized layers change
+EXPORT_VERSION = 2
+
+# kept in float32 by "int8"
+FLOAT_LAYERS = ("rel.0", "root.0")
+
+
+class ExportedModel:
+    """
+    Scripted FoldedLigandGNN behind the LigandGNN interface used by
+    the oracle: embed_nodes() / readout() / __call__(batch).
+    """
+
+    def __init__(self, module):
+        self.module = module
+
+    def embed_nodes(self, x, edge_index):
+        return self.module.embed_nodes(x, edge_index)
+
+    def readout(self, g):
+        return self.module.readout(g)
+
+    def __call__(self, data):
+        return self.module(data.x, data.edge_index, data.batch)
+
+
+def export_path(model_file: str, kind: str) -> str:
+    stem = os.path.splitext(os.path.basename(model_file))[0]
+    return os.path.join(EXPORT_DIR, f"{stem}.{kind}.pt")
+
+
+def export_model(model, scaler, path: str, kind: str, digest: str):
+    """
+    Fold, optionally quantize, script and save one checkpoint.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown export kind: {kind}")
+
+    folded = FoldedLigandGNN(model.cpu(), scaler)
+    if kind == "int8":
+        # the first conv sees raw atom features (Z, charges) with very
+        # different ranges; per-tensor int8 activations lose them
+        layers = {name for name, m in folded.named_modules()
+                  if isinstance(m, nn.Linear) and name not in FLOAT_LAYERS}
+        folded = torch.ao.quantization.quantize_dynamic(folded, layers, dtype=torch.qint8)
+    scripted = torch.jit.script(folded)
+
+    meta = {"digest": digest, "kind": kind, "version": EXPORT_VERSION}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    torch.jit.save(scripted, tmp, _extra_files={"meta.json": json.dumps(meta)})
+    os.replace(tmp, path)
+
+
+def load_exported(path: str, kind: str, digest: str, device):
+    """
+    ExportedModel, or None when the artifact is missing or was built
+    from another checkpoint / layout.
+    """
+    if not os.path.exists(path):
+        return None
+
+    extra = {"meta.json": ""}
+    module = torch.jit.load(path, map_location=device, _extra_files=extra)
+    meta = json.loads(extra["meta.json"] or "{}")
+    if meta != {"digest": digest, "kind": kind, "version": EXPORT_VERSION}:
+        return None
+
+    module.eval()
+    return ExportedModel(module)
+
+
+# ----------------------------------------------------------
+# Accuracy report
+# ----------------------------------------------------------
+def database_ligand_lists(df: pd.DataFrame) -> list:
+    """
+    Ligand lists of database rows, as the oracle sees them.
+    """
+    lig = df[[f"L{i}" for i in range(1, 7)]].to_numpy(dtype=object)
+    return [
+        [str(v) for v in row if isinstance(v, str) and v != "X"]
+        for row in lig
+    ]
+
+
+def accuracy_report(mode: str, kind: str, max_rows: int = 0) -> pd.DataFrame:
+    """
+    Exported vs eager float32 predictions on the MODE database rows:
+    one row per output column with MAE, max |error| and complexes/s
+    of both paths (full graphs, no caches).
+    """
+    from engine.database_lookup import load_database
+    from engine.oracle import Oracle
+
+    db, _ = load_database(mode)
+    if max_rows:
+        db = db.head(max_rows)
+    ligand_lists = [l for l in database_ligand_lists(db) if l]
+
+    def run(export):
+        oracle = Oracle(mode, embedding_cache=False, store=False, fused=False,
+                        export=export, node_budget=0)
+        oracle.predict(ligand_lists[:64])  # warm-up
+        t0 = time.perf_counter()
+        preds = oracle.predict(ligand_lists)
+        return oracle.columns, preds, len(ligand_lists) / (time.perf_counter() - t0)
+
+    columns, ref, ref_rate = run("")
+    _, out, out_rate = run(kind)
+
+    err = np.abs(out - ref)
+    return pd.DataFrame({
+        "mode": mode,
+        "column": columns,
+        "kind": kind,
+        "rows": len(ligand_lists),
+        "mae": err.mean(axis=0),
+        "max_abs_err": err.max(axis=0),
+        "fp32_per_s": ref_rate,
+        "export_per_s": out_rate,
+    })
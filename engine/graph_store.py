@@ -0,0 +1,354 @@
+# ==========================================================
+# engine/graph_store.py
+# Packed, memory-mapped ligand graph store
+#
+# Every known (smiles, donor atom) slot graph lives in one CSR
+# layout:
+#   x          (n_nodes, 11) float32 node features
+#   node_ptr   (n_ligands + 1) node offsets
+#   edge_index (2, n_edges) int64, local to each ligand
+#   edge_ptr   (n_ligands + 1) edge offsets
+# An oracle batch of complexes is assembled straight from index
+# ranges into x / edge_index / batch tensors, with the same node
+# and edge order as LigandCombinationDataset + DataLoader, so the
+# only per-batch allocations are the output tensors.
+#
+# On disk the store is a base .npz, mapped on load, plus
+# append-only segments: graphs featurized by a process are
+# written as a new, uniquely named segment next to it, so an
+# append costs O(new graphs), the base stays mapped, and
+# parallel workers never overwrite each other. Once there are
+# MAX_SEGMENTS segments they are merged into the base. It is a
+# cache: a lost merge race only drops entries, which are then
+# featurized again. The store is the oracle's only persistent
+# copy of its ligand graphs: misses are featurized directly,
+# not through the SQLite graph cache. LIGAND_GRAPH_STORE=0 keeps
+# the store in memory only.
+# ==========================================================
+
+import os
+import time
+
+import numpy as np
+import torch
+
+from engine import artifacts
+from ligand_dataset import FEATURIZER_VERSION, build_ligand_graphs
+
+STORE_PATH = os.environ.get("LIGAND_GRAPH_STORE", "ligand_graph_store.npz")
+
+N_FEATURES = 11
+
+# segments merged into the base file on load once there are this many
+MAX_SEGMENTS = 32
+
+
+class LigandGraphStore:
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path if path not in ("", "0") else None
+        self.segment_dir = None
+        if self.path is not None:
+            self.segment_dir = os.path.splitext(self.path)[0] + ".segments"
+
+        self.hits = 0
+        self.misses = 0
+
+        self._clear()
+        if self.path is not None:
+            self._load()
+            if len(self._segments) >= MAX_SEGMENTS:
+                self.save()
+
+    def __len__(self):
+        return len(self.index)
+
+    def _clear(self):
+        self.index = {}
+        self.node_ptr = np.zeros(1, dtype=np.int64)
+        self.edge_ptr = np.zeros(1, dtype=np.int64)
+
+        # base: mapped from self.path; tail: graphs added since, in memory
+        self._base_x = np.zeros((0, N_FEATURES), dtype=np.float32)
+        self._base_edges = np.zeros((2, 0), dtype=np.int64)
+        self._tail_x = self._base_x
+        self._tail_edges = self._base_edges
+
+        # segment files already read (including stale / foreign ones)
+        self._segments = set()
+
+    # ------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------
+    def _read(self, path):
+        """
+        (keys, x, n_nodes, edge_index, n_edges) of a store file, or
+        None if it was built with another featurizer.
+        """
+        a = artifacts.read_arrays(path, mmap=True)
+        if str(a["featurizer"][()]) != FEATURIZER_VERSION:
+            print(f"[WARN] {path}: built with another featurizer, ignored")
+            return None
+
+        smiles = artifacts.decode_strings(a["smiles_data"], a["smiles_offsets"], None)
+        donors = artifacts.decode_strings(a["donor_data"], a["donor_offsets"], None)
+        keys = list(zip(smiles.tolist(), donors.tolist()))
+        return keys, a["x"], np.diff(a["node_ptr"]), a["edge_index"], np.diff(a["edge_ptr"])
+
+    def _load(self):
+        if os.path.exists(self.path):
+            found = self._read(self.path)
+            if found is not None:
+                keys, x, n_nodes, edge_index, n_edges = found
+                self._base_x, self._base_edges = x, edge_index
+                self._tail_x = np.zeros((0, N_FEATURES), dtype=np.float32)
+                self._tail_edges = np.zeros((2, 0), dtype=np.int64)
+                self._add(keys, None, n_nodes, None, n_edges)
+
+        self.refresh()
+
+    def refresh(self):
+        """
+        Read segments written by other processes since the last call.
+        """
+        if self.segment_dir is None or not os.path.isdir(self.segment_dir):
+            return
+
+        for name in sorted(os.listdir(self.segment_dir)):
+            if not name.endswith(".npz") or name in self._segments:
+                continue
+            self._segments.add(name)
+            try:
+                found = self._read(os.path.join(self.segment_dir, name))
+            except (OSError, ValueError, KeyError):
+                continue  # merged and removed by another process
+            if found is not None:
+                self._add(*found)
+
+    def _write(self, path, keys, x, node_ptr, edge_index, edge_ptr):
+        smiles, smiles_offsets, _ = artifacts.encode_strings([s for s, _ in keys])
+        donors, donor_offsets, _ = artifacts.encode_strings([d for _, d in keys])
+        artifacts.write_arrays(
+            path,
+            featurizer=np.array(FEATURIZER_VERSION),
+            smiles_data=smiles, smiles_offsets=smiles_offsets,
+            donor_data=donors, donor_offsets=donor_offsets,
+            x=x, node_ptr=node_ptr, edge_index=edge_index, edge_ptr=edge_ptr,
+        )
+
+    def save(self):
+        """
+        Merge every graph into the base file, remove the segments it
+        now holds and map it again.
+        """
+        if self.path is None:
+            return
+
+        keys = list(self.index)
+        rows = np.fromiter(self.index.values(), dtype=np.int64, count=len(keys))
+        x, edge_index, n_nodes, n_edges = self._graphs(rows)
+        self._write(self.path, keys, x, _ptr(n_nodes), edge_index, _ptr(n_edges))
+
+        for name in self._segments:
+            try:
+                os.remove(os.path.join(self.segment_dir, name))
+            except OSError:
+                pass
+
+        self._clear()
+        self._load()
+
+    # ------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------
+    def rows(self, keys) -> np.ndarray:
+        """
+        Store rows of (smiles, donor atom) slot keys; graphs not seen
+        yet are featurized and appended.
+        """
+        if any(k not in self.index for k in keys):
+            self.refresh()
+        new = sorted({k for k in keys if k not in self.index})
+        self.misses += len(new)
+        self.hits += len(keys) - len(new)
+        if new:
+            self._append(new)
+        return np.fromiter((self.index[k] for k in keys), dtype=np.int64, count=len(keys))
+
+    def _append(self, keys):
+        graphs = build_ligand_graphs(keys, cache=False)
+
+        n_nodes = np.array([x.size(0) for x, _ in graphs], dtype=np.int64)
+        n_edges = np.array([ei.size(1) for _, ei in graphs], dtype=np.int64)
+        x = np.concatenate([np.zeros((0, N_FEATURES), dtype=np.float32)]
+                           + [x.numpy().astype(np.float32, copy=False) for x, _ in graphs])
+        edge_index = np.concatenate([np.zeros((2, 0), dtype=np.int64)]
+                                    + [ei.numpy().astype(np.int64, copy=False) for _, ei in graphs],
+                                    axis=1)
+
+        self._add(keys, x, n_nodes, edge_index, n_edges)
+
+        if self.segment_dir is not None:
+            os.makedirs(self.segment_dir, exist_ok=True)
+            name = f"{os.getpid()}-{time.time_ns()}.npz"
+            self._write(os.path.join(self.segment_dir, name),
+                        keys, x, _ptr(n_nodes), edge_index, _ptr(n_edges))
+            self._segments.add(name)
+
+    def _add(self, keys, x, n_nodes, edge_index, n_edges):
+        """
+        Register graphs; x / edge_index go to the tail (None: already
+        in the base). Keys seen before keep their first row.
+        """
+        if x is not None:
+            self._tail_x = np.concatenate([self._tail_x, np.asarray(x)])
+            self._tail_edges = np.concatenate([self._tail_edges, np.asarray(edge_index)], axis=1)
+
+        first = len(self.node_ptr) - 1
+        self.node_ptr = np.concatenate([self.node_ptr, self.node_ptr[-1] + np.cumsum(n_nodes)])
+        self.edge_ptr = np.concatenate([self.edge_ptr, self.edge_ptr[-1] + np.cumsum(n_edges)])
+
+        for row, k in enumerate(keys, first):
+            self.index.setdefault(k, row)
+
+    def _nodes(self, node_rows):
+        return _take(self._base_x, self._tail_x, node_rows, 0)
+
+    def _edges(self, edge_rows):
+        return _take(self._base_edges, self._tail_edges, edge_rows, 1)
+
+    def _graphs(self, rows):
+        """
+        Packed x, local edge_index and per-graph node / edge counts of
+        store rows, in order.
+        """
+        n_nodes = self.node_ptr[rows + 1] - self.node_ptr[rows]
+        n_edges = self.edge_ptr[rows + 1] - self.edge_ptr[rows]
+        x = self._nodes(_ranges(self.node_ptr[rows], n_nodes))
+        edge_index = self._edges(_ranges(self.edge_ptr[rows], n_edges))
+        return x, edge_index, n_nodes, n_edges
+
+    # ------------------------------------------------------
+    # Batch assembly
+    # ------------------------------------------------------
+    def batch(self, ids):
+        """
+        ids: (B, k) store rows, one row of ligand slots per graph.
+        Returns x, edge_index, batch tensors of the B disjoint-union
+        graphs, slots concatenated in order.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        x, edge_index, n_nodes, n_edges = self._graphs(ids.ravel())
+
+        # position of each slot's first node in the output
+        out_start = np.zeros(len(n_nodes), dtype=np.int64)
+        np.cumsum(n_nodes[:-1], out=out_start[1:])
+        edge_index += np.repeat(out_start, n_edges)
+
+        graph = np.repeat(np.arange(ids.shape[0], dtype=np.int64), ids.shape[1])
+        batch = np.repeat(graph, n_nodes)
+
+        return torch.from_numpy(x), torch.from_numpy(edge_index), torch.from_numpy(batch)
+
+    def sizes(self, ids):
+        """
+        (n_nodes, n_edges) of each row of ligand slots in ids.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        n_nodes = self.node_ptr[ids + 1] - self.node_ptr[ids]
+        n_edges = self.edge_ptr[ids + 1] - self.edge_ptr[ids]
+        return n_nodes.sum(axis=1), n_edges.sum(axis=1)
+
+    def node_sums(self, rows):
+        """
+        Per-ligand sums of node features, (len(rows), 11) float64.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        n_nodes = self.node_ptr[rows + 1] - self.node_ptr[rows]
+        out = np.zeros((len(rows), N_FEATURES))
+        if n_nodes.sum() == 0:
+            return out
+
+        x = np.asarray(self._nodes(_ranges(self.node_ptr[rows], n_nodes)), dtype=np.float64)
+        starts = np.zeros(len(rows), dtype=np.int64)
+        np.cumsum(n_nodes[:-1], out=starts[1:])
+        nonempty = n_nodes > 0
+        out[nonempty] = np.add.reduceat(x, starts[nonempty], axis=0)
+        return out
+
+
+def budget_batches(n_nodes, n_edges, node_budget: int, edge_budget: int = 0):
+    """
+    Graph indices packed into batches of at most node_budget nodes
+    (and edge_budget edges, if set), smallest graphs first so each
+    batch holds graphs of similar size. A graph larger than the
+    budget gets a batch of its own.
+    """
+    order = np.argsort(n_nodes, kind="stable")
+    nodes, edges = n_nodes[order].tolist(), n_edges[order].tolist()
+
+    bounds, total_n, total_e = [0], 0, 0
+    for i, (n, e) in enumerate(zip(nodes, edges)):
+        over = total_n + n > node_budget or (edge_budget and total_e + e > edge_budget)
+        if over and i > bounds[-1]:
+            bounds.append(i)
+            total_n, total_e = 0, 0
+        total_n += n
+        total_e += e
+    bounds.append(len(order))
+
+    return [order[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _ptr(counts) -> np.ndarray:
+    ptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=ptr[1:])
+    return ptr
+
+
+def _ranges(starts, lengths) -> np.ndarray:
+    """
+    concat(arange(s, s + n) for s, n in zip(starts, lengths))
+    """
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.cumsum(lengths)
+    return np.arange(total, dtype=np.int64) + np.repeat(starts - (ends - lengths), lengths)
+
+
+def _take(base, tail, rows, axis):
+    """
+    Rows of base followed by tail along axis, without joining them
+    (base may be a map of the store file).
+    """
+    n_base = base.shape[axis]
+    if len(rows) == 0 or rows.max() < n_base:
+        return np.take(base, rows, axis=axis)
+    if rows.min() >= n_base:
+        return np.take(tail, rows - n_base, axis=axis)
+
+    in_base = rows < n_base
+    shape = list(base.shape)
+    shape[axis] = len(rows)
+    out = np.empty(shape, dtype=base.dtype)
+
+    index = [slice(None)] * base.ndim
+    index[axis] = in_base
+    out[tuple(index)] = np.take(base, rows[in_base], axis=axis)
+    index[axis] = ~in_base
+    out[tuple(index)] = np.take(tail, rows[~in_base] - n_base, axis=axis)
+    return out
+
+
+_STORE = None
+
+
+def get_store() -> LigandGraphStore:
+    """
+    Process-wide graph store.
+    """
+    global _STORE
+    if _STORE is None:
+        _STORE = LigandGraphStore(STORE_PATH)
+    return _STORE
@@ -0,0 +1,98 @@
+# ==========================================================
+# engine/ingest.py
+# Vectorised database ingestion
+#
+# The wide L1..L6 / D1..D6 / DA1..DA6 layout is reshaped once
+# into a long (row, slot) ligand-occurrence table; donor modes,
+# seed ligands and anchor ligands are grouped-unique queries
+# over it instead of per-row Python loops, so they scale with
+# the number of slots, not with pandas row iteration.
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+
+N_SLOTS = 6
+L_COLS = [f"L{i}" for i in range(1, N_SLOTS + 1)]
+D_COLS = [f"D{i}" for i in range(1, N_SLOTS + 1)]
+DA_COLS = [f"DA{i}" for i in range(1, N_SLOTS + 1)]
+
+
+def _ligand_mask(wide: pd.DataFrame) -> np.ndarray:
+    # real ligand slots: a SMILES, not empty and not the "X" placeholder
+    return (wide.notna() & wide.ne("X")).to_numpy()
+
+
+def ligand_occurrences(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per real ligand slot, row-major over (row, slot):
+        row, slot (1..6), smiles, donors (NaN if unknown), donor_atom
+    """
+    lig = df[L_COLS]
+    rows, slots = np.nonzero(_ligand_mask(lig))
+
+    donors = df[D_COLS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    if all(c in df.columns for c in DA_COLS):
+        donor_atom = df[DA_COLS].to_numpy(dtype=object)[rows, slots]
+    else:
+        donor_atom = np.full(len(rows), None, dtype=object)
+
+    return pd.DataFrame({
+        "row": rows.astype(np.int64),
+        "slot": (slots + 1).astype(np.int8),
+        "smiles": lig.to_numpy(dtype=object)[rows, slots],
+        "donors": donors[rows, slots],
+        "donor_atom": donor_atom,
+    })
+
+
+def donor_modes(occurrences: pd.DataFrame) -> pd.DataFrame:
+    """
+    Every (smiles, denticity) pair with a known denticity, ligands in
+    first-occurrence order, denticities ascending.
+    """
+    known = occurrences[occurrences["donors"].notna()]
+    pairs = pd.DataFrame({
+        "smiles": known["smiles"].to_numpy(),
+        "donors": known["donors"].to_numpy().astype(np.int64),
+    }).drop_duplicates()
+
+    first, _ = pd.factorize(pairs["smiles"], sort=False)
+    order = np.lexsort((pairs["donors"].to_numpy(), first))
+    return pairs.iloc[order].reset_index(drop=True)
+
+
+def seed_ligands(seed_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sorted distinct L1..L6 values of the seed complexes.
+    """
+    values = pd.unique(seed_df[L_COLS].to_numpy(dtype=object).ravel())
+    values = pd.Series(values, dtype=object).dropna().astype(str).unique()
+    return pd.DataFrame({"smiles": sorted(values)})
+
+
+def anchor_ligands(anchor_db: pd.DataFrame, zfs_col: str, target_zfs: float,
+                   k: int, known=None) -> set:
+    """
+    Ligands of the k complexes closest to target_zfs (optionally only
+    those in known).
+    """
+    dist = (pd.to_numeric(anchor_db[zfs_col], errors="coerce") - target_zfs).abs()
+    anchors = anchor_db.loc[dist.nsmallest(k).index, L_COLS].to_numpy(dtype=object).ravel()
+    return _known(anchors, known)
+
+
+def complex_ligands(ligand_strings, known=None) -> set:
+    """
+    Distinct ligands of ";"-joined complexes (optionally only those in known).
+    """
+    s = pd.Series(ligand_strings, dtype=object).dropna().astype(str)
+    return _known(s.str.split(";").explode().to_numpy(dtype=object), known)
+
+
+def _known(values, known) -> set:
+    values = pd.unique(pd.Series(values, dtype=object).dropna())
+    out = {v for v in values if isinstance(v, str)}
+    if known is not None:
+        out = {v for v in out if v in known}
+    return out
@@ -0,0 +1,91 @@
+# ==========================================================
+# engine/lineage.py
+# Append-only mutation lineage store (SQLite)
+#
+# One row per (parent, child, mutation, generation), unique
+# on insert, so a generation only writes its own new rows
+# instead of re-reading and de-duplicating the whole history.
+# Ancestry / descendants are recursive queries over the
+# parent and child indexes.
+# ==========================================================
+
+import os
+import sqlite3
+
+import pandas as pd
+
+LINEAGE_PATH = os.environ.get("LINEAGE_DB", "mutation_lineage.sqlite")
+
+COLUMNS = ["parent", "child", "mutation", "generation"]
+
+
+class LineageStore:
+
+    def __init__(self, path: str = LINEAGE_PATH):
+        self.path = path
+
+        # rollback journal, not WAL: the file alone is the checkpoint
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS lineage ("
+            " parent TEXT NOT NULL, child TEXT NOT NULL,"
+            " mutation TEXT NOT NULL, generation INTEGER NOT NULL,"
+            " PRIMARY KEY (parent, child, mutation, generation))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS lineage_child ON lineage (child)")
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM lineage").fetchone()[0]
+
+    def add(self, rows: pd.DataFrame) -> int:
+        """
+        Insert new lineage rows; returns how many were not stored yet.
+        """
+        if rows is None or rows.empty:
+            return 0
+
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO lineage VALUES (?, ?, ?, ?)",
+            [(p, c, m, int(g)) for p, c, m, g in rows[COLUMNS].itertuples(index=False)]
+        )
+        self._db.commit()
+        return self._db.total_changes - before
+
+    def _query(self, sql, params=()) -> pd.DataFrame:
+        return pd.DataFrame(self._db.execute(sql, params).fetchall(), columns=COLUMNS)
+
+    def ancestry(self, smiles: str) -> pd.DataFrame:
+        """
+        Every lineage edge leading to smiles, newest generation first.
+        Seed / database ligands have none.
+        """
+        return self._query(
+            "WITH RECURSIVE up(parent, child, mutation, generation) AS ("
+            " SELECT * FROM lineage WHERE child = ?"
+            " UNION"
+            " SELECT l.* FROM lineage l JOIN up ON l.child = up.parent"
+            ") SELECT * FROM up ORDER BY generation DESC, child, parent",
+            (smiles,)
+        )
+
+    def descendants(self, smiles: str) -> pd.DataFrame:
+        """
+        Every lineage edge reachable from smiles, oldest generation first.
+        """
+        return self._query(
+            "WITH RECURSIVE down(parent, child, mutation, generation) AS ("
+            " SELECT * FROM lineage WHERE parent = ?"
+            " UNION"
+            " SELECT l.* FROM lineage l JOIN down ON l.parent = down.child"
+            ") SELECT * FROM down ORDER BY generation, parent, child",
+            (smiles,)
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        return self._query("SELECT * FROM lineage ORDER BY generation, parent, child")
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,58 @@
+# ==========================================================
+# engine/modes.py
+# One place for MODE names, databases and checkpoints
+# ==========================================================
+
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app says "X-ray" / "DFT", the CLI drivers say "crystal" / "optimized".
+MODE_ALIASES = {
+    "crystal": "crystal",
+    "x-ray": "crystal",
+    "xray": "crystal",
+    "optimized": "optimized",
+    "opt": "optimized",
+    "dft": "optimized",
+}
+
+MODE_CONFIG = {
+    "crystal": {
+        "database": "GA.csv",
+        "zfs_col": "zfs",
+        "ed_col": "E/D",
+        "zfs_model": "zfs_gnn_crystal.pth",
+        "zfs_scaler": "zfs_scaler_crystal.pkl",
+        "ed_model": "ed_gnn_crystal.pth",
+        "ed_scaler": "ed_scaler_crystal.pkl",
+    },
+    "optimized": {
+        "database": "opt_D.csv",
+        "zfs_col": "opt_zfs",
+        "ed_col": "opt_E/D",
+        "zfs_model": "zfs_gnn_opt.pth",
+        "zfs_scaler": "zfs_scaler_opt.pkl",
+        "ed_model": "ed_gnn_opt.pth",
+        "ed_scaler": "ed_scaler_opt.pkl",
+    },
+}
+
+
+def normalize_mode(mode: str) -> str:
+    """
+    Map any MODE spelling used by the app or the drivers
+    to "crystal" or "optimized".
+    """
+    key = str(mode).strip().lower()
+    if key not in MODE_ALIASES:
+        raise ValueError(f"Unknown MODE: {mode}")
+    return MODE_ALIASES[key]
+
+
+def mode_config(mode: str) -> dict:
+    return MODE_CONFIG[normalize_mode(mode)]
+
+
+def base_path(name: str) -> str:
+    return os.path.join(BASE_DIR, name)
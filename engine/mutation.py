@@ -0,0 +1,326 @@
+# ==========================================================
+# engine/mutation.py
+# Site-based ligand mutation with full lineage
+# Anchors come from opt_D.csv (opt_zfs)
+#
+# Each operator edits one sampled site of the parent (an RWMol
+# copy) instead of enumerating every product; the sites are
+# found once per parent and cached with it. Operators can emit
+# k distinct children (MUTATION_CHILDREN) per parent.
+#
+# Parents are parsed once into a MolCache (RDKit binaries)
+# and reused every generation. Each parent gets its own RNG
+# stream seeded from (seed, generation, parent), so the
+# children do not depend on parent order or on how parents
+# are spread over MUTATION_WORKERS processes.
+# ==========================================================
+
+import hashlib
+import multiprocessing as mp
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from rdkit import Chem
+
+from engine.ingest import anchor_ligands, complex_ligands
+from engine.novelty import NoveltyIndex
+
+K_ANCHORS = 15
+
+MUTATION_WORKERS = int(os.environ.get("MUTATION_WORKERS", 0))
+CHILDREN_PER_OPERATOR = int(os.environ.get("MUTATION_CHILDREN", 1))
+
+DONOR_ATOMS = {"N", "O", "S", "P", "Se"}
+HALOGENS = ["F", "Cl", "Br", "I"]
+
+ATOM_MUTATIONS = {
+    "O": ["S", "Se"],
+    "N": ["P"],
+}
+
+# ----------------------------------------------------------
+# Utilities
+# ----------------------------------------------------------
+def is_near_donor(atom):
+    return any(n.GetSymbol() in DONOR_ATOMS for n in atom.GetNeighbors())
+
+def safe_smiles(mol):
+    try:
+        Chem.SanitizeMol(mol)
+        return Chem.MolToSmiles(mol)
+    except Exception:
+        return None
+
+def as_mol(parent):
+    """
+    SMILES or Mol -> Mol (None if RDKit cannot parse it).
+    """
+    if isinstance(parent, Chem.Mol):
+        return parent
+    return Chem.MolFromSmiles(parent)
+
+def parent_rng(seed: int, gen: int, parent: str) -> random.Random:
+    digest = hashlib.sha1(f"{seed}|{gen}|{parent}".encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+class MolCache:
+    """
+    smiles -> (sanitized Mol as an RDKit binary, mutation sites), so
+    parents are cheap to copy and to ship to worker processes.
+    (None, None) = unparsable.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entry(self, smiles: str):
+        if smiles in self._entries:
+            self.hits += 1
+        else:
+            self.misses += 1
+            mol = Chem.MolFromSmiles(smiles)
+            if mol is None:
+                self._entries[smiles] = (None, None)
+            else:
+                self._entries[smiles] = (mol.ToBinary(), mutation_sites(mol))
+        return self._entries[smiles]
+
+    def get(self, smiles: str):
+        b, _ = self.entry(smiles)
+        return Chem.Mol(b) if b is not None else None
+
+def mode_map_from_df(mode_df: pd.DataFrame) -> dict:
+    """
+    smiles -> set of denticities
+    """
+    return mode_df.groupby("smiles")["donors"].apply(set).to_dict()
+
+# ----------------------------------------------------------
+# Aromatic C–H substitution: the alkyl fragment is bonded
+# to a [cH] site through its first atom
+# ----------------------------------------------------------
+ALKYL_GROUPS = {
+    "methyl_addition": "C",
+    "ethyl_addition": "CC",
+    "isopropyl_addition": "C(C)C",
+}
+FRAGMENTS = {name: Chem.MolFromSmiles(smi) for name, smi in ALKYL_GROUPS.items()}
+
+CH_SITE = Chem.MolFromSmarts("[cH]")
+
+def mutation_sites(mol) -> dict:
+    """
+    Atom indices each operator can edit.
+    """
+    return {
+        "aromatic_ch": [m[0] for m in mol.GetSubstructMatches(CH_SITE)],
+        "atom_type": [
+            a.GetIdx() for a in mol.GetAtoms()
+            if a.GetSymbol() in ATOM_MUTATIONS and not is_near_donor(a)
+        ],
+        "halogen": [
+            a.GetIdx() for a in mol.GetAtoms()
+            if a.GetSymbol() in HALOGENS and not is_near_donor(a)
+        ],
+    }
+
+# ----------------------------------------------------------
+# Parent ligand pool
+# ----------------------------------------------------------
+def select_parents(anchor_db: pd.DataFrame, mode_map: dict, target_zfs: float,
+                   elite: pd.DataFrame = None, zfs_col: str = "opt_zfs"):
+    """
+    Ligands of the K_ANCHORS database complexes closest to the target,
+    plus every known ligand of the elite memory.
+    """
+    parents = anchor_ligands(anchor_db, zfs_col, target_zfs, K_ANCHORS, mode_map)
+
+    if elite is not None:
+        parents |= complex_ligands(elite["ligands"], mode_map)
+
+    return sorted(parents)
+
+# ----------------------------------------------------------
+# Mutation operators
+# ----------------------------------------------------------
+def _sample_children(mol, sites, edit, rng, k, is_new=None):
+    """
+    Up to k distinct children edit(mol, site) -> SMILES, trying the
+    sites in random order until enough of them sanitize (and pass
+    is_new, when given).
+    """
+    children = []
+    for site in rng.sample(sites, len(sites)):
+        smi = edit(mol, site)
+        if smi and smi not in children and (is_new is None or is_new(smi)):
+            children.append(smi)
+            if len(children) >= k:
+                break
+    return children
+
+def aromatic_alkylation(parent, group, rng=random, k=1, sites=None, is_new=None):
+    mol = as_mol(parent)
+    if mol is None:
+        return []
+    if sites is None:
+        sites = mutation_sites(mol)
+
+    fragment = FRAGMENTS[group]
+
+    def edit(mol, site):
+        rw = Chem.RWMol(Chem.CombineMols(mol, fragment))
+        atom = rw.GetAtomWithIdx(site)
+        if atom.GetNumExplicitHs():
+            atom.SetNumExplicitHs(atom.GetNumExplicitHs() - 1)
+        rw.AddBond(site, mol.GetNumAtoms(), Chem.BondType.SINGLE)
+        return safe_smiles(rw)
+
+    return _sample_children(mol, sites["aromatic_ch"], edit, rng, k, is_new)
+
+def atom_type_mutation(parent, rng=random, k=1, sites=None, is_new=None):
+    mol = as_mol(parent)
+    if mol is None:
+        return []
+    if sites is None:
+        sites = mutation_sites(mol)
+
+    def edit(mol, site):
+        rw = Chem.RWMol(mol)
+        a = rw.GetAtomWithIdx(site)
+        a.SetAtomicNum(
+            Chem.Atom(rng.choice(ATOM_MUTATIONS[a.GetSymbol()])).GetAtomicNum()
+        )
+        return safe_smiles(rw)
+
+    return _sample_children(mol, sites["atom_type"], edit, rng, k, is_new)
+
+def halogen_exchange(parent, rng=random, k=1, sites=None, is_new=None):
+    mol = as_mol(parent)
+    if mol is None:
+        return []
+    if sites is None:
+        sites = mutation_sites(mol)
+
+    def edit(mol, site):
+        rw = Chem.RWMol(mol)
+        a = rw.GetAtomWithIdx(site)
+        choices = [h for h in HALOGENS if h != a.GetSymbol()]
+        a.SetAtomicNum(Chem.Atom(rng.choice(choices)).GetAtomicNum())
+        return safe_smiles(rw)
+
+    return _sample_children(mol, sites["halogen"], edit, rng, k, is_new)
+
+# ----------------------------------------------------------
+# Run mutations + lineage
+# ----------------------------------------------------------
+def mutate_parent(binary, sites, parent: str, gen: int, seed: int,
+                  k: int = CHILDREN_PER_OPERATOR, novelty: NoveltyIndex = None):
+    """
+    Every operator applied to one parent.
+    Returns ([(child, mutation name)], number of known children skipped).
+    """
+    if binary is None:
+        return [], 0
+
+    mol = Chem.Mol(binary)
+    rng = parent_rng(seed, gen, parent)
+    children = []
+    skipped = 0
+
+    def is_new(smi):
+        nonlocal skipped
+        if smi in novelty:
+            skipped += 1
+            return False
+        return True
+
+    check = is_new if novelty is not None else None
+
+    for name in ALKYL_GROUPS:
+        children += [(m, name) for m in aromatic_alkylation(mol, name, rng, k, sites, check)]
+
+    children += [(m, "atom_type_substitution") for m in atom_type_mutation(mol, rng, k, sites, check)]
+    children += [(m, "halogen_exchange") for m in halogen_exchange(mol, rng, k, sites, check)]
+
+    return children, skipped
+
+_WORKER_NOVELTY = {}
+
+def _mutate_job(args):
+    *args, novelty = args
+    if isinstance(novelty, str):
+        # worker process: its own read-only view of the index file
+        if novelty not in _WORKER_NOVELTY:
+            _WORKER_NOVELTY[novelty] = NoveltyIndex(novelty)
+        novelty = _WORKER_NOVELTY[novelty]
+        novelty.refresh()
+    return mutate_parent(*args, novelty)
+
+_POOL = None
+
+def _pool(workers):
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"))
+    return _POOL
+
+def mutate(parents, mode_map: dict, gen: int, seed: int = 42,
+           mol_cache: MolCache = None, workers: int = MUTATION_WORKERS,
+           k: int = CHILDREN_PER_OPERATOR, novelty: NoveltyIndex = None):
+    """
+    Apply every operator to every parent.
+    mode_map is updated in place with the children's donor modes.
+    With a novelty index, children it already holds are skipped (the
+    operator moves on to another site) and the new ones are added.
+
+    Returns (mutated ligand table, new lineage rows).
+    """
+    if mol_cache is None:
+        mol_cache = MolCache()
+
+    parallel = workers > 1 and len(parents) > 1
+    shared = novelty.path if (parallel and novelty is not None) else novelty
+
+    jobs = [(*mol_cache.entry(p), p, gen, seed, k, shared) for p in parents]
+    if parallel:
+        results = _pool(workers).map(_mutate_job, jobs, chunksize=4)
+    else:
+        results = map(_mutate_job, jobs)
+
+    mutated = set(parents)
+    lineage = []
+    skipped = 0
+
+    for p, (children, n_skipped) in zip(parents, results):
+        skipped += n_skipped
+        for child, name in children:
+            mode_map[child] = mode_map[p].copy()
+            mutated.add(child)
+            lineage.append({
+                "parent": p,
+                "child": child,
+                "mutation": name,
+                "generation": gen
+            })
+
+    if novelty is not None:
+        n_new = novelty.add_many(sorted({row["child"] for row in lineage}))
+        n_seen = n_new + skipped
+        print(
+            f"[INFO] Novelty: {n_new} new children, {skipped} known skipped "
+            f"({n_new / max(n_seen, 1):.1%} novel)"
+        )
+
+    rows = []
+    for lig in mutated:
+        for d in mode_map.get(lig, []):
+            rows.append({"smiles": lig, "donors": d})
+
+    return pd.DataFrame(rows, columns=["smiles", "donors"]), pd.DataFrame(lineage)
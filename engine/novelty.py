@@ -0,0 +1,69 @@
+# ==========================================================
+# engine/novelty.py
+# Persistent novelty index of generated ligands
+#
+# An append-only file of uint64 hashes of canonical SMILES,
+# shared by every generation and campaign, so the GA does
+# not spend mutation or oracle budget on ligands it has
+# already produced. NOVELTY_INDEX=0 disables it.
+# ==========================================================
+
+import hashlib
+import os
+
+import numpy as np
+
+NOVELTY_PATH = os.environ.get("NOVELTY_INDEX", "novelty_index.u64")
+ENABLED = NOVELTY_PATH not in ("", "0")
+
+
+def smiles_hash(smiles: str) -> int:
+    digest = hashlib.sha1(str(smiles).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+class NoveltyIndex:
+    """
+    Hashed set of canonical SMILES (MolToSmiles output, as the
+    mutation operators produce). Other processes may append to the
+    same file; refresh() picks up what they wrote.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path if path is not None else NOVELTY_PATH
+        self._hashes = set()
+        self._offset = 0
+        self.refresh()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, smiles):
+        return smiles_hash(smiles) in self._hashes
+
+    def refresh(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        n = len(data) // 8
+        self._hashes.update(np.frombuffer(data[:n * 8], dtype="<u8").tolist())
+        self._offset += n * 8
+
+    def add_many(self, smiles) -> int:
+        """
+        Record new SMILES; returns how many were not known yet.
+        """
+        new = []
+        for smi in smiles:
+            h = smiles_hash(smi)
+            if h not in self._hashes:
+                self._hashes.add(h)
+                new.append(h)
+
+        # refresh() re-reads these later; adding them twice is harmless
+        if new:
+            with open(self.path, "ab") as f:
+                f.write(np.asarray(new, dtype="<u8").tobytes())
+        return len(new)
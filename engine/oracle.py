@@ -0,0 +1,636 @@
+# ==========================================================
+# engine/oracle.py
+# Oracle screening (CRYSTAL + OPTIMIZED)
+# NO retraining
+# NO dimension guessing
+# ==========================================================
+
+import math
+import multiprocessing as mp
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import torch
+from torch_geometric.data import Data
+
+from ligand_dataset import ligand_slot_key
+from model import LigandGNN, StackedLigandGNN
+from engine.embedding_cache import LigandEmbeddingCache
+from engine import export as oracle_export
+from engine.graph_store import budget_batches, get_store
+from engine.modes import MODE_CONFIG, base_path, normalize_mode
+from engine.prescreen import ESTIMATED, PRESCREEN, PreScreen, complex_descriptors
+from engine.registry import ComplexArrays, LigandRegistry
+from engine import prediction_store
+
+DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# 🔴 MUST match training-time features
+NODE_FEATURE_DIM = 11
+
+ED_CUTOFF = 0.22
+ELITE_FRAC = 0.10
+
+# Streaming screens keep at most this many elite rows (0 = ELITE_FRAC only)
+ELITE_TOP_K = int(os.environ.get("ELITE_TOP_K", 0))
+BATCH_SIZE = 64
+
+# Pack GNN batches up to a node / edge budget instead of BATCH_SIZE
+# complexes: an integer, "auto" (calibrated on the first screen) or 0
+NODE_BUDGET = os.environ.get("ORACLE_NODE_BUDGET", "0")
+EDGE_BUDGET = int(os.environ.get("ORACLE_EDGE_BUDGET", 0))
+CALIBRATION_BUDGETS = (256, 512, 1024, 2048, 4096, 8192, 16384)
+CALIBRATION_SAMPLE = 512
+
+# Score complexes from cached per-ligand embeddings (exact up to fp rounding)
+EMBEDDING_CACHE = os.environ.get("ORACLE_EMBEDDING_CACHE", "1") != "0"
+CACHED_CHUNK = 8192
+
+# Run all checkpoints as one StackedLigandGNN (scalers folded in)
+FUSED = os.environ.get("ORACLE_FUSED", "1") != "0"
+
+# Neighbour sums of the fused model: "csr" (sparse matmul) or "scatter"
+AGGREGATION = os.environ.get("ORACLE_AGGREGATION", "csr")
+
+# ORACLE_EXPORT=fp32|int8: TorchScript exports (engine/export.py)
+# instead of the eager checkpoints; not combined with ORACLE_FUSED
+EXPORT = oracle_export.EXPORT
+
+# Also score with the other MODE's checkpoints (crystal + DFT side by side)
+ALL_CHECKPOINTS = os.environ.get("ORACLE_ALL_CHECKPOINTS", "0") == "1"
+
+# Send predictions to a running `python -m engine.oracle_server`
+ORACLE_URL = os.environ.get("ORACLE_URL", "")
+
+# CPU sharding: ORACLE_WORKERS processes x ORACLE_WORKER_THREADS torch threads
+ORACLE_WORKERS = int(os.environ.get("ORACLE_WORKERS", 0))
+ORACLE_WORKER_THREADS = int(os.environ.get("ORACLE_WORKER_THREADS", 1))
+SHARD_SIZE = 4096
+
+
+def load_checkpoint(model_file, scaler_file, device=DEVICE):
+    model = LigandGNN(node_feature_dim=NODE_FEATURE_DIM).to(device)
+    model.load_state_dict(torch.load(base_path(model_file), map_location=device))
+    model.eval()
+
+    with open(base_path(scaler_file), "rb") as f:
+        scaler = pickle.load(f)
+
+    return model, scaler
+
+
+def load_exported_checkpoint(model_file, scaler_file, kind, device=DEVICE):
+    """
+    Exported model of a checkpoint (output in original units),
+    exported first if the artifact is missing or stale.
+    """
+    digest = prediction_store.files_digest([model_file, scaler_file])
+    path = oracle_export.export_path(model_file, kind)
+
+    exported = oracle_export.load_exported(path, kind, digest, device)
+    if exported is None:
+        model, scaler = load_checkpoint(model_file, scaler_file, torch.device("cpu"))
+        oracle_export.export_model(model, scaler, path, kind, digest)
+        print(f"[INFO] Exported {model_file} -> {path}")
+        exported = oracle_export.load_exported(path, kind, digest, device)
+    return exported
+
+
+def _open_store(specs, export=EXPORT):
+    files = [f for _, model, scaler in specs for f in (model, scaler)]
+    model_id = prediction_store.files_digest(files)
+    # exported / quantized predictions are kept apart from float32 ones
+    if export:
+        model_id += f"|{export}"
+    return prediction_store.PredictionStore(model_id, prediction_store.STORE_PATH)
+
+
+def checkpoint_specs(mode: str, all_checkpoints: bool = False):
+    """
+    [(output column, model file, scaler file)]: the MODE's ZFS / E/D
+    pair first, then optionally the other MODE as *_<mode> columns.
+    """
+    mode = normalize_mode(mode)
+    modes = [mode]
+    if all_checkpoints:
+        modes += [m for m in MODE_CONFIG if m != mode]
+
+    specs = []
+    for m in modes:
+        cfg = MODE_CONFIG[m]
+        suffix = "" if m == mode else f"_{m}"
+        specs.append((f"zfs_pred{suffix}", cfg["zfs_model"], cfg["zfs_scaler"]))
+        specs.append((f"ed_pred{suffix}", cfg["ed_model"], cfg["ed_scaler"]))
+    return specs
+
+
+class Oracle:
+    """
+    ZFS + E/D GNNs for one MODE, loaded once and reused for every
+    generation. predict() returns one column per checkpoint, in
+    self.columns order (zfs_pred, ed_pred, ...).
+    """
+
+    def __init__(self, mode: str, device=DEVICE, batch_size: int = BATCH_SIZE,
+                 embedding_cache: bool = EMBEDDING_CACHE,
+                 store: bool = prediction_store.ENABLED,
+                 fused: bool = FUSED, all_checkpoints: bool = ALL_CHECKPOINTS,
+                 node_budget=NODE_BUDGET, edge_budget: int = EDGE_BUDGET,
+                 export: str = EXPORT, prescreen: bool = PRESCREEN):
+        self.mode = normalize_mode(mode)
+        self.device = device
+        self.batch_size = batch_size
+        self.node_budget = node_budget if node_budget == "auto" else int(node_budget)
+        self.edge_budget = edge_budget
+
+        specs = checkpoint_specs(self.mode, all_checkpoints)
+        self.columns = [col for col, _, _ in specs]
+
+        if export:
+            self.models = [load_exported_checkpoint(model, scaler, export, device)
+                           for _, model, scaler in specs]
+            self.scalers = [None] * len(self.models)
+        elif fused:
+            loaded = [load_checkpoint(model, scaler, device) for _, model, scaler in specs]
+            stacked = StackedLigandGNN(
+                [m for m, _ in loaded], [sc for _, sc in loaded], AGGREGATION
+            ).to(device)
+            self.models, self.scalers = [stacked], [None]
+        else:
+            loaded = [load_checkpoint(model, scaler, device) for _, model, scaler in specs]
+            self.models = [m for m, _ in loaded]
+            self.scalers = [sc for _, sc in loaded]
+
+        self.graph_store = get_store()
+        self.embedding_cache = None
+        if embedding_cache:
+            self.embedding_cache = LigandEmbeddingCache(self.models, device,
+                                                        graph_store=self.graph_store)
+            self._set_budget(self.node_budget)
+
+        self.store = _open_store(specs, export) if store else None
+        self.prescreen = PreScreen() if prescreen else None
+
+    def _outputs(self, outs):
+        """
+        Per-model outputs -> (B, n_columns) array in original units.
+        Fused models come back already inverse-scaled.
+        """
+        cols = []
+        for out, scaler in zip(outs, self.scalers):
+            out = out.cpu().numpy().reshape(len(out), -1)
+            if scaler is not None:
+                out = scaler.inverse_transform(out)
+            cols.append(out)
+        return np.concatenate(cols, axis=1)
+
+    def predict(self, ligand_lists):
+        """
+        ligand_lists: list of SMILES lists (one list per complex)
+        Returns a (n_complexes, len(self.columns)) float array.
+        """
+        if len(ligand_lists) == 0:
+            return np.zeros((0, len(self.columns)))
+
+        if self.node_budget == "auto":
+            self.calibrate(ligand_lists)
+
+        if self.embedding_cache is not None:
+            return self._predict_cached(ligand_lists)
+
+        return self._predict_graphs(self._store_rows(ligand_lists))
+
+    def _store_rows(self, ligand_lists):
+        keys = [ligand_slot_key(row, [], i) for row in ligand_lists for i in range(6)]
+        return self.graph_store.rows(keys).reshape(-1, 6)
+
+    def _batches(self, store_rows, node_budget):
+        if not node_budget:
+            n = len(store_rows)
+            return [np.arange(a, min(a + self.batch_size, n)) for a in range(0, n, self.batch_size)]
+        n_nodes, n_edges = self.graph_store.sizes(store_rows)
+        return budget_batches(n_nodes, n_edges, node_budget, self.edge_budget)
+
+    @torch.no_grad()
+    def _predict_graphs(self, store_rows, node_budget=None):
+        """
+        Full complex graphs, assembled batch by batch from the graph
+        store (same graphs as LigandCombinationDataset + DataLoader).
+        """
+        if node_budget is None:
+            node_budget = self.node_budget
+
+        preds = np.zeros((len(store_rows), len(self.columns)))
+        for rows in self._batches(store_rows, node_budget):
+            x, edge_index, batch = self.graph_store.batch(store_rows[rows])
+            data = Data(x=x, edge_index=edge_index, batch=batch).to(self.device)
+            preds[rows] = self._outputs([model(data) for model in self.models])
+
+        return preds
+
+    # ------------------------------------------------------
+    # Batch-size calibration
+    # ------------------------------------------------------
+    def _set_budget(self, node_budget):
+        self.node_budget = node_budget
+        if self.embedding_cache is not None and node_budget != "auto":
+            self.embedding_cache.node_budget = node_budget
+
+    def calibrate(self, ligand_lists, budgets=CALIBRATION_BUDGETS,
+                  sample: int = CALIBRATION_SAMPLE) -> int:
+        """
+        Time the forward pass on up to `sample` of these complexes with
+        BATCH_SIZE batches and with each node budget; keep the fastest
+        budget for this process. Returns it (0 = fixed batches).
+        With the embedding cache only the ligand embedding batches
+        depend on the budget, so those are timed, on the distinct
+        ligands of the sample; otherwise the full complex graphs.
+        """
+        step = max(1, len(ligand_lists) // sample)
+        ligand_lists = list(ligand_lists[::step][:sample])
+
+        if self.embedding_cache is not None:
+            unit, batch_size = "ligands", self.embedding_cache.batch_size
+            keys = sorted({ligand_slot_key(row, [], i) for row in ligand_lists for i in range(6)})
+
+            def rate(budget):
+                return self.embedding_cache.rate(keys, budget)
+        else:
+            unit, batch_size = "complexes", self.batch_size
+            store_rows = self._store_rows(ligand_lists)
+
+            def rate(budget):
+                t0 = time.perf_counter()
+                self._predict_graphs(store_rows, budget)
+                return len(store_rows) / max(time.perf_counter() - t0, 1e-9)
+
+        rate(0)  # warm-up
+        baseline = rate(0)
+        rates = {b: rate(b) for b in budgets}
+        best = max(rates, key=rates.get)
+        if rates[best] <= baseline:
+            best = 0
+
+        self._set_budget(best)
+        print(
+            f"[INFO] Oracle batching: {batch_size} {unit}/batch "
+            f"{baseline:.0f} {unit}/s -> "
+            + (f"{best} nodes/batch {rates[best]:.0f} {unit}/s" if best else "kept")
+        )
+        return best
+
+    @torch.no_grad()
+    def _predict_cached(self, ligand_lists):
+        """
+        Gather cached ligand embeddings, mean-pool, run the MLP heads.
+        """
+        return self._readout(self.embedding_cache.ligand_ids(ligand_lists))
+
+    @torch.no_grad()
+    def _readout(self, ids):
+        cache = self.embedding_cache
+        preds = []
+        for start in range(0, len(ids), CACHED_CHUNK):
+            chunk = ids[start:start + CACHED_CHUNK]
+            preds.append(self._outputs([
+                model.readout(cache.pooled(chunk, m))
+                for m, model in enumerate(self.models)
+            ]))
+
+        return np.concatenate(preds)
+
+    def predict_arrays(self, complexes: ComplexArrays, registry: LigandRegistry):
+        """
+        predict() for ComplexArrays. Registry ids are mapped to cache /
+        graph store rows once per distinct ligand instead of going
+        through SMILES lists.
+        """
+        if len(complexes) == 0:
+            return np.zeros((0, len(self.columns)))
+
+        if self.node_budget == "auto":
+            step = max(1, len(complexes) // CALIBRATION_SAMPLE)
+            self.calibrate(complexes.take(np.arange(0, len(complexes), step)).smiles_lists(registry))
+
+        # empty slots (-1) are the ("X", "X") fallback node, as in predict()
+        uniq, inverse = np.unique(complexes.ids, return_inverse=True)
+        keys = [
+            ligand_slot_key([registry.smiles[i]] if i >= 0 else [], [], 0)
+            for i in uniq.tolist()
+        ]
+        inverse = inverse.reshape(complexes.ids.shape)
+
+        if self.embedding_cache is None:
+            return self._predict_graphs(self.graph_store.rows(keys)[inverse])
+
+        rows = self.embedding_cache.rows(keys)
+        ids = rows[torch.from_numpy(inverse).to(rows.device)]
+        return self._readout(ids)
+
+    def screen(self, df: pd.DataFrame, verbose: bool = True) -> pd.DataFrame:
+        """
+        Adds zfs_pred / ed_pred (and any extra checkpoint columns)
+        to a generated_complexes table.
+        """
+        ligand_lists = df["ligands"].astype(str).str.split(";").tolist()
+
+        if self.store is not None:
+            preds, st = prediction_store.screen_with_store(
+                self.store, prediction_store.complex_keys(df),
+                lambda rows: self.predict([ligand_lists[r] for r in rows]),
+                len(self.columns),
+            )
+            if verbose:
+                self._store_report(st)
+        else:
+            preds = self.predict(ligand_lists)
+
+        if verbose:
+            self.report()
+
+        df = df.copy()
+        for j, col in enumerate(self.columns):
+            df[col] = preds[:, j]
+        return df
+
+    def screen_arrays(self, complexes: ComplexArrays, registry: LigandRegistry,
+                      verbose: bool = True, target_zfs: float = None) -> pd.DataFrame:
+        """
+        Prediction columns (zfs_pred, ed_pred, ...) for ComplexArrays,
+        one row per complex in input order. Store keys are only built
+        for the distinct complexes. With a pre-screen and a target_zfs,
+        only the complexes it passes (and those already in the prediction
+        store) are scored by the GNNs; the others get NaN predictions
+        and True in an ESTIMATED column.
+        """
+        estimated = None
+        if self.prescreen is not None and target_zfs is not None:
+            preds, estimated, st = self._prescreen_arrays(complexes, registry, verbose, target_zfs)
+            if verbose:
+                self.prescreen.report(st)
+        else:
+            preds = self._score_arrays(complexes, registry, verbose)
+
+        if verbose:
+            self.report()
+
+        df = pd.DataFrame(preds, columns=self.columns)
+        if estimated is not None:
+            df[ESTIMATED] = estimated
+        return df
+
+    def _prescreen_arrays(self, complexes, registry, verbose, target_zfs):
+        n_columns = len(self.columns)
+        preds = np.full((len(complexes), n_columns), np.nan)
+        estimated = np.zeros(len(complexes), dtype=bool)
+
+        # stored predictions are free: only the misses go through the cascade
+        todo = np.arange(len(complexes))
+        if self.store is not None:
+            preds, found = prediction_store.lookup(
+                self.store, prediction_store.array_keys(complexes, registry), n_columns
+            )
+            todo = np.flatnonzero(~found)
+
+        st = {"rows": 0, "sampled": 0, "passed": 0}
+        if len(todo):
+            rest = complexes.take(todo)
+            preds[todo], estimated[todo], st = self.prescreen.screen(
+                complex_descriptors(rest, registry),
+                lambda rows: self._score_arrays(rest.take(rows), registry, verbose),
+                n_columns, target_zfs, ED_CUTOFF, ELITE_FRAC,
+            )
+        st["store_hits"] = len(complexes) - len(todo)
+        return preds, estimated, st
+
+    def _score_arrays(self, complexes, registry, verbose):
+        if self.store is None:
+            return self.predict_arrays(complexes, registry)
+
+        first, inverse = complexes.canonical_rows()
+        unique = complexes.take(first)
+        preds, st = prediction_store.screen_with_store(
+            self.store, prediction_store.array_keys(unique, registry),
+            lambda rows: self.predict_arrays(unique.take(rows), registry),
+            len(self.columns),
+        )
+        st["rows"] = len(complexes)
+        if verbose:
+            self._store_report(st)
+        return preds[inverse]
+
+    def _store_report(self, st):
+        print(
+            f"[INFO] Prediction store: {st['rows']} complexes, {st['unique']} unique, "
+            f"{st['store_hits']} from store, {st['scored']} scored "
+            f"({1 - st['scored'] / max(st['rows'], 1):.1%} saved)"
+        )
+
+    def report(self):
+        store = self.graph_store
+        total = store.hits + store.misses
+        if total:
+            print(
+                f"[INFO] Graph store: {store.hits} hits / {store.misses} featurized "
+                f"({store.hits / total:.1%}, process total, {len(store)} ligand graphs)"
+            )
+
+
+class RemoteOracle(Oracle):
+    """
+    Same interface as Oracle, but predict() goes to a shared oracle
+    server; the prediction store stays local.
+    """
+
+    # batches are packed (and calibrated) by the server
+    node_budget = 0
+
+    def __init__(self, mode: str, url: str,
+                 store: bool = prediction_store.ENABLED,
+                 all_checkpoints: bool = ALL_CHECKPOINTS, prescreen: bool = PRESCREEN):
+        from engine.oracle_server import OracleClient
+
+        self.mode = normalize_mode(mode)
+        self.all_checkpoints = bool(all_checkpoints)
+        self.client = OracleClient(url)
+
+        specs = checkpoint_specs(self.mode, all_checkpoints)
+        self.columns = [col for col, _, _ in specs]
+        self.embedding_cache = None
+        self.store = _open_store(specs) if store else None
+        self.prescreen = PreScreen() if prescreen else None
+
+    def predict(self, ligand_lists):
+        if len(ligand_lists) == 0:
+            return np.zeros((0, len(self.columns)))
+
+        columns, preds = self.client.predict(
+            ligand_lists, self.mode, self.all_checkpoints
+        )
+        if columns != self.columns:
+            raise RuntimeError(f"Oracle server returned columns {columns}, expected {self.columns}")
+        return preds
+
+    def predict_arrays(self, complexes: ComplexArrays, registry: LigandRegistry):
+        # no local graph store or models: SMILES lists go to the server
+        return self.predict(complexes.smiles_lists(registry))
+
+    def report(self):
+        m = self.client.metrics()
+        print(
+            f"[INFO] Oracle server: {m['requests']} requests, "
+            f"p50 {m['latency_ms_p50']:.0f} ms, p95 {m['latency_ms_p95']:.0f} ms"
+        )
+
+
+# ----------------------------------------------------------
+# CPU sharding
+# ----------------------------------------------------------
+_WORKER_ORACLE = None
+
+
+def _init_worker(mode, all_checkpoints, threads):
+    global _WORKER_ORACLE
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    _WORKER_ORACLE = Oracle(mode, device=torch.device("cpu"), store=False,
+                            all_checkpoints=all_checkpoints)
+
+
+def _predict_shard(ligand_lists):
+    return _WORKER_ORACLE.predict(ligand_lists)
+
+
+class ShardedOracle(Oracle):
+    """
+    Same interface as Oracle, with predict() split into contiguous
+    shards over a pool of spawned CPU workers. Each worker loads its
+    own models and keeps its own embedding cache; results come back
+    in input order. The prediction store stays in this process.
+
+    Scripts using it need an `if __name__ == "__main__":` guard.
+    """
+
+    # batches are packed (and calibrated) by each worker's Oracle
+    node_budget = 0
+
+    def __init__(self, mode: str, workers: int = ORACLE_WORKERS,
+                 threads: int = ORACLE_WORKER_THREADS,
+                 store: bool = prediction_store.ENABLED,
+                 all_checkpoints: bool = ALL_CHECKPOINTS, prescreen: bool = PRESCREEN):
+        self.mode = normalize_mode(mode)
+        self.workers = workers
+
+        specs = checkpoint_specs(self.mode, all_checkpoints)
+        self.columns = [col for col, _, _ in specs]
+        self.embedding_cache = None
+        self.store = _open_store(specs) if store else None
+        self.prescreen = PreScreen() if prescreen else None
+
+        self.pool = ProcessPoolExecutor(
+            workers, mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.mode, bool(all_checkpoints), threads),
+        )
+        self.last_seconds = 0.0
+
+    def predict(self, ligand_lists):
+        n = len(ligand_lists)
+        if n == 0:
+            return np.zeros((0, len(self.columns)))
+
+        # a few shards per worker so slow shards do not stall the rest
+        size = min(SHARD_SIZE, max(1, math.ceil(n / (self.workers * 4))))
+        shards = [list(ligand_lists[i:i + size]) for i in range(0, n, size)]
+
+        t0 = time.perf_counter()
+        preds = np.concatenate(list(self.pool.map(_predict_shard, shards)))
+        self.last_seconds = time.perf_counter() - t0
+        return preds
+
+    def predict_arrays(self, complexes: ComplexArrays, registry: LigandRegistry):
+        # no local graph store or models: SMILES lists go to the workers
+        return self.predict(complexes.smiles_lists(registry))
+
+    def report(self):
+        print(
+            f"[INFO] Sharded oracle: {self.workers} workers, "
+            f"last predict {self.last_seconds:.2f} s"
+        )
+
+
+@lru_cache(maxsize=None)
+def _load_oracle(mode: str, all_checkpoints: bool, url: str, workers: int) -> Oracle:
+    # Process-wide: the embedding cache keeps growing across campaigns
+    if url:
+        return RemoteOracle(mode, url, all_checkpoints=all_checkpoints)
+    if workers > 1:
+        return ShardedOracle(mode, workers, all_checkpoints=all_checkpoints)
+    return Oracle(mode, all_checkpoints=all_checkpoints)
+
+
+def load_oracle(mode: str, all_checkpoints: bool = ALL_CHECKPOINTS,
+                url: str = ORACLE_URL, workers: int = ORACLE_WORKERS) -> Oracle:
+    """
+    Process-wide oracle cache: one model load per MODE, a client for
+    the oracle server when ORACLE_URL is set, or a CPU worker pool
+    when ORACLE_WORKERS > 1.
+    """
+    return _load_oracle(normalize_mode(mode), bool(all_checkpoints), url or "", int(workers))
+
+
+def select_elite(df: pd.DataFrame, target_zfs: float,
+                 ed_cutoff: float = ED_CUTOFF, elite_frac: float = ELITE_FRAC):
+    """
+    Hard E/D cutoff, then the closest elite_frac to the target ZFS.
+    """
+    df = df[df["ed_pred"] <= ed_cutoff].copy()
+    print(f"[INFO] Passed E/D filter (<= {ed_cutoff}): {len(df)}")
+
+    df["abs_err"] = (df["zfs_pred"] - target_zfs).abs()
+    df.sort_values("abs_err", inplace=True)
+
+    n_elite = max(1, int(len(df) * elite_frac))
+    return df.head(n_elite)
+
+
+def select_elite_stream(chunks, target_zfs: float, n_complexes: int,
+                        ed_cutoff: float = ED_CUTOFF, elite_frac: float = ELITE_FRAC,
+                        top_k: int = ELITE_TOP_K, columns=("zfs_pred", "ed_pred")):
+    """
+    select_elite over an iterable of scored chunks, keeping only the
+    running best rows. The final elite_frac of the E/D survivors is
+    always within the best int(n_complexes * elite_frac), so the
+    result is the same as select_elite on the concatenated table;
+    top_k caps the buffer (and the elite) for very large populations.
+    columns are those of the (empty) result when there are no chunks.
+    """
+    cap = max(1, int(n_complexes * elite_frac))
+    if top_k:
+        cap = min(cap, top_k)
+
+    best = None
+    passed = 0
+    for df in chunks:
+        df = df[df["ed_pred"] <= ed_cutoff].copy()
+        passed += len(df)
+
+        df["abs_err"] = (df["zfs_pred"] - target_zfs).abs()
+        if best is not None:
+            df = pd.concat([best, df], ignore_index=True)
+        best = df.nsmallest(cap, "abs_err")
+
+    print(f"[INFO] Passed E/D filter (<= {ed_cutoff}): {passed}")
+
+    if best is None:
+        return pd.DataFrame(columns=[*columns, "abs_err"])
+
+    n_elite = max(1, int(passed * elite_frac))
+    if top_k:
+        n_elite = min(n_elite, top_k)
+    return best.head(n_elite)
@@ -0,0 +1,334 @@
+# ==========================================================
+# engine/oracle_server.py
+# Long-lived local oracle server
+#
+#   python -m engine.oracle_server --port 8765
+#
+# Keeps the zfs_gnn_* / ed_gnn_* checkpoints loaded, coalesces
+# concurrent requests into large batches and streams results
+# back as NDJSON. Point a campaign at it with
+#   ORACLE_URL=http://127.0.0.1:8765
+# ==========================================================
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from engine.modes import normalize_mode
+
+DEFAULT_PORT = 8765
+MAX_BATCH = 8192        # complexes per coalesced oracle call
+MAX_WAIT_MS = 5         # how long a batch waits for company
+CHUNK = 1024            # complexes per streamed response chunk
+
+# Graph / embedding caches are not thread-safe: one predict() at a time
+_PREDICT_LOCK = threading.Lock()
+
+
+class _Work:
+    __slots__ = ("ligand_lists", "offset", "done", "enqueued")
+
+    def __init__(self, ligand_lists, offset, done):
+        self.ligand_lists = ligand_lists
+        self.offset = offset
+        self.done = done
+        self.enqueued = time.perf_counter()
+
+
+class Coalescer:
+    """
+    One worker thread per oracle. Pending chunks from every request
+    are merged into a single predict() call of up to max_batch rows.
+    """
+
+    def __init__(self, oracle, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.oracle = oracle
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.pending = queue.Queue()
+        self.depth = 0
+        self.batches = 0
+        self.batch_rows = 0
+        self.wait_ms = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, ligand_lists, offset, done):
+        with self._lock:
+            self.depth += len(ligand_lists)
+        self.pending.put(_Work(ligand_lists, offset, done))
+
+    def _run(self):
+        while True:
+            items = [self.pending.get()]
+            rows = len(items[0].ligand_lists)
+            deadline = time.perf_counter() + self.max_wait
+
+            while rows < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self.pending.get(timeout=max(timeout, 0)) \
+                        if timeout > 0 else self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                items.append(item)
+                rows += len(item.ligand_lists)
+
+            start = time.perf_counter()
+            try:
+                with _PREDICT_LOCK:
+                    preds = self.oracle.predict([l for it in items for l in it.ligand_lists])
+                error = None
+            except Exception as e:
+                preds, error = None, f"{type(e).__name__}: {e}"
+
+            with self._lock:
+                self.depth -= rows
+                self.batches += 1
+                self.batch_rows += rows
+                for it in items:
+                    self.wait_ms.append((start - it.enqueued) * 1000)
+
+            pos = 0
+            for it in items:
+                n = len(it.ligand_lists)
+                it.done.put((it.offset, None if error else preds[pos:pos + n], error))
+                pos += n
+
+
+class OracleService:
+
+    def __init__(self, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+
+        self._coalescers = {}
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.complexes = 0
+        self.latency_ms = deque(maxlen=1000)
+
+    def coalescer(self, mode, all_checkpoints):
+        # imported here so the client side never pulls in torch
+        from engine.oracle import load_oracle
+
+        key = (normalize_mode(mode), bool(all_checkpoints))
+        with self._lock:
+            if key not in self._coalescers:
+                self._coalescers[key] = Coalescer(
+                    load_oracle(*key, url=None, workers=0), self.max_batch, self.max_wait_ms
+                )
+            return self._coalescers[key]
+
+    def stream(self, ligand_lists, mode, all_checkpoints=False, chunk=CHUNK):
+        """
+        Yields the column header, then (offset, predictions) chunks
+        in request order as they finish.
+        """
+        t0 = time.perf_counter()
+        co = self.coalescer(mode, all_checkpoints)
+        yield {"columns": co.oracle.columns, "n": len(ligand_lists)}
+
+        done = queue.Queue()
+        offsets = list(range(0, len(ligand_lists), chunk))
+        for off in offsets:
+            co.submit(ligand_lists[off:off + chunk], off, done)
+
+        # emit strictly in order; chunks may finish out of order
+        ready = {}
+        for off in offsets:
+            while off not in ready:
+                o, preds, error = done.get()
+                if error:
+                    raise RuntimeError(error)
+                ready[o] = preds
+            yield {"offset": off, "predictions": ready.pop(off).tolist()}
+
+        with self._lock:
+            self.requests += 1
+            self.complexes += len(ligand_lists)
+            self.latency_ms.append((time.perf_counter() - t0) * 1000)
+
+    def metrics(self):
+        lat = np.asarray(self.latency_ms) if self.latency_ms else np.zeros(1)
+        queues = {}
+        for (mode, allc), co in self._coalescers.items():
+            wait = np.asarray(co.wait_ms) if co.wait_ms else np.zeros(1)
+            queues[f"{mode}{'+all' if allc else ''}"] = {
+                "queue_depth": co.depth,
+                "batches": co.batches,
+                "mean_batch": co.batch_rows / max(co.batches, 1),
+                "queue_wait_ms_p50": float(np.percentile(wait, 50)),
+                "queue_wait_ms_p95": float(np.percentile(wait, 95)),
+            }
+        return {
+            "requests": self.requests,
+            "complexes": self.complexes,
+            "latency_ms_p50": float(np.percentile(lat, 50)),
+            "latency_ms_p95": float(np.percentile(lat, 95)),
+            "latency_ms_max": float(lat.max()),
+            "oracles": queues,
+        }
+
+
+def make_handler(service: OracleService):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _json(self, code, obj):
+            body = json.dumps(obj).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._json(200, {"ok": True})
+            elif self.path == "/metrics":
+                self._json(200, service.metrics())
+            else:
+                self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._json(404, {"error": "not found"})
+                return
+
+            try:
+                n = int(self.headers.get("Content-Length", 0))
+                req = json.loads(self.rfile.read(n))
+                stream = service.stream(
+                    req["complexes"],
+                    req.get("mode", "optimized"),
+                    req.get("all_checkpoints", False),
+                )
+                header = next(stream)
+            except Exception as e:
+                self._json(400, {"error": f"{type(e).__name__}: {e}"})
+                return
+
+            # HTTP/1.0 style streaming: no length, close when done
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+
+            self._line(header)
+            try:
+                for msg in stream:
+                    self._line(msg)
+            except Exception as e:
+                self._line({"error": f"{type(e).__name__}: {e}"})
+
+        def _line(self, msg):
+            self.wfile.write((json.dumps(msg) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, modes=("crystal", "optimized"),
+          all_checkpoints=False, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+    service = OracleService(max_batch, max_wait_ms)
+    for mode in modes:
+        service.coalescer(mode, all_checkpoints)   # warm up
+        print(f"[INFO] Oracle loaded: {normalize_mode(mode)}")
+
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    print(f"[INFO] Oracle server on http://{host}:{port}")
+    server.serve_forever()
+
+
+# ----------------------------------------------------------
+# Client
+# ----------------------------------------------------------
+class OracleClient:
+
+    def __init__(self, url=None, timeout=600):
+        self.url = (url or os.environ.get("ORACLE_URL", f"http://127.0.0.1:{DEFAULT_PORT}")).rstrip("/")
+        self.timeout = timeout
+
+    def iter_predict(self, ligand_lists, mode, all_checkpoints=False):
+        """
+        Yields (columns, offset, predictions array) as chunks arrive.
+        """
+        body = json.dumps({
+            "complexes": [list(map(str, l)) for l in ligand_lists],
+            "mode": mode,
+            "all_checkpoints": all_checkpoints,
+        }).encode("utf-8")
+        req = urllib.request.Request(
+            self.url + "/predict", data=body,
+            headers={"Content-Type": "application/json"},
+        )
+
+        try:
+            resp = urllib.request.urlopen(req, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            # rejected before streaming: {"error": ...} body
+            try:
+                error = json.loads(e.read())["error"]
+            except (ValueError, KeyError, TypeError):
+                error = f"HTTP {e.code} {e.reason}"
+            raise RuntimeError(f"Oracle server: {error}") from None
+
+        columns = None
+        with resp:
+            for line in resp:
+                msg = json.loads(line)
+                if "error" in msg:
+                    raise RuntimeError(f"Oracle server: {msg['error']}")
+                if "columns" in msg:
+                    columns = msg["columns"]
+                    continue
+                yield columns, msg["offset"], np.asarray(msg["predictions"], dtype=float)
+
+    def predict(self, ligand_lists, mode, all_checkpoints=False):
+        """
+        Returns (columns, (n, len(columns)) array).
+        """
+        columns, chunks = None, []
+        for columns, _, preds in self.iter_predict(ligand_lists, mode, all_checkpoints):
+            chunks.append(preds)
+        if not chunks:
+            return columns, np.zeros((0, len(columns or [])))
+        return columns, np.concatenate(chunks)
+
+    def metrics(self):
+        with urllib.request.urlopen(self.url + "/metrics", timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local ZFS / E/D oracle server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--modes", nargs="+", default=["crystal", "optimized"])
+    ap.add_argument("--all-checkpoints", action="store_true")
+    ap.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = ap.parse_args()
+
+    serve(args.host, args.port, args.modes, args.all_checkpoints,
+          args.max_batch, args.max_wait_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+# ==========================================================
+# engine/paths.py
+# Working files shared by the stages (relative to cwd)
+# ==========================================================
+
+# Stage artifacts: columnar .npz (engine/artifacts.py)
+DONOR_MODES_NPZ = "ligand_donor_modes.npz"
+SEED_COMPLEXES_NPZ = "seed_complexes.npz"
+SEED_LIGANDS_NPZ = "seed_ligands.npz"
+MUTATED_NPZ = "mutated_ligands.npz"
+GENERATED_NPZ = "generated_complexes.npz"
+REGISTRY_NPZ = "ligand_registry.npz"
+ELITE_NPZ = "elite_parents.npz"
+
+# Database hit shown by the app
+RETRIEVED_CSV = "retrieved_solution.csv"
+
+# Mutation anchors and the donor map always come from the DFT database
+ANCHOR_MODE = "optimized"
@@ -0,0 +1,166 @@
+# ==========================================================
+# engine/prediction_store.py
+# Cross-campaign oracle prediction store
+#
+# zfs_pred / ed_pred do not depend on TARGET_ZFS, so a complex
+# scored once never needs the GNN again for the same checkpoints.
+#
+#   key      = sorted multiset of (ligand SMILES, denticity)
+#   model_id = hash of the checkpoint + scaler files
+# ==========================================================
+
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from engine.modes import base_path
+
+STORE_PATH = os.environ.get("PREDICTION_STORE", "prediction_store.sqlite")
+
+# PREDICTION_STORE=0 disables the store
+ENABLED = STORE_PATH not in ("", "0")
+
+
+def files_digest(files) -> str:
+    h = hashlib.sha1()
+    for name in files:
+        with open(base_path(name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def complex_key(ligands, donors) -> str:
+    """
+    Order-free identity of a complex. SMILES are taken as spelled:
+    the featurizer is not invariant to the spelling, so neither are
+    the predictions.
+    """
+    pairs = sorted((str(lig), int(d)) for lig, d in zip(ligands, donors))
+    text = ";".join(f"{smi}:{d}" for smi, d in pairs)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def complex_keys(df):
+    """
+    Keys for a generated_complexes table (ligands + donor_list columns).
+    """
+    ligand_lists = df["ligands"].astype(str).str.split(";")
+    donor_lists = df["donor_list"].map(json.loads)
+    return [complex_key(l, d) for l, d in zip(ligand_lists, donor_lists)]
+
+
+def array_keys(complexes, registry):
+    """
+    Keys for ComplexArrays, same as complex_keys on their to_frame().
+    """
+    return [
+        complex_key(l, d)
+        for l, d in zip(complexes.smiles_lists(registry), complexes.donor_lists())
+    ]
+
+
+class PredictionStore:
+
+    def __init__(self, model_id: str, path: str = STORE_PATH):
+        self.model_id = model_id
+        self.path = path
+
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " model_id TEXT NOT NULL, key TEXT NOT NULL,"
+            " preds BLOB NOT NULL,"
+            " PRIMARY KEY (model_id, key))"
+        )
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute(
+            "SELECT COUNT(*) FROM predictions WHERE model_id = ?", (self.model_id,)
+        ).fetchone()[0]
+
+    def get_many(self, keys) -> dict:
+        """
+        key -> prediction row (one value per oracle column).
+        """
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT key, preds FROM predictions"
+                f" WHERE model_id = ? AND key IN ({marks})",
+                [self.model_id, *chunk]
+            )
+            for key, preds in rows:
+                found[key] = np.frombuffer(preds, dtype=np.float64)
+        return found
+
+    def put_many(self, keys, preds):
+        preds = np.asarray(preds, dtype=np.float64)
+        self._db.executemany(
+            "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+            [(self.model_id, k, row.tobytes()) for k, row in zip(keys, preds)]
+        )
+        self._db.commit()
+
+
+def lookup(store: PredictionStore, keys, n_columns: int):
+    """
+    (predictions, found) of keys already in the store; rows not
+    found are NaN.
+    """
+    unique_keys, inverse = np.unique(np.asarray(keys, dtype=str), return_inverse=True)
+    known = store.get_many(unique_keys.tolist())
+
+    preds = np.full((len(unique_keys), n_columns), np.nan)
+    found = np.zeros(len(unique_keys), dtype=bool)
+    for i, k in enumerate(unique_keys):
+        if k in known:
+            preds[i] = known[k]
+            found[i] = True
+
+    inverse = inverse.reshape(-1)
+    return preds[inverse], found[inverse]
+
+
+def screen_with_store(store: PredictionStore, keys, predict_rows, n_columns: int):
+    """
+    Score complexes through the store: dedup inside the batch, look
+    up the unique keys, run predict_rows(row indices) on the first
+    row of each miss only.
+
+    Returns (predictions array, stats).
+    """
+    unique_keys, first, inverse = np.unique(
+        np.asarray(keys), return_index=True, return_inverse=True
+    )
+
+    known = store.get_many(unique_keys.tolist())
+
+    preds = np.empty((len(unique_keys), n_columns))
+    miss = []
+    for i, k in enumerate(unique_keys):
+        if k in known:
+            preds[i] = known[k]
+        else:
+            miss.append(i)
+
+    if miss:
+        fresh = predict_rows(first[miss])
+        preds[miss] = fresh
+        store.put_many(unique_keys[miss].tolist(), fresh)
+
+    stats = {
+        "rows": len(keys),
+        "unique": len(unique_keys),
+        "store_hits": len(unique_keys) - len(miss),
+        "scored": len(miss),
+    }
+    return preds[inverse.reshape(-1)], stats
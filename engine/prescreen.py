@@ -0,0 +1,227 @@
+# ==========================================================
+# engine/prescreen.py
+# Gradient-boosting pre-screen in front of the GNN oracle
+#
+# Complexes are described by cheap, vectorised graph
+# descriptors (ligand node-feature sums, node / edge counts,
+# denticity histogram). Each screen the GNNs score a random
+# sample; a HistGradientBoostingRegressor fitted to those
+# scores (and earlier samples) estimates ZFS and E/D for the
+# rest, and only the complexes whose estimate is among the
+# PRESCREEN_FRAC closest to the target (with an estimated E/D
+# within the cutoff + margin) go to the GNNs. Unscored rows
+# are flagged as estimated and keep NaN predictions, so the E/D
+# filter of select_elite drops them and an estimate is never
+# taken for a GNN prediction. Out-of-fold estimates on the random
+# sample give an unbiased estimate of elite recall (the share
+# of select_elite rows that reach the GNNs); PRESCREEN_AUDIT=1
+# scores every complex as well, returns those scores and
+# reports the exact recall.
+#
+# tio_GB_model.joblib is not used: it was trained on
+# descriptors (CN, A1, A2, BA, E1-E4, B20, Ucal) that generated
+# complexes do not have.
+# ==========================================================
+
+import os
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+from engine.graph_store import get_store
+from engine.registry import ComplexArrays, LigandRegistry
+from ligand_dataset import ligand_slot_key
+
+PRESCREEN = os.environ.get("PRESCREEN", "0") == "1"
+
+# fraction of complexes sent to the GNNs after the random sample
+PRESCREEN_FRAC = float(os.environ.get("PRESCREEN_FRAC", 0.10))
+# random GNN-scored sample: fraction, at least PRESCREEN_MIN_SAMPLE rows
+PRESCREEN_SAMPLE = float(os.environ.get("PRESCREEN_SAMPLE", 0.05))
+PRESCREEN_MIN_SAMPLE = int(os.environ.get("PRESCREEN_MIN_SAMPLE", 512))
+# estimated E/D may exceed the oracle cutoff by this much
+PRESCREEN_ED_MARGIN = float(os.environ.get("PRESCREEN_ED_MARGIN", 0.05))
+PRESCREEN_AUDIT = os.environ.get("PRESCREEN_AUDIT", "0") == "1"
+
+# boolean column of rows the GNNs did not score
+ESTIMATED = "estimated"
+
+# GNN-scored rows kept for fitting, newest first
+MAX_TRAIN = 50000
+GB_ITERATIONS = 100
+RECALL_FOLDS = 4
+MAX_DENTICITY = 6
+
+
+def complex_descriptors(complexes: ComplexArrays, registry: LigandRegistry) -> np.ndarray:
+    """
+    (n_complexes, n_features) float array: summed ligand node
+    features, mean node features, node / edge / ligand counts and
+    the denticity histogram.
+    """
+    store = get_store()
+
+    # empty slots (-1) are the ("X", "X") fallback node, as in the oracle
+    uniq, inverse = np.unique(complexes.ids, return_inverse=True)
+    keys = [
+        ligand_slot_key([registry.smiles[i]] if i >= 0 else [], [], 0)
+        for i in uniq.tolist()
+    ]
+    rows = store.rows(keys)
+
+    n_nodes, n_edges = store.sizes(rows[:, None])
+    n_nodes, n_edges = n_nodes.astype(np.float64), n_edges.astype(np.float64)
+    ligand = np.column_stack([store.node_sums(rows), n_nodes, n_edges])
+
+    slots = ligand[inverse.reshape(complexes.ids.shape)]
+    totals = slots.sum(axis=1)
+    mean_features = totals[:, :-2] / np.maximum(totals[:, -2:-1], 1)
+
+    n_ligands = (complexes.ids >= 0).sum(axis=1)
+    denticity = np.stack([
+        ((complexes.donors == d) & (complexes.ids >= 0)).sum(axis=1)
+        for d in range(1, MAX_DENTICITY + 1)
+    ], axis=1)
+
+    return np.column_stack([totals, mean_features, n_ligands, denticity])
+
+
+def _elite(zfs, ed, target_zfs, ed_cutoff, elite_frac):
+    """
+    Positions of the select_elite rows among (zfs, ed).
+    """
+    ok = np.flatnonzero(ed <= ed_cutoff)
+    n_elite = max(1, int(len(ok) * elite_frac))
+    order = np.argsort(np.abs(zfs[ok] - target_zfs), kind="stable")
+    return ok[order[:n_elite]]
+
+
+class PreScreen:
+
+    def __init__(self, frac: float = PRESCREEN_FRAC, sample: float = PRESCREEN_SAMPLE,
+                 min_sample: int = PRESCREEN_MIN_SAMPLE,
+                 ed_margin: float = PRESCREEN_ED_MARGIN,
+                 audit: bool = PRESCREEN_AUDIT, seed: int = 0):
+        self.frac = frac
+        self.sample = sample
+        self.min_sample = min_sample
+        self.ed_margin = ed_margin
+        self.audit = audit
+        self.rng = np.random.default_rng(seed)
+
+        # GNN-scored descriptors / (zfs, ed) of earlier screens
+        self._X = np.zeros((0, 0))
+        self._Y = np.zeros((0, 2))
+
+    def _with_history(self, X, Y):
+        if len(self._Y) and self._X.shape[1] == X.shape[1]:
+            return np.concatenate([X, self._X]), np.concatenate([Y, self._Y])
+        return X, Y
+
+    def _fit(self, X, Y):
+        """
+        Two regressors (ZFS, E/D) on X, Y plus the remembered rows.
+        """
+        X, Y = self._with_history(X, Y)
+        return [
+            HistGradientBoostingRegressor(max_iter=GB_ITERATIONS, random_state=0).fit(X, Y[:, j])
+            for j in range(2)
+        ]
+
+    def _remember(self, X, Y):
+        X, Y = self._with_history(X, Y)
+        self._X, self._Y = X[:MAX_TRAIN], Y[:MAX_TRAIN]
+
+    @staticmethod
+    def _predict(models, X):
+        return np.column_stack([m.predict(X) for m in models])
+
+    def _distance(self, est, target_zfs, ed_cutoff):
+        # estimated distance to the target; too high an E/D ranks last
+        dist = np.abs(est[:, 0] - target_zfs)
+        dist[est[:, 1] > ed_cutoff + self.ed_margin] = np.inf
+        return dist
+
+    def screen(self, X, score, n_columns: int, target_zfs: float,
+               ed_cutoff: float, elite_frac: float):
+        """
+        X: complex descriptors; score(rows) -> GNN predictions of those
+        rows, (len(rows), n_columns) with zfs_pred, ed_pred first.
+        Returns (predictions, estimated, stats): rows not scored by
+        the GNNs are True in estimated and NaN in predictions.
+        """
+        n = len(X)
+        n_sample = max(self.min_sample, int(n * self.sample))
+        n_keep = int(n * self.frac)
+        if n_sample + n_keep >= n:
+            return (score(np.arange(n)), np.zeros(n, dtype=bool),
+                    {"rows": n, "sampled": n, "passed": 0})
+
+        sample = np.sort(self.rng.choice(n, n_sample, replace=False))
+        preds = np.full((n, n_columns), np.nan)
+        preds[sample] = score(sample)
+        Xs, Ys = X[sample], preds[sample, :2]
+
+        # out-of-fold estimates for the sample, for an honest recall
+        fold = self.rng.permutation(n_sample) % RECALL_FOLDS
+        oof = np.zeros((n_sample, 2))
+        for k in range(RECALL_FOLDS):
+            models = self._fit(Xs[fold != k], Ys[fold != k])
+            oof[fold == k] = self._predict(models, Xs[fold == k])
+
+        est = self._predict(self._fit(Xs, Ys), X)
+        self._remember(Xs, Ys)
+
+        # exactly the n_keep closest estimates, minus those over the E/D margin
+        dist = self._distance(est, target_zfs, ed_cutoff)
+        passed = np.argpartition(dist, max(n_keep, 1) - 1)[:n_keep]
+        passed = passed[np.isfinite(dist[passed])]
+        cut = dist[passed].max() if len(passed) else -np.inf
+
+        rest = np.setdiff1d(passed, sample)
+        if len(rest):
+            preds[rest] = score(rest)
+
+        unscored = np.ones(n, dtype=bool)
+        unscored[sample] = False
+        unscored[rest] = False
+
+        # recall: an elite row reaches the GNNs if it was sampled, or if
+        # its out-of-fold estimate passes the cut
+        elite = _elite(Ys[:, 0], Ys[:, 1], target_zfs, ed_cutoff, elite_frac)
+        caught = self._distance(oof[elite], target_zfs, ed_cutoff) <= cut
+        caught = float(caught.mean()) if len(elite) else 0.0
+        share = n_sample / n
+        stats = {
+            "rows": n,
+            "sampled": n_sample,
+            "passed": len(rest),
+            "sample_elite": len(elite),
+            "sample_recall": share + (1 - share) * caught,
+        }
+
+        if self.audit:
+            # every row is scored anyway: return the exact predictions
+            preds = score(np.arange(n))
+            elite = _elite(preds[:, 0], preds[:, 1], target_zfs, ed_cutoff, elite_frac)
+            stats["audit_recall"] = float((~unscored[elite]).mean())
+            stats["audit_elite"] = len(elite)
+            unscored = np.zeros(n, dtype=bool)
+
+        return preds, unscored, stats
+
+    @staticmethod
+    def report(st):
+        scored = st["sampled"] + st["passed"]
+        msg = (
+            f"[INFO] Pre-screen: {st['rows']} complexes, {st['sampled']} sampled + "
+            f"{st['passed']} passed -> {scored} GNN-scored "
+            f"({st['rows'] / max(scored, 1):.1f}x fewer)"
+        )
+        if st.get("store_hits"):
+            msg += f", {st['store_hits']} more from the prediction store"
+        if "sample_recall" in st:
+            msg += f", elite recall ~{st['sample_recall']:.0%} (sample, {st['sample_elite']} elite)"
+        if "audit_recall" in st:
+            msg += f", audit recall {st['audit_recall']:.1%} ({st['audit_elite']} elite)"
+        print(msg)
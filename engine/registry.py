@@ -0,0 +1,172 @@
+# ==========================================================
+# engine/registry.py
+# Integer ligand registry + array-backed complexes
+#
+# Ligands get dense int32 ids; a complex is one row of
+#   ids    (n, 6) int32, -1 = empty slot
+#   donors (n, 6) uint8, 0  = empty slot
+# The ";"-joined ligands / str(donor_list) columns are only
+# produced for the elite table and the app.
+#
+# Ids are keyed on the SMILES as spelled (not re-canonicalised):
+# the featurizer, and so the oracle, depend on the spelling.
+# ==========================================================
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from engine.artifacts import read_arrays, read_table, write_arrays, write_table
+
+N_SLOTS = 6
+ID_COLUMNS = [f"id{i}" for i in range(N_SLOTS)]
+DONOR_COLUMNS = [f"d{i}" for i in range(N_SLOTS)]
+
+
+class LigandRegistry:
+    """
+    smiles <-> dense id, with the donor modes (denticities) of each ligand.
+    """
+
+    def __init__(self, smiles=(), modes=()):
+        self.smiles = []
+        self.modes = []
+        self.index = {}
+        for smi, m in zip(smiles, modes):
+            self.add(smi, m)
+
+    def __len__(self):
+        return len(self.smiles)
+
+    @classmethod
+    def from_mode_map(cls, mode_map: dict):
+        return cls(list(mode_map.keys()), [mode_map[k] for k in mode_map])
+
+    def add(self, smiles: str, modes=()) -> int:
+        i = self.index.get(smiles)
+        if i is None:
+            i = len(self.smiles)
+            self.index[smiles] = i
+            self.smiles.append(smiles)
+            self.modes.append(set())
+        self.modes[i].update(int(d) for d in modes)
+        return i
+
+    def update(self, mode_map: dict):
+        for smi, m in mode_map.items():
+            self.add(smi, m)
+
+    def ids(self, smiles) -> np.ndarray:
+        return np.array([self.index[s] for s in smiles], dtype=np.int32)
+
+    def smiles_array(self) -> np.ndarray:
+        return np.array(self.smiles, dtype=object)
+
+    def save(self, path: str):
+        write_table(pd.DataFrame({
+            "smiles": self.smiles,
+            "modes": [json.dumps(sorted(m)) for m in self.modes],
+        }), path)
+
+    @classmethod
+    def load(cls, path: str):
+        df = read_table(path)
+        return cls(df["smiles"].tolist(), [json.loads(m) for m in df["modes"]])
+
+
+class ComplexArrays:
+    """
+    Fixed-width complexes: ids (n, 6) int32 and donors (n, 6) uint8.
+    """
+
+    def __init__(self, ids, donors):
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.donors = np.asarray(donors, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def take(self, rows):
+        return ComplexArrays(self.ids[rows], self.donors[rows])
+
+    @classmethod
+    def concat(cls, parts):
+        parts = list(parts)
+        if not parts:
+            return cls(np.zeros((0, N_SLOTS)), np.zeros((0, N_SLOTS)))
+        return cls(np.concatenate([p.ids for p in parts]),
+                   np.concatenate([p.donors for p in parts]))
+
+    def canonical_rows(self):
+        """
+        (first row of each distinct complex, inverse index), treating
+        complexes as order-free: slots are sorted by (id, denticity)
+        before comparing.
+        """
+        code = self.ids.astype(np.int64) * 8 + self.donors
+        code[self.ids < 0] = np.iinfo(np.int64).max
+        code.sort(axis=1)
+        _, first, inverse = np.unique(
+            code, axis=0, return_index=True, return_inverse=True
+        )
+        return first, inverse.reshape(-1)
+
+    def smiles_lists(self, registry: LigandRegistry, rows=None):
+        """
+        [[smiles, ...]] per complex (empty slots dropped).
+        """
+        ids = self.ids if rows is None else self.ids[rows]
+        names = registry.smiles
+        return [[names[i] for i in row if i >= 0] for row in ids.tolist()]
+
+    def donor_lists(self, rows=None):
+        donors = self.donors if rows is None else self.donors[rows]
+        return [[d for d in row if d > 0] for row in donors.tolist()]
+
+    def to_frame(self, registry: LigandRegistry, extra: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Legacy ligands / donor_list / donor_sum table, followed by the
+        columns of extra (row-aligned, e.g. the oracle predictions).
+        """
+        df = pd.DataFrame({
+            "ligands": [";".join(l) for l in self.smiles_lists(registry)],
+            "donor_list": [str(d) for d in self.donor_lists()],
+            "donor_sum": self.donors.sum(axis=1).astype(int),
+        })
+        if extra is not None:
+            df = pd.concat([df, extra.reset_index(drop=True)], axis=1)
+        return df
+
+    def columns(self) -> pd.DataFrame:
+        """
+        ids / donors as integer id0..id5, d0..d5 columns, to carry
+        complexes through DataFrame filtering without strings.
+        """
+        df = pd.DataFrame(self.ids, columns=ID_COLUMNS)
+        df[DONOR_COLUMNS] = self.donors
+        return df
+
+    @classmethod
+    def from_columns(cls, df: pd.DataFrame):
+        return cls(df[ID_COLUMNS].to_numpy(), df[DONOR_COLUMNS].to_numpy())
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, registry: LigandRegistry):
+        n = len(df)
+        ids = np.full((n, N_SLOTS), -1, dtype=np.int32)
+        donors = np.zeros((n, N_SLOTS), dtype=np.uint8)
+        for r, (ligs, dl) in enumerate(zip(df["ligands"].astype(str), df["donor_list"])):
+            ligs = ligs.split(";")
+            dl = json.loads(dl)
+            ids[r, :len(ligs)] = [registry.add(s, [d]) for s, d in zip(ligs, dl)]
+            donors[r, :len(dl)] = dl
+        return cls(ids, donors)
+
+    def save(self, path: str):
+        write_arrays(path, ids=self.ids, donors=self.donors)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False):
+        z = read_arrays(path, mmap)
+        return cls(z["ids"], z["donors"])
@@ -0,0 +1,91 @@
+# ==========================================================
+# engine/seeding.py
+# First-generation setup stages (engine/ingest.py):
+#   donor map  -> ligand_donor_modes.npz
+#   seeds      -> seed_complexes.npz
+#   seed ligands -> seed_ligands.npz
+#
+# The *_stage functions write those artifacts through the
+# stage cache (engine/stage_cache.py), keyed by the source
+# database hash, MODE, SEED_ZFS_MAX and the stage version, so
+# a new target or working directory reuses earlier outputs.
+# ==========================================================
+
+import pandas as pd
+
+from engine import stage_cache
+from engine.artifacts import read_table, write_table
+from engine.database_lookup import load_database
+from engine.db_snapshot import SNAPSHOT_VERSION, load_snapshot, source_digest
+from engine.ingest import donor_modes, ligand_occurrences, seed_ligands
+from engine.modes import mode_config, normalize_mode
+from engine.paths import ANCHOR_MODE, DONOR_MODES_NPZ, SEED_COMPLEXES_NPZ, SEED_LIGANDS_NPZ
+
+SEED_ZFS_MAX = -120
+
+# bump when a stage's output changes for the same inputs
+DONOR_MAP_VERSION = 1
+SEEDS_VERSION = 1
+SEED_LIGANDS_VERSION = 1
+
+
+def build_ligand_donor_map(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Every (ligand, denticity) pair seen in the database.
+    """
+    return donor_modes(ligand_occurrences(df))
+
+
+def select_seeds(df: pd.DataFrame, zfs_col: str) -> pd.DataFrame:
+    """
+    Strong negative ZFS complexes.
+    """
+    return df[df[zfs_col] <= SEED_ZFS_MAX].reset_index(drop=True)
+
+
+def extract_seed_ligands(seed_df: pd.DataFrame) -> pd.DataFrame:
+    return seed_ligands(seed_df)
+
+
+# ----------------------------------------------------------
+# Cached stages (True = outputs restored from the cache)
+# ----------------------------------------------------------
+def donor_map_stage(path: str = DONOR_MODES_NPZ) -> bool:
+    key = stage_cache.stage_key(
+        "donor_modes", DONOR_MAP_VERSION,
+        source=source_digest(mode_config(ANCHOR_MODE)["database"]),
+        snapshot=SNAPSHOT_VERSION,
+    )
+    return stage_cache.run_stage(
+        "donor_modes", key, [path],
+        lambda: write_table(load_snapshot(ANCHOR_MODE).donor_modes, path)
+    )
+
+
+def seeds_stage(mode: str, path: str = SEED_COMPLEXES_NPZ) -> bool:
+    mode = normalize_mode(mode)
+
+    def build():
+        df, zfs_col = load_database(mode)
+        write_table(select_seeds(df, zfs_col), path)
+
+    key = stage_cache.stage_key(
+        "seeds", SEEDS_VERSION,
+        mode=mode,
+        source=source_digest(mode_config(mode)["database"]),
+        snapshot=SNAPSHOT_VERSION,
+        seed_zfs_max=SEED_ZFS_MAX,
+    )
+    return stage_cache.run_stage("seeds", key, [path], build)
+
+
+def seed_ligands_stage(seeds_path: str = SEED_COMPLEXES_NPZ,
+                       path: str = SEED_LIGANDS_NPZ) -> bool:
+    key = stage_cache.stage_key(
+        "seed_ligands", SEED_LIGANDS_VERSION,
+        seeds=stage_cache.file_digest(seeds_path),
+    )
+    return stage_cache.run_stage(
+        "seed_ligands", key, [path],
+        lambda: write_table(extract_seed_ligands(read_table(seeds_path)), path)
+    )
@@ -0,0 +1,107 @@
+# ==========================================================
+# engine/stage_cache.py
+# Content-addressed cache of stage outputs
+#
+# A stage is keyed by a hash of everything its outputs depend
+# on (source file hashes, MODE, thresholds, stage version).
+# The first run stores its output files under
+#   .stage_cache/<stage>/<key>/
+# and later runs, for any target or working directory, copy
+# them back instead of running the stage. STAGE_CACHE=0
+# disables it.
+# ==========================================================
+
+import hashlib
+import json
+import os
+import shutil
+
+from engine.modes import base_path
+
+CACHE_DIR = os.environ.get("STAGE_CACHE", base_path(".stage_cache"))
+ENABLED = CACHE_DIR not in ("", "0")
+
+
+def stage_key(stage: str, version: int, **inputs) -> str:
+    text = json.dumps({"stage": stage, "version": version, **inputs}, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _entry(stage, key):
+    return os.path.join(CACHE_DIR, stage, key)
+
+
+def _manifest(entry):
+    try:
+        with open(os.path.join(entry, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _restore(entry, manifest, outputs) -> bool:
+    """
+    Bring outputs in line with a cache entry; False if the entry is
+    incomplete or corrupt.
+    """
+    for out in outputs:
+        name = os.path.basename(out)
+        cached = os.path.join(entry, name)
+        if name not in manifest or not os.path.exists(cached):
+            return False
+        if os.path.exists(out) and file_digest(out) == manifest[name]:
+            continue
+        if file_digest(cached) != manifest[name]:
+            return False
+        shutil.copyfile(cached, f"{out}.tmp")
+        os.replace(f"{out}.tmp", out)
+    return True
+
+
+def _store(entry, outputs):
+    tmp = f"{entry}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    manifest = {}
+    for out in outputs:
+        name = os.path.basename(out)
+        shutil.copyfile(out, os.path.join(tmp, name))
+        manifest[name] = file_digest(out)
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    shutil.rmtree(entry, ignore_errors=True)
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    os.replace(tmp, entry)
+
+
+def run_stage(stage: str, key: str, outputs, build) -> bool:
+    """
+    Make the output files of a stage exist: restored from the cache
+    entry for key, or produced by build() (which must write them)
+    and then cached. Returns True on a cache hit.
+    """
+    outputs = list(outputs)
+    if ENABLED:
+        entry = _entry(stage, key)
+        manifest = _manifest(entry)
+        if manifest is not None and _restore(entry, manifest, outputs):
+            return True
+
+    build()
+
+    if ENABLED:
+        try:
+            _store(_entry(stage, key), outputs)
+        except OSError as e:
+            print(f"[WARN] Stage cache not written for {stage} ({e})")
+    return False
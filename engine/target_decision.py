@@ -1,5 +1,162 @@
+# ==========================================================
+# engine/target_decision.py
+# Sorted ZFS index over a MODE database
+#
+# Built once per process: ZFS values sorted with their row
+# pointers, for all rows and for the numeric-FileName rows
+# only, so tolerance-window and nearest-k lookups are a
+# searchsorted plus the k rows returned.
+# ==========================================================
+
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
+from engine.database_lookup import load_database
+from engine.modes import normalize_mode
+
+# Direct database hit: |zfs - target| <= HIT_TOL
+HIT_TOL = 10.0
+
+FILENAME_COLUMNS = ("FileName", "File Name")
+
+
+def _slack(target, tol):
+    # target +- tol is rounded, so bound the search a little wider and
+    # let the exact |zfs - target| <= tol test decide the edges
+    return 1e-9 * (np.abs(target) + tol + 1.0)
+
+
+class ZFSIndex:
+    """
+    df rows sorted by ZFS. Rows whose ZFS is not numeric are left
+    out; numeric_only=True restricts a query to numeric file names
+    (the real, non-augmented database entries).
+    """
+
+    def __init__(self, df: pd.DataFrame, zfs_col: str):
+        self.df = df
+        self.zfs_col = zfs_col
+
+        zfs = pd.to_numeric(df[zfs_col], errors="coerce").to_numpy(dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(zfs))
+        rows = rows[np.argsort(zfs[rows], kind="stable")]
+
+        numeric = np.ones(len(df), dtype=bool)
+        for col in FILENAME_COLUMNS:
+            if col in df.columns:
+                numeric = df[col].astype(str).str.fullmatch(r"\d+").to_numpy()
+                break
+
+        # numeric_only -> (sorted zfs, df row of each)
+        self._views = {
+            False: (zfs[rows], rows),
+            True: (zfs[rows[numeric[rows]]], rows[numeric[rows]]),
+        }
+
+    def __len__(self):
+        return len(self._views[False][1])
+
+    # ------------------------------------------------------
+    # Single target
+    # ------------------------------------------------------
+    def window(self, target: float, tol: float, numeric_only: bool = True):
+        """
+        (df rows, |zfs - target|) with |zfs - target| <= tol,
+        closest first.
+        """
+        zfs, rows = self._views[numeric_only]
+        slack = _slack(target, tol)
+        lo = np.searchsorted(zfs, target - tol - slack, side="left")
+        hi = np.searchsorted(zfs, target + tol + slack, side="right")
+
+        dist = np.abs(zfs[lo:hi] - target)
+        keep = dist <= tol
+        order = np.argsort(dist[keep], kind="stable")
+        return rows[lo:hi][keep][order], dist[keep][order]
+
+    def nearest(self, target: float, k: int = 1, numeric_only: bool = True):
+        """
+        (df rows, |zfs - target|) of the k closest entries.
+        """
+        rows, dist = self.nearest_many([target], k, numeric_only)
+        n = int(np.isfinite(dist[0]).sum())
+        return rows[0, :n], dist[0, :n]
+
+    def hits(self, target: float, tol: float = HIT_TOL,
+             numeric_only: bool = True) -> pd.DataFrame:
+        """
+        Database rows within tol of the target, closest first, with
+        numeric ZFS and a dist column (empty frame if none).
+        """
+        rows, dist = self.window(target, tol, numeric_only)
+        out = self.df.iloc[rows].reset_index(drop=True)
+        out[self.zfs_col] = pd.to_numeric(out[self.zfs_col], errors="coerce")
+        out["dist"] = dist
+        return out
+
+    # ------------------------------------------------------
+    # Batches of targets
+    # ------------------------------------------------------
+    def window_many(self, targets, tol: float, numeric_only: bool = True):
+        """
+        window() for every target: a list of (df rows, dist).
+        """
+        zfs, rows = self._views[numeric_only]
+        targets = np.asarray(targets, dtype=np.float64)
+        slack = _slack(targets, tol)
+        lo = np.searchsorted(zfs, targets - tol - slack, side="left")
+        hi = np.searchsorted(zfs, targets + tol + slack, side="right")
+
+        out = []
+        for t, a, b in zip(targets, lo, hi):
+            dist = np.abs(zfs[a:b] - t)
+            keep = dist <= tol
+            order = np.argsort(dist[keep], kind="stable")
+            out.append((rows[a:b][keep][order], dist[keep][order]))
+        return out
+
+    def nearest_many(self, targets, k: int = 1, numeric_only: bool = True):
+        """
+        (m, k) df rows and distances of the k closest entries to each
+        of m targets, closest first. Pads with row -1 / inf when the
+        index holds fewer than k entries.
+        """
+        zfs, rows = self._views[numeric_only]
+        targets = np.asarray(targets, dtype=np.float64)
+        n = len(zfs)
+        if n == 0:
+            return (np.full((len(targets), k), -1, dtype=np.int64),
+                    np.full((len(targets), k), np.inf))
+
+        # the k nearest lie within k positions either side of the insertion point
+        at = np.searchsorted(zfs, targets)
+        pos = at[:, None] + np.arange(-k, k)[None, :]
+        valid = (pos >= 0) & (pos < n)
+        pos = np.clip(pos, 0, n - 1)
+
+        dist = np.where(valid, np.abs(zfs[pos] - targets[:, None]), np.inf)
+        order = np.argsort(dist, axis=1, kind="stable")[:, :k]
+
+        dist = np.take_along_axis(dist, order, axis=1)
+        found = rows[np.take_along_axis(pos, order, axis=1)]
+        return np.where(np.isfinite(dist), found, -1), dist
+
+
+@lru_cache(maxsize=None)
+def _load_index(mode: str) -> ZFSIndex:
+    df, zfs_col = load_database(mode)
+    return ZFSIndex(df, zfs_col)
+
+
+def load_index(mode: str) -> ZFSIndex:
+    """
+    Process-wide ZFS index of the MODE database.
+    """
+    return _load_index(normalize_mode(mode))
+
+
 def decide_from_database(
     df: pd.DataFrame,
     zfs_col: str,
@@ -8,12 +165,12 @@ def decide_from_database(
 ):
     """
     Check if target ZFS exists in database within tolerance.
+    For the MODE databases use load_index(mode) instead, which is
+    built once.
     """
 
-    df = df.copy()
-    df["delta"] = (df[zfs_col] - target_zfs).abs()
-
-    hits = df[df["delta"] <= tol].sort_values("delta")
+    hits = ZFSIndex(df, zfs_col).hits(target_zfs, tol, numeric_only=False)
+    hits = hits.rename(columns={"dist": "delta"})
 
     if len(hits) > 0:
         return True, hits
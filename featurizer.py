@@ -0,0 +1,223 @@
+# ============================================================
+# featurizer.py
+#
+# Batch SMILES -> ligand graphs (11-dim node features)
+# shared by graph_features and ligand_dataset, and through
+# them ComplexDataset, LigandCombinationDataset and the oracle.
+#
+# RDKit is only walked to pull raw per-atom columns; the
+# features of the whole batch are then assembled at once
+# into CSR-packed arrays:
+#   x[node_ptr[i]:node_ptr[i+1]]               nodes of graph i
+#   edge_index[:, edge_ptr[i]:edge_ptr[i+1]]   its edges (local ids)
+# FEATURIZER_WORKERS=N parses with N spawned processes.
+# ============================================================
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+try:
+    from rdkit import Chem
+    from rdkit.Chem import AllChem
+    RDKit_AVAILABLE = True
+except Exception:
+    RDKit_AVAILABLE = False
+
+N_FEATURES = 11
+
+# _mol_columns result when RDKit raised (a string: it crosses processes)
+RDKIT_ERROR = "rdkit-error"
+FEATURIZER_WORKERS = int(os.environ.get("FEATURIZER_WORKERS", 0))
+POOL_MIN_BATCH = 256
+
+# Upper-case element symbol -> atomic number
+SYMBOL_TO_Z = {}
+if RDKit_AVAILABLE:
+    _pt = Chem.GetPeriodicTable()
+    SYMBOL_TO_Z = {_pt.GetElementSymbol(z).upper(): z for z in range(1, 119)}
+
+
+def en_by_z(en_table: dict) -> np.ndarray:
+    """
+    Symbol-keyed electronegativity table as an array indexed by Z.
+    """
+    out = np.zeros(119, dtype=np.float64)
+    for sym, en in en_table.items():
+        z = SYMBOL_TO_Z.get(sym.upper())
+        if z is not None:
+            out[z] = en
+    return out
+
+
+def _mol_columns(smiles):
+    """
+    Raw per-atom columns of one molecule, None if RDKit cannot parse
+    it, RDKIT_ERROR if RDKit raised on it:
+      ints    (n_atoms, 6)  Z, degree, total Hs, aromatic,
+                            formal charge, implicit valence
+      charges [str]         Gasteiger charges as RDKit prints them
+      bonds   (n_bonds, 2)
+    """
+    try:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            return None
+
+        try:
+            AllChem.ComputeGasteigerCharges(mol)
+        except Exception:
+            pass
+
+        atoms = list(mol.GetAtoms())
+        ints = np.array([
+            (a.GetAtomicNum(), a.GetDegree(), a.GetTotalNumHs(),
+             a.GetIsAromatic(), a.GetFormalCharge(), a.GetImplicitValence())
+            for a in atoms
+        ], dtype=np.int64).reshape(-1, 6)
+        charges = [
+            a.GetProp("_GasteigerCharge") if a.HasProp("_GasteigerCharge") else "0"
+            for a in atoms
+        ]
+        bonds = np.array([
+            (b.GetBeginAtomIdx(), b.GetEndAtomIdx()) for b in mol.GetBonds()
+        ], dtype=np.int64).reshape(-1, 2)
+    except Exception:
+        return RDKIT_ERROR
+
+    return ints, charges, bonds
+
+
+def _parse_charges(charges):
+    try:
+        return np.array(charges, dtype=np.float64)
+    except ValueError:
+        out = np.zeros(len(charges))
+        for i, c in enumerate(charges):
+            try:
+                out[i] = float(c)
+            except ValueError:
+                pass
+        return out
+
+
+_POOL = None
+
+
+def _pool(workers):
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"))
+    return _POOL
+
+
+class GraphBatch:
+    """
+    CSR-packed graphs; valid[i] is False where RDKit could not parse
+    smiles[i] (those graphs have no nodes unless invalid_as_node), and
+    failed[i] is True where RDKit raised on it (never valid).
+    """
+
+    def __init__(self, x, node_ptr, edge_index, edge_ptr, valid, failed=None,
+                 invalid_as_node=False):
+        self.x = x
+        self.node_ptr = node_ptr
+        self.edge_index = edge_index
+        self.edge_ptr = edge_ptr
+        self.valid = valid
+        self.failed = failed if failed is not None else np.zeros(len(valid), dtype=bool)
+        self.invalid_as_node = invalid_as_node
+
+    def __len__(self):
+        return len(self.valid)
+
+    def graph(self, i):
+        """
+        (x, edge_index) tensors of graph i.
+        """
+        a, b = self.node_ptr[i], self.node_ptr[i + 1]
+        c, d = self.edge_ptr[i], self.edge_ptr[i + 1]
+        return (torch.from_numpy(self.x[a:b].copy()),
+                torch.from_numpy(self.edge_index[:, c:d].copy()))
+
+    def graphs(self, invalid=None):
+        """
+        [(x, edge_index)], with `invalid` in place of unparsable SMILES
+        unless they were featurized as a zero node.
+        """
+        return [
+            self.graph(i) if ok or self.invalid_as_node else invalid
+            for i, ok in enumerate(self.valid)
+        ]
+
+
+def featurize_batch(smiles, donors, en_table: dict,
+                    invalid_as_node: bool = False,
+                    workers: int = FEATURIZER_WORKERS) -> GraphBatch:
+    """
+    smiles : list of SMILES strings
+    donors : matching donor symbols, already upper-cased; a node is
+             flagged as donor when its element symbol equals it
+    en_table : symbol -> Pauling electronegativity
+    invalid_as_node : unparsable SMILES (and RDKit errors) become one
+                      all-zero node
+    """
+    if not RDKit_AVAILABLE:
+        raise RuntimeError("RDKit not available")
+
+    smiles = [str(s) for s in smiles]
+    if workers > 1 and len(smiles) >= POOL_MIN_BATCH:
+        cols = list(_pool(workers).map(_mol_columns, smiles, chunksize=64))
+    else:
+        cols = [_mol_columns(s) for s in smiles]
+
+    failed = np.array([isinstance(c, str) for c in cols], dtype=bool)
+    valid = np.array([c is not None for c in cols], dtype=bool) & ~failed
+    empty = (np.zeros((1 if invalid_as_node else 0, 6), dtype=np.int64), [],
+             np.zeros((0, 2), dtype=np.int64))
+    cols = [c if ok else empty for c, ok in zip(cols, valid)]
+
+    n_nodes = np.array([len(c[0]) for c in cols], dtype=np.int64)
+    n_bonds = np.array([len(c[2]) for c in cols], dtype=np.int64)
+
+    node_ptr = np.zeros(len(cols) + 1, dtype=np.int64)
+    np.cumsum(n_nodes, out=node_ptr[1:])
+    edge_ptr = np.zeros(len(cols) + 1, dtype=np.int64)
+    np.cumsum(2 * n_bonds, out=edge_ptr[1:])
+
+    # ---------------- nodes ----------------
+    ints = np.concatenate([c[0] for c in cols]) if cols else np.zeros((0, 6), dtype=np.int64)
+    z = ints[:, 0]
+
+    charges = np.zeros(len(ints))
+    graph_of = np.repeat(np.arange(len(cols)), n_nodes)
+    has_atoms = valid[graph_of]
+    charges[has_atoms] = _parse_charges([q for c in cols for q in c[1]])
+
+    en = en_by_z(en_table)[z]
+    donor_z = np.array([SYMBOL_TO_Z.get(d, -1) for d in donors], dtype=np.int64)
+    is_donor = (z == donor_z[graph_of]) & has_atoms
+
+    x = np.zeros((len(ints), N_FEATURES), dtype=np.float64)
+    x[:, :6] = ints
+    x[:, 6] = 1.0
+    x[:, 7] = en
+    x[:, 8] = is_donor
+    x[:, 9] = np.where(is_donor, en, 0.0)
+    x[:, 10] = charges
+    x[~has_atoms] = 0.0
+
+    x = np.nan_to_num(x, nan=0.0, posinf=0.0, neginf=0.0).astype(np.float32)
+
+    # ---------------- edges ----------------
+    bonds = np.concatenate([c[2] for c in cols]) if cols else np.zeros((0, 2), dtype=np.int64)
+    edge_index = np.empty((2, 2 * len(bonds)), dtype=np.int64)
+    edge_index[0, 0::2] = bonds[:, 0]
+    edge_index[0, 1::2] = bonds[:, 1]
+    edge_index[1, 0::2] = bonds[:, 1]
+    edge_index[1, 1::2] = bonds[:, 0]
+
+    return GraphBatch(x, node_ptr, edge_index, edge_ptr, valid, failed, invalid_as_node)
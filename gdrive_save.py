@@ -1,5 +1,6 @@
 import os
 import io
+import mimetypes
 import streamlit as st
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
@@ -8,13 +9,15 @@ from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
 SCOPES = ["https://www.googleapis.com/auth/drive"]
 
 PIPELINE_FILES = [
-    "ligand_donor_modes.csv",
-    "seed_complexes.csv",
-    "seed_ligands.csv",
-    "mutated_ligands.csv",
-    "mutation_lineage.csv",
-    "generated_complexes.csv",
-    "elite_parents.csv",
+    "ligand_donor_modes.npz",
+    "seed_complexes.npz",
+    "seed_ligands.npz",
+    "mutated_ligands.npz",
+    "mutation_lineage.sqlite",
+    "novelty_index.u64",
+    "generated_complexes.npz",
+    "ligand_registry.npz",
+    "elite_parents.npz",
 ]
 
 # ================= AUTH =================
@@ -104,7 +107,8 @@ def upload_pipeline_to_drive(target, mode):
         query = f"name='{file}' and '{folder}' in parents and trashed=false"
         res = service.files().list(q=query, fields="files(id)").execute()
 
-        media = MediaFileUpload(file, mimetype="text/csv", resumable=False)
+        mimetype = mimetypes.guess_type(file)[0] or "application/octet-stream"
+        media = MediaFileUpload(file, mimetype=mimetype, resumable=False)
 
         # 🔁 UPDATE existing file
         if res["files"]:
@@ -0,0 +1,267 @@
+# ============================================================
+# graph_cache.py
+#
+# Persistent, content-addressed cache of ligand featurizations
+#   key = featurizer version + SMILES + donor symbol
+#   value = x / edge_index arrays
+#
+# One SQLite file shared by every stage and process
+# (WAL mode), with a small in-process LRU in front of it.
+# Used by the datasets (LigandCombinationDataset,
+# ComplexDataset); the oracle keeps its ligand graphs in the
+# packed graph store (engine/graph_store.py) instead.
+# LIGAND_GRAPH_CACHE=0 disables it.
+# ============================================================
+
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+CACHE_PATH = os.environ.get("LIGAND_GRAPH_CACHE", "ligand_graph_cache.sqlite")
+MAX_ENTRIES = int(os.environ.get("LIGAND_GRAPH_CACHE_MAX", 200000))
+MEMORY_ENTRIES = 4096
+TOUCH_FLUSH = 256
+
+_MISSING = object()
+
+
+def _blob(t):
+    return t.detach().cpu().numpy().tobytes()
+
+
+class LigandGraphCache:
+    """
+    Bounded on-disk cache: when it grows past max_entries the least
+    recently used 10% is evicted.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES,
+                 memory_entries=MEMORY_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()
+        self._touched = {}
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS graphs ("
+            " key TEXT PRIMARY KEY,"
+            " n_nodes INTEGER NOT NULL, n_feats INTEGER NOT NULL,"
+            " n_edges INTEGER NOT NULL,"
+            " x BLOB, edge_index BLOB,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS graphs_last_used ON graphs(last_used)"
+        )
+        self._db.commit()
+
+        # Approximate (other processes insert too); recounted before evicting
+        self._n_entries = self._db.execute("SELECT COUNT(*) FROM graphs").fetchone()[0]
+
+    # ------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------
+    def key(self, featurizer: str, smiles: str, donor: str) -> str:
+        # The raw spelling, not canonical SMILES: implicit valence and
+        # H counts depend on it ("OS(C)C" vs "C[SH](C)O")
+        text = f"{featurizer}|{smiles}|{donor}"
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------
+    def get(self, featurizer: str, smiles: str, donor: str, build):
+        """
+        Cached build(smiles) result: (x, edge_index) or None.
+        """
+        return self.get_many(featurizer, [(smiles, donor)], lambda items: [build()])[0]
+
+    def get_many(self, featurizer: str, items, build_many):
+        """
+        Cached results for a list of (smiles, donor) items; all misses
+        are built together by build_many(missing items) -> list.
+        """
+        keys = [self.key(featurizer, smi, donor) for smi, donor in items]
+
+        out = [None] * len(keys)
+        todo = {}
+        for i, key in enumerate(keys):
+            value = self._lookup(key)
+            if value is _MISSING:
+                todo.setdefault(key, []).append(i)
+            else:
+                out[i] = value
+
+        if todo:
+            self.misses += len(todo)
+            built = build_many([items[idx[0]] for idx in todo.values()])
+            self._store_many(list(todo), built)
+
+            for (key, idx), value in zip(todo.items(), built):
+                self._remember(key, value)
+                for i in idx:
+                    out[i] = value
+
+        return out
+
+    def _lookup(self, key):
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self._touch(key)
+            return value
+
+        value = self._load(key)
+        if value is not _MISSING:
+            self.hits += 1
+            self.disk_hits += 1
+            self._touch(key)
+            self._remember(key, value)
+        return value
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key):
+        row = self._db.execute(
+            "SELECT n_nodes, n_feats, n_edges, x, edge_index FROM graphs WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+
+        n_nodes, n_feats, n_edges, xb, eb = row
+        if n_nodes < 0:
+            return None
+
+        x = np.frombuffer(xb, dtype=np.float32).reshape(n_nodes, n_feats).copy()
+        ei = np.frombuffer(eb, dtype=np.int64).reshape(2, n_edges).copy()
+        return torch.from_numpy(x), torch.from_numpy(ei)
+
+    def _store_many(self, keys, values):
+        now = time.time()
+        records = []
+        for key, value in zip(keys, values):
+            if value is None:
+                records.append((key, -1, 0, 0, None, None, now))
+                continue
+            x, ei = value
+            x = x.to(torch.float32)
+            ei = ei.to(torch.long)
+            records.append((
+                key, int(x.size(0)), int(x.size(1)), int(ei.size(1)),
+                _blob(x), _blob(ei), now
+            ))
+
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO graphs VALUES (?, ?, ?, ?, ?, ?, ?)", records
+            )
+            self._flush_touched()
+            self._evict(len(records))
+            self._db.commit()
+
+    # ------------------------------------------------------------
+    # LRU bookkeeping
+    # ------------------------------------------------------------
+    def _touch(self, key):
+        self._touched[key] = time.time()
+        if len(self._touched) >= TOUCH_FLUSH:
+            self.flush()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE graphs SET last_used = ? WHERE key = ?",
+                [(t, k) for k, t in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self, n_new=1):
+        self._n_entries += n_new
+        if self._n_entries <= self.max_entries:
+            return
+
+        n = self._db.execute("SELECT COUNT(*) FROM graphs").fetchone()[0]
+        self._n_entries = n
+        if n <= self.max_entries:
+            return
+
+        n_drop = n - int(self.max_entries * 0.9)
+        self._db.execute(
+            "DELETE FROM graphs WHERE key IN ("
+            " SELECT key FROM graphs ORDER BY last_used LIMIT ?)",
+            (n_drop,)
+        )
+        self.evictions += n_drop
+        self._n_entries -= n_drop
+
+    def flush(self):
+        with self._lock:
+            self._flush_touched()
+            self._db.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_CACHE = None
+
+
+def get_cache():
+    """
+    Process-wide cache, or None when LIGAND_GRAPH_CACHE=0.
+    """
+    global _CACHE
+    if CACHE_PATH in ("", "0"):
+        return None
+    if _CACHE is None:
+        _CACHE = LigandGraphCache(CACHE_PATH)
+        atexit.register(_CACHE.flush)
+    return _CACHE
+
+
+def cached_graph(featurizer: str, smiles: str, donor: str, build):
+    cache = get_cache()
+    if cache is None:
+        return build()
+    return cache.get(featurizer, smiles, donor, build)
+
+
+def cached_graphs(featurizer: str, items, build_many):
+    """
+    Batch cached_graph: items is a list of (smiles, donor),
+    build_many(missing items) builds the misses in one go.
+    """
+    cache = get_cache()
+    if cache is None:
+        return build_many(list(items))
+    return cache.get_many(featurizer, list(items), build_many)
@@ -10,12 +10,11 @@ import torch
 from torch_geometric.data import InMemoryDataset, Data
 import numpy as np
 
-try:
-    from rdkit import Chem
-    from rdkit.Chem import AllChem
-    RDKit_AVAILABLE = True
-except Exception:
-    RDKit_AVAILABLE = False
+from featurizer import RDKit_AVAILABLE, featurize_batch
+from graph_cache import cached_graphs
+
+# Bump when node features change: invalidates graph_cache entries
+FEATURIZER_VERSION = "ligand_dataset/2"
 
 PAULING_EN = {
     "H": 2.20, "C": 2.55, "N": 3.04, "O": 3.44, "F": 3.98,
@@ -28,65 +27,32 @@ def atom_en(sym: str) -> float:
         return 0.0
     return float(PAULING_EN.get(str(sym).strip().upper(), 0.0))
 
+def donor_key(donor_symbol) -> str:
+    """
+    Donor symbol as seen by the featurizer ("X" = no donor flag).
+    """
+    if not donor_symbol:
+        return "X"
+    d = str(donor_symbol).strip().upper()
+    return "X" if d in ("", "X", "NAN", "NONE") else d
+
 def build_mol_graph_from_smiles_with_donor(smiles: str, donor_symbol: str = None):
-    if not RDKit_AVAILABLE:
-        raise RuntimeError("RDKit not available")
-
-    mol = Chem.MolFromSmiles(smiles)
-    if mol is None:
-        return torch.tensor([[0.0]*11], dtype=torch.float32), torch.zeros((2,0), dtype=torch.long)
-
-    try:
-        AllChem.ComputeGasteigerCharges(mol)
-    except Exception:
-        pass
-
-    feats = []
-    for atom in mol.GetAtoms():
-        sym = atom.GetSymbol()
-        z = float(atom.GetAtomicNum())
-        deg = float(atom.GetDegree())
-        tot_h = float(atom.GetTotalNumHs())
-        arom = float(atom.GetIsAromatic())
-        fcharge = float(atom.GetFormalCharge())
-        impval = float(atom.GetImplicitValence())
-        bias = 1.0
-
-        atom_en_val = atom_en(sym)
-        is_donor = 0.0
-        donor_en = 0.0
-        if donor_symbol and str(donor_symbol).strip().upper() not in ("", "X", "NAN", "NONE"):
-            if sym.upper() == str(donor_symbol).strip().upper():
-                is_donor = 1.0
-                donor_en = atom_en_val
-
-        g_charge = 0.0
-        try:
-            if atom.HasProp("_GasteigerCharge"):
-                raw = atom.GetProp("_GasteigerCharge")
-                g_charge = float(str(raw))
-                if not np.isfinite(g_charge):
-                    g_charge = 0.0
-        except Exception:
-            g_charge = 0.0
-
-        feat = [z, deg, tot_h, arom, fcharge, impval, bias,
-                atom_en_val, is_donor, donor_en, g_charge]
-        feat = [0.0 if (not np.isfinite(float(v))) else float(v) for v in feat]
-        feats.append(feat)
-
-    x = torch.tensor(feats, dtype=torch.float32)
-
-    ei0, ei1 = [], []
-    for b in mol.GetBonds():
-        a = b.GetBeginAtomIdx(); c = b.GetEndAtomIdx()
-        ei0.extend([a, c]); ei1.extend([c, a])
-    if len(ei0) == 0:
-        edge_index = torch.zeros((2,0), dtype=torch.long)
-    else:
-        edge_index = torch.tensor([ei0, ei1], dtype=torch.long)
-
-    return x, edge_index
+    return build_mol_graphs([(smiles, donor_key(donor_symbol))])[0]
+
+def build_mol_graphs(items):
+    """
+    [(smiles, donor_key)] -> [(x, edge_index)] as one featurizer batch;
+    unparsable SMILES give a single all-zero node, ligands RDKit raises
+    on the fallback node.
+    """
+    smiles = [smi for smi, _ in items]
+    donors = [da for _, da in items]
+    batch = featurize_batch(smiles, donors, PAULING_EN, invalid_as_node=True)
+
+    graphs = batch.graphs()
+    for i in np.flatnonzero(batch.failed):
+        graphs[i] = _fallback_graph(*items[i])
+    return graphs
 
 def build_fallback_ligand_node_feature(smiles: str, donor_symbol: str):
     da = str(donor_symbol).strip().upper() if donor_symbol is not None else ""
@@ -96,15 +62,68 @@ def build_fallback_ligand_node_feature(smiles: str, donor_symbol: str):
     feat = [0.0 if (not np.isfinite(float(v))) else float(v) for v in feat]
     return torch.tensor(feat, dtype=torch.float32)
 
+def ligand_slot_key(smiles_row, da_row, i):
+    """
+    (smiles, donor atom) of slot i; missing slots become "X".
+    """
+    smi = str(smiles_row[i]).strip() if i < len(smiles_row) else "X"
+    da = str(da_row[i]).strip() if i < len(da_row) else "X"
+    return smi, da
+
+def _fallback_graph(smi: str, da: str):
+    xi = build_fallback_ligand_node_feature(smi, da).unsqueeze(0)
+    return xi, torch.zeros((2, 0), dtype=torch.long)
+
+def build_ligand_graph(smi: str, da: str):
+    """
+    Graph of one ligand slot: RDKit graph, or the 1-node fallback
+    for empty slots / unparsable ligands. Always returns 2-D x.
+    """
+    return build_ligand_graphs([(smi, da)])[0]
+
+def build_ligand_graphs(slots, cache: bool = True):
+    """
+    build_ligand_graph for a list of (smiles, donor atom) slots, with
+    every RDKit ligand featurized in one batch. cache=False skips the
+    graph cache (for callers that persist the graphs themselves).
+    """
+    out = [None] * len(slots)
+    todo = []
+    for i, (smi, da) in enumerate(slots):
+        if smi.upper() in ("", "X", "NAN", "NONE") or not RDKit_AVAILABLE:
+            out[i] = _fallback_graph(smi, da)
+        else:
+            todo.append(i)
+
+    if todo:
+        items = [(slots[i][0], donor_key(slots[i][1])) for i in todo]
+        if cache:
+            graphs = cached_graphs(FEATURIZER_VERSION, items, build_mol_graphs)
+        else:
+            graphs = build_mol_graphs(items)
+        for i, g in zip(todo, graphs):
+            out[i] = g
+
+    return [(xi.unsqueeze(0) if xi.dim() == 1 else xi, ei) for xi, ei in out]
+
 class LigandCombinationDataset(InMemoryDataset):
     def __init__(self, smiles_lists, donor_lists, da_lists, y, transform=None, pre_transform=None):
         super().__init__(None, transform, pre_transform)
         data_list = []
         n = len(y)
+        rows = []
         for i in range(n):
             s_row = smiles_lists[i] if smiles_lists is not None else ["X"]*6
             d_row = donor_lists[i] if donor_lists is not None else [0]*6
             da_row = da_lists[i] if da_lists is not None else ["X"]*6
+            rows.append((s_row, d_row, da_row))
+
+        # featurize every distinct ligand slot of the dataset in one batch
+        slots = sorted({ligand_slot_key(s_row, da_row, j)
+                        for s_row, _, da_row in rows for j in range(6)})
+        self._graphs = dict(zip(slots, build_ligand_graphs(slots)))
+
+        for i, (s_row, d_row, da_row) in enumerate(rows):
             data = self._build_row_graph(s_row, d_row, da_row, y[i], row_index=i)
             data_list.append(data)
         self.data, self.slices = self.collate(data_list)
@@ -115,25 +134,8 @@ class LigandCombinationDataset(InMemoryDataset):
         offset = 0
 
         for i in range(6):
-            smi = str(smiles_row[i]).strip() if i < len(smiles_row) else "X"
-            da = str(da_row[i]).strip() if i < len(da_row) else "X"
-
-            if smi.upper() in ("", "X", "NAN", "NONE"):
-                xi = build_fallback_ligand_node_feature(smi, da).unsqueeze(0)
-                ei = torch.zeros((2, 0), dtype=torch.long)
-            else:
-                if RDKit_AVAILABLE:
-                    try:
-                        xi, ei = build_mol_graph_from_smiles_with_donor(smi, da)
-                    except Exception:
-                        xi = build_fallback_ligand_node_feature(smi, da).unsqueeze(0)
-                        ei = torch.zeros((2, 0), dtype=torch.long)
-                else:
-                    xi = build_fallback_ligand_node_feature(smi, da).unsqueeze(0)
-                    ei = torch.zeros((2, 0), dtype=torch.long)
-
-            if xi.dim() == 1:
-                xi = xi.unsqueeze(0)
+            smi, da = ligand_slot_key(smiles_row, da_row, i)
+            xi, ei = self._graphs.get((smi, da)) or build_ligand_graph(smi, da)
             node_feats.append(xi)
 
             if ei.numel() > 0:
@@ -2,6 +2,9 @@
 """
 LigandGNN - simple GNN encoder + MLP head.
 Provides init_output_bias(val) helper.
+
+StackedLigandGNN - several trained LigandGNNs fused into one
+eval-only forward (BatchNorm and output scalers folded in).
 """
 import torch
 import torch.nn as nn
@@ -39,22 +42,259 @@ class LigandGNN(nn.Module):
         self.head = MLP(hidden_dim, hidden_dim, hidden_dim, n_layers=2, dropout=dropout)
         self.lin_out = nn.Linear(hidden_dim, 1)
 
-    def forward(self, data):
-        x, edge_index, batch = data.x, data.edge_index, getattr(data, "batch", None)
-        if batch is None:
-            batch = x.new_zeros(x.size(0), dtype=torch.long)
+    def embed_nodes(self, x, edge_index):
+        """
+        Conv stack only. Nodes of disconnected ligands never mix
+        here (in eval mode), so per-ligand results can be cached.
+        """
         for conv, bn in zip(self.convs, self.bns):
             x = conv(x, edge_index)
             x = bn(x)
             x = F.relu(x)
-        g = global_mean_pool(x, batch)
+        return x
+
+    def readout(self, g):
+        """
+        MLP head on pooled graph vectors.
+        """
         h = self.head(g)
         out = self.lin_out(h).view(-1, 1)
         return out.squeeze(-1)
 
+    def forward(self, data):
+        x, edge_index, batch = data.x, data.edge_index, getattr(data, "batch", None)
+        if batch is None:
+            batch = x.new_zeros(x.size(0), dtype=torch.long)
+        x = self.embed_nodes(x, edge_index)
+        g = global_mean_pool(x, batch)
+        return self.readout(g)
+
     def init_output_bias(self, val: float):
         with torch.no_grad():
             try:
                 self.lin_out.bias.fill_(float(val))
             except Exception:
                 pass
+
+
+def _bn_affine(bn):
+    """
+    Eval-mode BatchNorm1d as y = x * scale + shift.
+    """
+    scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+    shift = bn.bias - bn.running_mean * scale
+    return scale, shift
+
+
+def _scaler_affine(scaler):
+    """
+    StandardScaler.inverse_transform as y = x * scale + mean.
+    """
+    if scaler is None:
+        return 1.0, 0.0
+    scale = float(scaler.scale_[0]) if getattr(scaler, "scale_", None) is not None else 1.0
+    mean = float(scaler.mean_[0]) if getattr(scaler, "mean_", None) is not None else 0.0
+    return scale, mean
+
+
+def _frozen(t):
+    return nn.Parameter(t.detach().clone().contiguous(), requires_grad=False)
+
+
+def csr_adjacency(edge_index, n_nodes: int, dtype: torch.dtype = torch.float32):
+    """
+    Sparse CSR matrix with one entry per edge j -> i in row i, so
+    adj @ h is the GraphConv (aggr="add") neighbour sum of h. Built
+    once per batch and shared by every layer.
+    """
+    dst, src = edge_index[1], edge_index[0]
+    order = torch.argsort(dst, stable=True)
+    crow = torch.zeros(n_nodes + 1, dtype=torch.long, device=edge_index.device)
+    crow[1:] = torch.cumsum(torch.bincount(dst, minlength=n_nodes), 0)
+    values = torch.ones(src.size(0), dtype=dtype, device=edge_index.device)
+    return torch.sparse_csr_tensor(crow, src[order], values, (n_nodes, n_nodes))
+
+
+class StackedLigandGNN(nn.Module):
+    """
+    M LigandGNN checkpoints that share node features, evaluated in
+    one pass. Node states are kept side by side as [N, M*H]: the
+    neighbour sum runs once for all models, the first layer is one
+    matmul over the shared input, BatchNorm is folded into the conv
+    weights and each output is already inverse-scaled.
+
+    Same interface as LigandGNN: embed_nodes() / readout() / forward(),
+    with an [N, M*H] node embedding and a [B, M] output.
+
+    aggregation="csr" computes the neighbour sums as sparse-dense
+    matmuls with one CSR adjacency per batch; "scatter" uses
+    index_add_ over edge_index.
+    """
+
+    def __init__(self, models, scalers=None, aggregation: str = "csr"):
+        super().__init__()
+        if scalers is None:
+            scalers = [None] * len(models)
+        if aggregation not in ("csr", "scatter"):
+            raise ValueError(f"Unknown aggregation: {aggregation}")
+        self.aggregation = aggregation
+
+        M = len(models)
+        self.n_models = M
+        self.hidden_dim = models[0].lin_out.in_features
+        self.n_layers = len(models[0].convs)
+
+        with torch.no_grad():
+            convs = []
+            for layer in range(self.n_layers):
+                for m in models:
+                    conv, bn = m.convs[layer], m.bns[layer]
+                    s, t = _bn_affine(bn)
+                    convs.append((
+                        (conv.lin_rel.weight * s[:, None]).t(),
+                        (conv.lin_root.weight * s[:, None]).t(),
+                        conv.lin_rel.bias * s + t,
+                    ))
+
+            head = []
+            for m, scaler in zip(models, scalers):
+                layers = [l for l in m.head.net if isinstance(l, nn.Linear)]
+                scale, mean = _scaler_affine(scaler)
+                for l in layers:
+                    head.append((l.weight.t(), l.bias))
+                head.append((m.lin_out.weight.t() * scale, m.lin_out.bias * scale + mean))
+
+        # first layer input is shared: [F, M*H] weights, one matmul
+        self.w_rel0 = _frozen(torch.cat([w for w, _, _ in convs[:M]], dim=1))
+        self.w_root0 = _frozen(torch.cat([w for _, w, _ in convs[:M]], dim=1))
+        self.b0 = _frozen(torch.cat([b for _, _, b in convs[:M]]))
+
+        # deeper layers: one (w_rel, w_root, b) per (layer, model)
+        self.w_rel = nn.ParameterList([_frozen(w) for w, _, _ in convs[M:]])
+        self.w_root = nn.ParameterList([_frozen(w) for _, w, _ in convs[M:]])
+        self.b = nn.ParameterList([_frozen(b) for _, _, b in convs[M:]])
+
+        # head linears + scaled lin_out, per model
+        self.head_depth = len(head) // M
+        self.head_w = nn.ParameterList([_frozen(w) for w, _ in head])
+        self.head_b = nn.ParameterList([_frozen(b) for _, b in head])
+
+        self.eval()
+
+    @staticmethod
+    def _neighbour_sum(h, edge_index):
+        # sum of x_j over edges j -> i (GraphConv, aggr="add")
+        out = torch.zeros_like(h)
+        return out.index_add_(0, edge_index[1], h.index_select(0, edge_index[0]))
+
+    def embed_nodes(self, x, edge_index):
+        M, H = self.n_models, self.hidden_dim
+
+        if self.aggregation == "csr":
+            adj = csr_adjacency(edge_index, x.size(0), x.dtype)
+            neighbour_sum = adj.matmul
+        else:
+            neighbour_sum = lambda h: self._neighbour_sum(h, edge_index)
+
+        agg = neighbour_sum(x)
+        h = torch.addmm(self.b0, agg, self.w_rel0).addmm_(x, self.w_root0).relu_()
+
+        for layer in range(self.n_layers - 1):
+            agg = neighbour_sum(h)
+            outs = []
+            for m in range(M):
+                i = layer * M + m
+                cols = slice(m * H, (m + 1) * H)
+                outs.append(
+                    torch.addmm(self.b[i], agg[:, cols], self.w_rel[i])
+                    .addmm_(h[:, cols], self.w_root[i])
+                )
+            h = torch.cat(outs, dim=1).relu_()
+
+        return h
+
+    def readout(self, g):
+        M, H, D = self.n_models, self.hidden_dim, self.head_depth
+
+        outs = []
+        for m in range(M):
+            h = g[:, m * H:(m + 1) * H]
+            for j in range(D):
+                i = m * D + j
+                h = torch.addmm(self.head_b[i], h, self.head_w[i])
+                # ReLU between head linears; none before / after lin_out
+                if j < D - 2:
+                    h = h.relu()
+            outs.append(h)
+
+        return torch.cat(outs, dim=1)
+
+    def forward(self, data):
+        x, edge_index, batch = data.x, data.edge_index, getattr(data, "batch", None)
+        if batch is None:
+            batch = x.new_zeros(x.size(0), dtype=torch.long)
+        h = self.embed_nodes(x, edge_index)
+        g = global_mean_pool(h, batch)
+        return self.readout(g)
+
+
+class FoldedLigandGNN(nn.Module):
+    """
+    One LigandGNN checkpoint for eval-only export: BatchNorm folded
+    into the conv linears, output scaler folded into lin_out, and
+    every weight an nn.Linear (so dynamic int8 quantization applies).
+    Neighbour sums use one CSR adjacency for all layers.
+    TorchScript-able; forward takes tensors instead of a Data batch.
+    """
+
+    def __init__(self, model, scaler=None):
+        super().__init__()
+        hidden = model.lin_out.in_features
+
+        self.rel = nn.ModuleList()
+        self.root = nn.ModuleList()
+        with torch.no_grad():
+            for conv, bn in zip(model.convs, model.bns):
+                s, t = _bn_affine(bn)
+                rel = nn.Linear(conv.lin_rel.weight.size(1), hidden)
+                rel.weight.copy_(conv.lin_rel.weight * s[:, None])
+                rel.bias.copy_(conv.lin_rel.bias * s + t)
+                root = nn.Linear(conv.lin_root.weight.size(1), hidden, bias=False)
+                root.weight.copy_(conv.lin_root.weight * s[:, None])
+                self.rel.append(rel)
+                self.root.append(root)
+
+            layers = []
+            for l in model.head.net:
+                if isinstance(l, nn.Linear):
+                    lin = nn.Linear(l.in_features, l.out_features)
+                    lin.load_state_dict(l.state_dict())
+                    layers.append(lin)
+                elif isinstance(l, nn.ReLU):
+                    layers.append(nn.ReLU())
+            self.head = nn.Sequential(*layers)
+
+            scale, mean = _scaler_affine(scaler)
+            self.lin_out = nn.Linear(hidden, 1)
+            self.lin_out.weight.copy_(model.lin_out.weight * scale)
+            self.lin_out.bias.copy_(model.lin_out.bias * scale + mean)
+
+        self.eval()
+
+    @torch.jit.export
+    def embed_nodes(self, x, edge_index):
+        adj = csr_adjacency(edge_index, x.size(0), x.dtype)
+        for rel, root in zip(self.rel, self.root):
+            x = torch.relu(rel(adj @ x) + root(x))
+        return x
+
+    @torch.jit.export
+    def readout(self, g):
+        return self.lin_out(self.head(g))
+
+    def forward(self, x, edge_index, batch):
+        h = self.embed_nodes(x, edge_index)
+        n = int(batch.max()) + 1
+        g = h.new_zeros((n, h.size(1))).index_add_(0, batch, h)
+        counts = torch.bincount(batch, minlength=n).clamp(min=1).to(h.dtype)
+        return self.readout(g / counts.unsqueeze(-1))
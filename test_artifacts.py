@@ -0,0 +1,89 @@
+# ==========================================================
+# test_artifacts.py
+# Columnar .npz tables: round-trips and mmap reads
+# ==========================================================
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from engine import artifacts
+
+
+def sample_table():
+    return pd.DataFrame({
+        "smiles": ["CCN", "OCCO", None, "c1ccncc1", ""],
+        "label": ["α-ligand", "b", "c", None, "e"],
+        "donors": np.array([1, 2, 0, 1, 3], dtype=np.int64),
+        "zfs_pred": [-1.5, 2.25, np.nan, 0.0, 1e-9],
+        "elite": [True, False, True, False, True],
+        "count": np.array([7, 8, 9, 10, 11], dtype=np.uint8),
+    })
+
+
+def test_table_round_trip(tmp_path):
+    df = sample_table()
+    path = str(tmp_path / "table.npz")
+    artifacts.write_table(df, path)
+
+    for mmap in (False, True):
+        back = artifacts.read_table(path, mmap=mmap)
+        assert list(back.columns) == list(df.columns)
+        for col in ("donors", "zfs_pred", "elite", "count"):
+            assert back[col].dtype == df[col].dtype
+            np.testing.assert_array_equal(np.asarray(back[col]), df[col].to_numpy())
+        assert back["smiles"].tolist() == df["smiles"].tolist()
+        assert back["label"].tolist() == df["label"].tolist()
+
+
+def test_repetitive_strings_round_trip(tmp_path):
+    values = ["CCN", "X", None, "OCCO", "X", "CCN", "X", "", None, "α"] * 3
+    df = pd.DataFrame({"ligand": values, "unique": [f"L{i}" for i in range(len(values))]})
+    path = str(tmp_path / "table.npz")
+    artifacts.write_table(df, path)
+
+    # stored as distinct strings + codes only when that is smaller
+    schema = json.loads(str(artifacts.read_arrays(path)[artifacts.SCHEMA][()]))
+    assert {c["name"]: c["kind"] for c in schema} == {"ligand": "cat", "unique": "str"}
+
+    for mmap in (False, True):
+        back = artifacts.read_table(path, mmap=mmap)
+        assert back["ligand"].tolist() == values
+        assert back["unique"].tolist() == df["unique"].tolist()
+
+
+def test_mmap_reads_are_views_of_the_file(tmp_path):
+    path = str(tmp_path / "arrays.npz")
+    x = np.arange(12, dtype=np.float32).reshape(3, 4)
+    fortran = np.asfortranarray(np.arange(6, dtype=np.int64).reshape(2, 3))
+    artifacts.write_arrays(path, x=x, fortran=fortran, empty=np.zeros((0, 2)),
+                           name=np.array("graph"))
+
+    mapped = artifacts.read_arrays(path, mmap=True)
+    assert isinstance(mapped["x"], np.memmap)
+    assert not mapped["x"].flags.writeable
+    np.testing.assert_array_equal(mapped["x"], x)
+    np.testing.assert_array_equal(mapped["fortran"], fortran)
+    assert mapped["empty"].shape == (0, 2)
+    assert str(mapped["name"][()]) == "graph"
+
+    # replacing the file keeps existing maps valid
+    artifacts.write_arrays(path, x=x + 1)
+    np.testing.assert_array_equal(mapped["x"], x)
+    np.testing.assert_array_equal(artifacts.read_arrays(path)["x"], x + 1)
+
+
+def test_compressed_members_are_loaded(tmp_path):
+    path = str(tmp_path / "compressed.npz")
+    np.savez_compressed(path, a=np.arange(10))
+    a = artifacts.read_arrays(path, mmap=True)["a"]
+    assert not isinstance(a, np.memmap)
+    np.testing.assert_array_equal(a, np.arange(10))
+
+
+def test_string_codec():
+    values = ["CCN", None, "", "Fe–N", "c1ccncc1"]
+    data, offsets, isnull = artifacts.encode_strings(values)
+    assert isnull.tolist() == [False, True, False, False, False]
+    assert artifacts.decode_strings(data, offsets, isnull).tolist() == values
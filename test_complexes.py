@@ -0,0 +1,82 @@
+# ==========================================================
+# test_complexes.py
+# Vectorised complex sampler + donor-pattern feasibility
+# ==========================================================
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from engine.complexes import (
+    ALLOWED_PATTERNS, ComplexSampler, build_complexes, pattern_probs, sample_complexes,
+)
+from engine.registry import LigandRegistry
+
+
+def mode_map(n_per_denticity=8):
+    """
+    Every denticity 1..6 gets its own ligands, and a few ligands have
+    several modes so the same id sits in more than one pool.
+    """
+    modes = {}
+    for d in range(1, 7):
+        for i in range(n_per_denticity):
+            modes[f"L{d}_{i}"] = [d]
+    modes["M12"] = [1, 2]
+    modes["M13"] = [1, 3]
+    modes["M123"] = [1, 2, 3]
+    return modes
+
+
+def test_complexes_never_repeat_a_ligand():
+    registry = LigandRegistry()
+    modes = mode_map(n_per_denticity=3)
+    complexes = build_complexes(registry, modes, n_complexes=5000,
+                                rng=np.random.default_rng(0))
+
+    assert len(complexes) == 5000
+    for ids, donors in zip(complexes.ids.tolist(), complexes.donors.tolist()):
+        used = [i for i in ids if i >= 0]
+        assert len(used) == len(set(used))
+
+        # each slot's denticity is one of that ligand's modes
+        for i, d in zip(ids, donors):
+            if i >= 0:
+                assert d in registry.modes[i]
+
+        pattern = tuple(sorted(d for d in donors if d > 0))
+        assert sum(pattern) == 6
+
+
+def test_pattern_weights_are_respected():
+    registry = LigandRegistry()
+    sampler = ComplexSampler(registry, mode_map())
+    patterns, probs = pattern_probs(sampler)
+    assert sorted(patterns) == sorted(ALLOWED_PATTERNS)
+
+    n = 50000
+    complexes = sample_complexes(sampler, patterns, probs, n, np.random.default_rng(1))
+    counts = Counter(tuple(d for d in row if d > 0) for row in complexes.donors.tolist())
+
+    for pattern, p in zip(patterns, probs):
+        assert abs(counts[pattern] / n - p) < 0.01
+
+
+def test_infeasible_patterns_are_rejected():
+    # one tridentate ligand cannot fill (3, 3)
+    sampler = ComplexSampler(LigandRegistry(), {"A": [3], "B": [1], "C": [2]})
+    assert not sampler.feasible((3, 3))
+
+    # every pool of (1, 2, 3) is non-empty, but denticities 1 and 2 share
+    # a single ligand (Hall's condition fails on the subset {1, 2})
+    sampler = ComplexSampler(LigandRegistry(), {"A": [1, 2], "B": [3], "C": [6]})
+    assert not sampler.feasible((1, 2, 3))
+    assert sampler.feasible((6,))
+
+    patterns, probs = pattern_probs(sampler)
+    assert patterns == [(6,)]
+    assert probs.tolist() == [1.0]
+
+    with pytest.raises(ValueError):
+        pattern_probs(ComplexSampler(LigandRegistry(), {"A": [1, 2]}))
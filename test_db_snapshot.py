@@ -0,0 +1,67 @@
+# ==========================================================
+# test_db_snapshot.py
+# Database snapshots: compiled once, reused without hashing
+# the CSV while its size / mtime are unchanged
+# ==========================================================
+
+import hashlib
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from engine import db_snapshot
+from engine.ingest import donor_modes, ligand_occurrences
+from engine.modes import MODE_CONFIG, base_path
+
+
+def setup_snapshot(tmp_path, monkeypatch):
+    csv = str(tmp_path / "opt_D.csv")
+    shutil.copy(base_path("opt_D.csv"), csv)
+    cfg = dict(MODE_CONFIG["optimized"], database=csv)
+
+    monkeypatch.setattr(db_snapshot, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(db_snapshot, "mode_config", lambda mode: cfg)
+
+    hashed, compiled = [], []
+    _hash, compile_database = db_snapshot._hash, db_snapshot.compile_database
+    monkeypatch.setattr(db_snapshot, "_hash", lambda f: hashed.append(f) or _hash(f))
+    monkeypatch.setattr(db_snapshot, "compile_database",
+                        lambda *a: compiled.append(a) or compile_database(*a))
+    return csv, hashed, compiled
+
+
+def test_snapshot_reused_without_hashing(tmp_path, monkeypatch):
+    csv, hashed, compiled = setup_snapshot(tmp_path, monkeypatch)
+
+    snap = db_snapshot.build_snapshot("optimized")
+    assert (len(hashed), len(compiled)) == (1, 1)
+
+    df = pd.read_csv(csv)
+    assert list(snap.table.columns) == list(df.columns)
+    pd.testing.assert_frame_equal(snap.donor_modes, donor_modes(ligand_occurrences(df)))
+
+    # unchanged file: neither hashed nor compiled, tables read back
+    again = db_snapshot.build_snapshot("optimized")
+    with open(csv, "rb") as f:
+        assert db_snapshot.source_digest(csv) == hashlib.sha1(f.read()).hexdigest()
+    assert (len(hashed), len(compiled)) == (1, 1)
+    np.testing.assert_array_equal(again.table["opt_zfs"].to_numpy(),
+                                  snap.table["opt_zfs"].to_numpy())
+    pd.testing.assert_frame_equal(again.donor_modes, snap.donor_modes)
+
+    # touched, same content: hashed again, not compiled, meta refreshed
+    st = os.stat(csv)
+    os.utime(csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    db_snapshot.build_snapshot("optimized")
+    assert (len(hashed), len(compiled)) == (2, 1)
+    db_snapshot.build_snapshot("optimized")
+    assert (len(hashed), len(compiled)) == (2, 1)
+
+    # new content: compiled again
+    with open(csv, "a") as f:
+        f.write(df.iloc[[0]].to_csv(header=False, index=False))
+    snap = db_snapshot.build_snapshot("optimized")
+    assert (len(hashed), len(compiled)) == (3, 2)
+    assert len(snap.table) == len(df) + 1
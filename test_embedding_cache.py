@@ -0,0 +1,69 @@
+# ==========================================================
+# test_embedding_cache.py
+# Cached per-ligand embeddings == full complex graphs
+# Fused StackedLigandGNN == separate checkpoints
+# ==========================================================
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from engine.oracle import Oracle
+
+
+def sample_complexes(n=96, seed=0):
+    db = pd.read_csv("opt_D.csv")
+    ligands = sorted({
+        lig for i in range(1, 7) for lig in db[f"L{i}"].dropna().astype(str)
+        if lig != "X"
+    })
+
+    rng = random.Random(seed)
+    combos = [rng.sample(ligands, rng.randint(1, 6)) for _ in range(n)]
+
+    # unparsable ligand + explicit empty slot go through the fallback paths
+    combos.append(["not_a_smiles", "X"])
+    return combos
+
+
+def test_embedding_cache_matches_full_graph():
+    combos = sample_complexes()
+
+    full = Oracle("optimized", embedding_cache=False, store=False, fused=False)
+    cached = Oracle("optimized", embedding_cache=True, store=False, fused=False)
+
+    p_full = full.predict(combos)
+    p_cached = cached.predict(combos)
+
+    np.testing.assert_allclose(p_cached[:, 0], p_full[:, 0], rtol=1e-4, atol=1e-4)
+    np.testing.assert_allclose(p_cached[:, 1], p_full[:, 1], rtol=1e-4, atol=1e-5)
+
+    # second pass is served from the cache only
+    misses = cached.embedding_cache.misses
+    p_again = cached.predict(combos)
+    assert cached.embedding_cache.misses == misses
+    np.testing.assert_array_equal(p_again, p_cached)
+
+
+def test_fused_oracle_matches_separate_models():
+    combos = sample_complexes()
+
+    separate = Oracle("crystal", embedding_cache=False, store=False, fused=False,
+                      all_checkpoints=True)
+    fused = Oracle("crystal", embedding_cache=True, store=False, fused=True,
+                   all_checkpoints=True)
+
+    assert fused.columns == separate.columns
+    p_sep = separate.predict(combos)
+    p_fused = fused.predict(combos)
+
+    for j, col in enumerate(fused.columns):
+        atol = 1e-5 if col.startswith("ed_") else 1e-3
+        np.testing.assert_allclose(p_fused[:, j], p_sep[:, j], rtol=1e-4, atol=atol)
+
+
+if __name__ == "__main__":
+    test_embedding_cache_matches_full_graph()
+    test_fused_oracle_matches_separate_models()
+    print("✅ Embedding cache / fused oracle match the full-graph oracle")
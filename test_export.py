@@ -0,0 +1,80 @@
+# ==========================================================
+# test_export.py
+# Exported fp32 models == the eager checkpoints; artifacts
+# exported again when the checkpoint, scaler or layout changes
+# ==========================================================
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import export as oracle_export
+from engine import prediction_store
+from engine.export import database_ligand_lists
+from engine.modes import MODE_CONFIG, base_path
+from engine.oracle import Oracle, load_exported_checkpoint
+
+# cm-1 for ZFS, dimensionless E/D
+ATOL = 1e-3
+RTOL = 1e-4
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(oracle_export, "EXPORT_DIR", str(tmp_path / "export"))
+
+    exported = []
+    export_model = oracle_export.export_model
+    monkeypatch.setattr(oracle_export, "export_model",
+                        lambda *a: exported.append(a[2]) or export_model(*a))
+    return exported
+
+
+def test_fp32_matches_checkpoints(export_dir):
+    db = pd.read_csv("opt_D.csv").head(200)
+    ligand_lists = [l for l in database_ligand_lists(db) if l]
+
+    def predict(export):
+        oracle = Oracle("optimized", embedding_cache=False, store=False, fused=False,
+                        export=export, node_budget=0)
+        return oracle.predict(ligand_lists)
+
+    ref = predict("")
+    out = predict("fp32")
+    assert len(export_dir) == 2
+    assert out.shape == ref.shape and np.isfinite(ref).all()
+    np.testing.assert_allclose(out, ref, rtol=RTOL, atol=ATOL)
+
+
+def test_stale_artifacts_exported_again(export_dir, tmp_path, monkeypatch):
+    cfg = MODE_CONFIG["optimized"]
+    model, scaler = (str(tmp_path / cfg[k]) for k in ("zfs_model", "zfs_scaler"))
+    shutil.copy(base_path(cfg["zfs_model"]), model)
+    shutil.copy(base_path(cfg["zfs_scaler"]), scaler)
+    path = oracle_export.export_path(model, "fp32")
+
+    load_exported_checkpoint(model, scaler, "fp32")
+    load_exported_checkpoint(model, scaler, "fp32")
+    assert export_dir == [path] and os.path.exists(path)
+
+    # scaler changed (trailing bytes: the same scaler, another digest)
+    with open(scaler, "ab") as f:
+        f.write(b"\n")
+    load_exported_checkpoint(model, scaler, "fp32")
+    load_exported_checkpoint(model, scaler, "fp32")
+    assert export_dir == [path] * 2
+
+    # another kind is its own artifact
+    load_exported_checkpoint(model, scaler, "int8")
+    assert export_dir[-1] == oracle_export.export_path(model, "int8")
+
+    # layout changed
+    digest = prediction_store.files_digest([model, scaler])
+    assert oracle_export.load_exported(path, "fp32", digest, "cpu") is not None
+    monkeypatch.setattr(oracle_export, "EXPORT_VERSION", oracle_export.EXPORT_VERSION + 1)
+    assert oracle_export.load_exported(path, "fp32", digest, "cpu") is None
+    load_exported_checkpoint(model, scaler, "fp32")
+    assert export_dir[-1] == path and len(export_dir) == 4
@@ -0,0 +1,230 @@
+# ==========================================================
+# test_featurizer.py
+# Batch featurizer == the per-atom loops it replaced
+#
+# reference_smiles_to_graph / reference_mol_graph are the
+# baseline graph_features.smiles_to_graph and
+# ligand_dataset.build_mol_graph_from_smiles_with_donor,
+# kept here verbatim as the specification.
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+import torch
+from rdkit import Chem
+from rdkit.Chem import AllChem
+
+import featurizer
+import graph_features
+import ligand_dataset
+
+EXTRA_SMILES = [
+    "not_a_smiles", "C", "[Se]", "OS(C)C", "C[SH](C)O", "[O-]C(=O)C",
+    "c1ccncc1", "[2H]O", "P(c1ccccc1)(c1ccccc1)c1ccccc1", "[Cl-]", "N#C[S-]",
+]
+DONORS = ["X", "N", "O", "S", "P", "SE", "CL"]
+
+
+def reference_smiles_to_graph(smiles, donor_symbol="X"):
+    PAULING_EN = graph_features.PAULING_EN
+
+    def atom_en(sym):
+        return float(PAULING_EN.get(str(sym).upper(), 0.0))
+
+    def _safe_float(x):
+        try:
+            v = float(x)
+            if not np.isfinite(v):
+                return 0.0
+            return v
+        except Exception:
+            return 0.0
+
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        return None
+
+    try:
+        AllChem.ComputeGasteigerCharges(mol)
+    except Exception:
+        pass
+
+    feats = []
+    for atom in mol.GetAtoms():
+        sym = atom.GetSymbol()
+
+        g = 0.0
+        if atom.HasProp("_GasteigerCharge"):
+            g = _safe_float(atom.GetProp("_GasteigerCharge"))
+
+        feat = [
+            _safe_float(atom.GetAtomicNum()),
+            _safe_float(atom.GetDegree()),
+            _safe_float(atom.GetTotalNumHs()),
+            float(atom.GetIsAromatic()),
+            _safe_float(atom.GetFormalCharge()),
+            _safe_float(atom.GetImplicitValence()),
+            1.0,
+            atom_en(sym),
+            1.0 if sym.upper() == str(donor_symbol).upper() else 0.0,
+            atom_en(sym) if sym.upper() == str(donor_symbol).upper() else 0.0,
+            g
+        ]
+
+        feats.append([_safe_float(v) for v in feat])
+
+    x = torch.tensor(feats, dtype=torch.float32)
+
+    ei0, ei1 = [], []
+    for b in mol.GetBonds():
+        i, j = b.GetBeginAtomIdx(), b.GetEndAtomIdx()
+        ei0.extend([i, j])
+        ei1.extend([j, i])
+
+    if len(ei0) == 0:
+        edge_index = torch.zeros((2, 0), dtype=torch.long)
+    else:
+        edge_index = torch.tensor([ei0, ei1], dtype=torch.long)
+
+    return x, edge_index
+
+
+def reference_mol_graph(smiles, donor_symbol=None):
+    atom_en = ligand_dataset.atom_en
+
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        return torch.tensor([[0.0]*11], dtype=torch.float32), torch.zeros((2,0), dtype=torch.long)
+
+    try:
+        AllChem.ComputeGasteigerCharges(mol)
+    except Exception:
+        pass
+
+    feats = []
+    for atom in mol.GetAtoms():
+        sym = atom.GetSymbol()
+        z = float(atom.GetAtomicNum())
+        deg = float(atom.GetDegree())
+        tot_h = float(atom.GetTotalNumHs())
+        arom = float(atom.GetIsAromatic())
+        fcharge = float(atom.GetFormalCharge())
+        impval = float(atom.GetImplicitValence())
+        bias = 1.0
+
+        atom_en_val = atom_en(sym)
+        is_donor = 0.0
+        donor_en = 0.0
+        if donor_symbol and str(donor_symbol).strip().upper() not in ("", "X", "NAN", "NONE"):
+            if sym.upper() == str(donor_symbol).strip().upper():
+                is_donor = 1.0
+                donor_en = atom_en_val
+
+        g_charge = 0.0
+        try:
+            if atom.HasProp("_GasteigerCharge"):
+                raw = atom.GetProp("_GasteigerCharge")
+                g_charge = float(str(raw))
+                if not np.isfinite(g_charge):
+                    g_charge = 0.0
+        except Exception:
+            g_charge = 0.0
+
+        feat = [z, deg, tot_h, arom, fcharge, impval, bias,
+                atom_en_val, is_donor, donor_en, g_charge]
+        feat = [0.0 if (not np.isfinite(float(v))) else float(v) for v in feat]
+        feats.append(feat)
+
+    x = torch.tensor(feats, dtype=torch.float32)
+
+    ei0, ei1 = [], []
+    for b in mol.GetBonds():
+        a = b.GetBeginAtomIdx(); c = b.GetEndAtomIdx()
+        ei0.extend([a, c]); ei1.extend([c, a])
+    if len(ei0) == 0:
+        edge_index = torch.zeros((2,0), dtype=torch.long)
+    else:
+        edge_index = torch.tensor([ei0, ei1], dtype=torch.long)
+
+    return x, edge_index
+
+
+def ligand_slots():
+    """
+    Distinct (ligand, donor atom) slots of both databases, plus a few
+    edge cases under every donor symbol.
+    """
+    slots = set()
+    for path in ("GA.csv", "opt_D.csv"):
+        db = pd.read_csv(path)
+        for i in range(1, 7):
+            pairs = db[[f"L{i}", f"DA{i}"]].dropna().astype(str)
+            slots.update(zip(pairs[f"L{i}"], pairs[f"DA{i}"]))
+    slots.update((smi, da) for smi in EXTRA_SMILES for da in DONORS)
+    return sorted((smi, da) for smi, da in slots if smi != "X")
+
+
+def assert_same_graph(got, expected):
+    x, edge_index = got
+    x_ref, edge_index_ref = expected
+    assert x.dtype == x_ref.dtype and edge_index.dtype == edge_index_ref.dtype
+    # donor flags are columns 8 / 9; checked on their own for a clearer failure
+    assert torch.equal(x[:, 8:10], x_ref[:, 8:10])
+    assert torch.equal(x, x_ref)
+    assert torch.equal(edge_index, edge_index_ref)
+
+
+def test_ligand_dataset_matches_baseline():
+    slots = ligand_slots()
+    items = [(smi, ligand_dataset.donor_key(da)) for smi, da in slots]
+
+    graphs = ligand_dataset.build_mol_graphs(items)
+    for (smi, da), got in zip(slots, graphs):
+        assert_same_graph(got, reference_mol_graph(smi, da))
+
+
+def test_graph_features_matches_baseline():
+    slots = ligand_slots()
+    items = [(smi, str(da).upper()) for smi, da in slots]
+
+    graphs = graph_features._smiles_to_graphs(items)
+    for (smi, da), got in zip(slots, graphs):
+        expected = reference_smiles_to_graph(smi, da)
+        if expected is None:
+            assert got is None
+        else:
+            assert_same_graph(got, expected)
+
+
+def test_rdkit_errors_give_the_fallback_node(monkeypatch):
+    parse = featurizer.Chem.MolFromSmiles
+
+    def flaky(smiles, *args, **kwargs):
+        if smiles == "CCO":
+            raise RuntimeError("RDKit failure")
+        return parse(smiles, *args, **kwargs)
+
+    monkeypatch.setattr(featurizer.Chem, "MolFromSmiles", flaky)
+
+    graphs = ligand_dataset.build_mol_graphs([("CCO", "O"), ("CCN", "N")])
+    x, edge_index = graphs[0]
+    expected = ligand_dataset.build_fallback_ligand_node_feature("CCO", "O").unsqueeze(0)
+    assert torch.equal(x, expected)
+    assert edge_index.shape == (2, 0)
+
+    assert x[0, 6] == 1.0  # bias, unlike the zero node of unparsable SMILES
+    assert graphs[1][0].shape == (3, featurizer.N_FEATURES)
+
+
+def test_worker_pool_matches_in_process():
+    smiles = [smi for smi, _ in ligand_slots()][:featurizer.POOL_MIN_BATCH + 50]
+    donors = ["N"] * len(smiles)
+
+    local = featurizer.featurize_batch(smiles, donors, ligand_dataset.PAULING_EN, workers=0)
+    pooled = featurizer.featurize_batch(smiles, donors, ligand_dataset.PAULING_EN,
+                                        workers=2)
+
+    assert np.array_equal(local.x, pooled.x)
+    assert np.array_equal(local.edge_index, pooled.edge_index)
+    assert np.array_equal(local.node_ptr, pooled.node_ptr)
+    assert np.array_equal(local.valid, pooled.valid)
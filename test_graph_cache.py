@@ -0,0 +1,70 @@
+# ==========================================================
+# test_graph_cache.py
+# SQLite graph cache: round trip, LRU eviction past
+# max_entries and the hit / miss / eviction counters
+# ==========================================================
+
+import itertools
+
+import torch
+
+import graph_cache
+from graph_cache import LigandGraphCache
+
+FEATURIZER = "test"
+
+
+def graph(i):
+    return torch.full((i + 1, 3), float(i)), torch.zeros(2, i, dtype=torch.long)
+
+
+def stored(cache, i):
+    key = cache.key(FEATURIZER, f"C{i}", "N")
+    return cache._db.execute("SELECT 1 FROM graphs WHERE key = ?", (key,)).fetchone() is not None
+
+
+def test_round_trip(tmp_path):
+    cache = LigandGraphCache(str(tmp_path / "graphs.sqlite"), memory_entries=1)
+    built = []
+    build = lambda items: built.extend(items) or [graph(1), None]
+
+    items = [("CCN", "N"), ("not_a_smiles", "N"), ("CCN", "N")]
+    first = cache.get_many(FEATURIZER, items, build)
+    assert built == items[:2] and first[1] is None
+    assert torch.equal(first[0][0], first[2][0])
+
+    # another process: read back from disk, nothing built
+    other = LigandGraphCache(cache.path)
+    again = other.get_many(FEATURIZER, items, build)
+    assert len(built) == 2 and again[1] is None
+    for got, want in zip(again[0], graph(1)):
+        assert torch.equal(got, want)
+    assert (other.hits, other.disk_hits, other.misses) == (3, 2, 0)
+
+
+def test_least_recently_used_evicted(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(graph_cache.time, "time", lambda: float(next(clock)))
+
+    cache = LigandGraphCache(str(tmp_path / "graphs.sqlite"), max_entries=10, memory_entries=2)
+    get = lambda i: cache.get(FEATURIZER, f"C{i}", "N", lambda: graph(i))
+
+    for i in range(10):
+        get(i)
+    assert all(stored(cache, i) for i in range(10)) and cache.evictions == 0
+
+    # 0..3 used again: 4 and 5 are now the least recently used
+    for i in range(4):
+        get(i)
+
+    # one past max_entries: dropped down to 90%
+    get(10)
+    assert [i for i in range(11) if not stored(cache, i)] == [4, 5]
+    assert cache.stats() == {
+        "hits": 4, "disk_hits": 4, "misses": 11, "evictions": 2, "hit_rate": 4 / 15,
+    }
+
+    # an evicted graph is built again
+    x, _ = get(4)
+    assert torch.equal(x, graph(4)[0])
+    assert (cache.misses, stored(cache, 4)) == (12, True)
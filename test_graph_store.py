@@ -0,0 +1,131 @@
+# ==========================================================
+# test_graph_store.py
+# Graph store: append-only segments, shared between processes,
+# batches identical to the per-ligand graphs
+# ==========================================================
+
+import os
+
+import numpy as np
+import torch
+
+from engine import graph_store
+from engine.graph_store import LigandGraphStore
+from ligand_dataset import build_ligand_graphs
+
+FIRST = [("CCN", "N"), ("OCCO", "O"), ("c1ccncc1", "N"), ("X", "X")]
+SECOND = [("CCO", "O"), ("CC(=O)O", "O"), ("not_a_smiles", "N")]
+
+
+def expected_batch(keys, ids):
+    """
+    Disjoint union of the ligand graphs of each row of ids.
+    """
+    graphs = build_ligand_graphs([keys[i] for i in np.ravel(ids)])
+    xs, edges, batch, offset = [], [], [], 0
+    for j, (x, ei) in enumerate(graphs):
+        xs.append(x)
+        edges.append(ei + offset)
+        batch.append(torch.full((x.size(0),), j // np.shape(ids)[1], dtype=torch.long))
+        offset += x.size(0)
+    return torch.cat(xs), torch.cat(edges, dim=1), torch.cat(batch)
+
+
+def assert_batches_equal(store, keys):
+    rows = store.rows(keys)
+    ids = np.array([[rows[0], rows[-1]], [rows[1], rows[2]], [rows[-1], rows[0]]])
+    local = [[0, len(keys) - 1], [1, 2], [len(keys) - 1, 0]]
+    for got, want in zip(store.batch(ids), expected_batch(keys, local)):
+        assert torch.equal(got, want)
+
+    n_nodes, n_edges = store.sizes(ids)
+    x, edge_index, _ = expected_batch(keys, local)
+    assert n_nodes.sum() == x.size(0) and n_edges.sum() == edge_index.size(1)
+
+
+def test_append_writes_segments_and_keeps_base_mapped(tmp_path):
+    path = str(tmp_path / "store.npz")
+
+    store = LigandGraphStore(path)
+    store.rows(FIRST)
+    store.save()
+    assert not os.listdir(store.segment_dir)
+    assert isinstance(store._base_x, np.memmap)
+    base_mtime = os.stat(path).st_mtime_ns
+
+    store.rows(SECOND)
+    assert os.stat(path).st_mtime_ns == base_mtime
+    assert len(os.listdir(store.segment_dir)) == 1
+    assert isinstance(store._base_x, np.memmap)
+    assert_batches_equal(store, FIRST + SECOND)
+
+    # base + segment read back, then merged into the base
+    reopened = LigandGraphStore(path)
+    assert len(reopened) == len(FIRST + SECOND)
+    assert_batches_equal(reopened, FIRST + SECOND)
+    reopened.save()
+    assert not os.listdir(reopened.segment_dir)
+    assert len(reopened) == len(FIRST + SECOND)
+    assert_batches_equal(reopened, FIRST + SECOND)
+
+
+def test_stores_share_segments(tmp_path):
+    path = str(tmp_path / "store.npz")
+
+    a, b = LigandGraphStore(path), LigandGraphStore(path)
+    a.rows(FIRST)
+    b.rows(SECOND + FIRST[:1])
+    assert len(os.listdir(a.segment_dir)) == 2
+
+    # b picked up a's segment on its miss instead of featurizing FIRST[0]
+    assert len(b) == len(FIRST + SECOND)
+
+    c = LigandGraphStore(path)
+    assert len(c) == len(FIRST + SECOND)
+    assert_batches_equal(c, FIRST + SECOND)
+
+    # stores keep working after another one merged their segments
+    c.save()
+    a.rows(SECOND)
+    assert_batches_equal(a, FIRST + SECOND)
+
+
+def test_segments_merged_on_load(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_store, "MAX_SEGMENTS", 2)
+    path = str(tmp_path / "store.npz")
+
+    store = LigandGraphStore(path)
+    for key in FIRST:
+        store.rows([key])
+    assert len(os.listdir(store.segment_dir)) == len(FIRST)
+
+    merged = LigandGraphStore(path)
+    assert os.path.exists(path) and not os.listdir(merged.segment_dir)
+    assert isinstance(merged._base_x, np.memmap)
+    assert_batches_equal(merged, FIRST)
+
+
+def test_memory_only_store(tmp_path):
+    store = LigandGraphStore("0")
+    store.rows(FIRST + SECOND)
+    store.save()
+    assert_batches_equal(store, FIRST + SECOND)
+    assert store.node_sums(store.rows(SECOND)).shape == (len(SECOND), graph_store.N_FEATURES)
+
+
+def test_store_misses_bypass_the_graph_cache(tmp_path, monkeypatch):
+    import graph_cache
+
+    cache = graph_cache.LigandGraphCache(str(tmp_path / "graphs.sqlite"))
+    monkeypatch.setattr(graph_cache, "_CACHE", cache)
+
+    store = LigandGraphStore(str(tmp_path / "store.npz"))
+    store.rows(FIRST + FIRST[:2])
+    store.rows(SECOND)
+    assert (store.hits, store.misses) == (2, len(FIRST) + len(SECOND))
+
+    # the store is the oracle's only persistent copy of the graphs
+    cache.flush()
+    st = cache.stats()
+    assert (st["hits"], st["misses"]) == (0, 0)
+    assert cache._db.execute("SELECT COUNT(*) FROM graphs").fetchone()[0] == 0
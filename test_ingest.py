@@ -0,0 +1,122 @@
+# ==========================================================
+# test_ingest.py
+# Vectorised ingestion == the baseline row-wise loops
+# (donor map, seed ligands, mutation parents) on a small
+# CSV fixture and on the shipped opt_D.csv
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+
+from engine.ingest import ligand_occurrences
+from engine.mutation import K_ANCHORS, select_parents
+from engine.seeding import build_ligand_donor_map, extract_seed_ligands, select_seeds
+
+# ----------------------------------------------------------
+# Baseline 01_build_donor_map.py / 02_seed_generation.py /
+# 03_ligand_mutation.py
+# ----------------------------------------------------------
+def baseline_donor_map(df):
+    ligand_modes = {}
+
+    for _, row in df.iterrows():
+        for i in range(1, 7):
+            lig = row.get(f"L{i}")
+            d   = row.get(f"D{i}")
+
+            if not isinstance(lig, str):
+                continue
+            if lig == "X":
+                continue
+            if pd.isna(d):
+                continue
+
+            ligand_modes.setdefault(lig, set()).add(int(d))
+
+    rows = []
+    for lig, modes in ligand_modes.items():
+        for m in modes:
+            rows.append({"smiles": lig, "donors": m})
+
+    return pd.DataFrame(rows)
+
+
+def baseline_seed_ligands(seed_df):
+    ligands = set()
+    for i in range(1, 7):
+        ligands.update(seed_df[f"L{i}"].dropna().astype(str))
+
+    return pd.DataFrame({"smiles": sorted(ligands)})
+
+
+def baseline_parents(anchor_db, mode_map, target_zfs, elite=None, zfs_col="opt_zfs"):
+    dist = (anchor_db[zfs_col] - target_zfs).abs()
+    anchors = anchor_db.assign(dist=dist).sort_values("dist").head(K_ANCHORS)
+
+    parents = set()
+    for _, row in anchors.iterrows():
+        for i in range(1, 7):
+            lig = row.get(f"L{i}")
+            if isinstance(lig, str) and lig in mode_map:
+                parents.add(lig)
+
+    if elite is not None:
+        for combo in elite["ligands"]:
+            for lig in combo.split(";"):
+                if lig in mode_map:
+                    parents.add(lig)
+
+    return sorted(parents)
+
+
+# ----------------------------------------------------------
+# Fixture: placeholders, empty slots, unknown denticities and
+# a ligand whose first occurrence has no denticity
+# ----------------------------------------------------------
+FIXTURE = """\
+File Name,L1,L2,L3,L4,L5,L6,D1,D2,D3,D4,D5,D6,DA1,DA2,DA3,DA4,DA5,DA6,opt_zfs,opt_E/D
+1,CCN,CCN,X,X,X,X,,1,0,0,0,0,N,N,N,N,N,N,-150.5,0.10
+2,c1ccncc1,O,O,Cl,,X,1,1,1,1,,0,N,O,O,Cl,,N,-90.25,0.21
+3,NCCN,NCCN,NCCN,X,X,X,2,2,2,0,0,0,N,N,N,N,N,N,-130.0,0.05
+4,CCN,NCCN,Cl,Cl,O,X,2,1,1,1,1,0,N,N,Cl,Cl,O,N,-121.75,0.30
+5,Br,c1ccncc1,X,X,X,X,1,,0,0,0,0,Br,N,N,N,N,N,12.5,0.01
+"""
+
+
+def fixture(tmp_path):
+    path = tmp_path / "fixture.csv"
+    path.write_text(FIXTURE)
+    return pd.read_csv(path)
+
+
+def test_occurrences_of_fixture(tmp_path):
+    occ = ligand_occurrences(fixture(tmp_path))
+
+    assert len(occ) == 16
+    assert occ["row"].is_monotonic_increasing
+    assert not occ["smiles"].isin(["X"]).any() and occ["smiles"].notna().all()
+    assert int(occ["donors"].isna().sum()) == 2
+    assert list(occ.loc[occ["row"] == 1, "donor_atom"]) == ["N", "O", "O", "Cl"]
+
+
+def test_donor_map_matches_baseline(tmp_path):
+    for df in (fixture(tmp_path), pd.read_csv("opt_D.csv")):
+        pd.testing.assert_frame_equal(build_ligand_donor_map(df), baseline_donor_map(df))
+
+
+def test_seed_ligands_match_baseline(tmp_path):
+    for df in (fixture(tmp_path), pd.read_csv("opt_D.csv")):
+        seeds = select_seeds(df, "opt_zfs")
+        pd.testing.assert_frame_equal(extract_seed_ligands(seeds), baseline_seed_ligands(seeds))
+
+
+def test_parents_match_baseline():
+    db = pd.read_csv("opt_D.csv")
+    mode_map = {lig: set() for lig in baseline_donor_map(db)["smiles"]}
+    elite = pd.DataFrame({"ligands": [";".join(db.loc[i, ["L1", "L2", "L3"]].astype(str))
+                                      for i in range(0, 40, 7)]})
+
+    rng = np.random.default_rng(0)
+    for target in rng.uniform(-300, 50, size=25):
+        for e in (None, elite):
+            assert select_parents(db, mode_map, target, e) == baseline_parents(db, mode_map, target, e)
@@ -0,0 +1,57 @@
+# ==========================================================
+# test_lineage.py
+# Append-only lineage store: dedup, ancestry, descendants
+# ==========================================================
+
+import pandas as pd
+
+from engine.lineage import COLUMNS, LineageStore
+
+
+def rows(*edges):
+    return pd.DataFrame(edges, columns=COLUMNS)
+
+
+def test_lineage_dedup_and_ancestry(tmp_path):
+    path = str(tmp_path / "lineage.sqlite")
+    store = LineageStore(path)
+
+    # A -> B -> D, A -> C -> D (diamond), D -> E; F is unrelated
+    assert store.add(rows(
+        ("A", "B", "add_methyl", 1),
+        ("A", "C", "swap_N_O", 1),
+        ("F", "G", "add_methyl", 1),
+    )) == 3
+    assert store.add(rows(
+        ("B", "D", "ring_close", 2),
+        ("C", "D", "add_methyl", 2),
+        ("A", "B", "add_methyl", 1),  # already stored
+    )) == 2
+    assert store.add(rows(("D", "E", "swap_N_O", 3))) == 1
+    assert store.add(None) == 0
+    assert len(store) == 6
+
+    up = store.ancestry("E")
+    assert list(up.columns) == COLUMNS
+    assert list(up.itertuples(index=False, name=None)) == [
+        ("D", "E", "swap_N_O", 3),
+        ("B", "D", "ring_close", 2),
+        ("C", "D", "add_methyl", 2),
+        ("A", "B", "add_methyl", 1),
+        ("A", "C", "swap_N_O", 1),
+    ]
+
+    down = store.descendants("A")
+    assert set(down["child"]) == {"B", "C", "D", "E"}
+    assert down["generation"].is_monotonic_increasing
+    assert len(down) == 5
+
+    assert store.ancestry("A").empty
+    assert store.descendants("E").empty
+    store.close()
+
+    # the file alone holds the history
+    reopened = LineageStore(path)
+    assert len(reopened) == 6
+    pd.testing.assert_frame_equal(reopened.ancestry("E"), up)
+    reopened.close()
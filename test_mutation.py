@@ -0,0 +1,178 @@
+# ==========================================================
+# test_mutation.py
+# Parsed-parent cache, per-parent RNG streams and the worker
+# pool: the same children whatever the process layout
+# Site edits == the baseline reaction / atom-swap products
+# ==========================================================
+
+import random
+
+import pandas as pd
+from rdkit import Chem
+from rdkit.Chem import rdChemReactions
+
+from engine import mutation
+from engine.mutation import (
+    ALKYL_GROUPS, ATOM_MUTATIONS, HALOGENS, MolCache, _sample_children, aromatic_alkylation,
+    atom_type_mutation, halogen_exchange, is_near_donor, mutate, mutate_parent,
+    mutation_sites, safe_smiles,
+)
+from engine.novelty import NoveltyIndex
+
+# ----------------------------------------------------------
+# Baseline 03_ligand_mutation.py: every product each operator
+# could return
+# ----------------------------------------------------------
+REACTIONS = {
+    "methyl_addition": rdChemReactions.ReactionFromSmarts("[cH:1]>>[c:1]C"),
+    "ethyl_addition": rdChemReactions.ReactionFromSmarts("[cH:1]>>[c:1]CC"),
+    "isopropyl_addition": rdChemReactions.ReactionFromSmarts("[cH:1]>>[c:1]C(C)C"),
+}
+
+
+def reaction_products(parent, rxn):
+    mol = Chem.MolFromSmiles(parent)
+    products = {safe_smiles(prod_set[0]) for prod_set in rxn.RunReactants((mol,))}
+    return products - {None}
+
+
+def swap_products(parent, symbols, choices):
+    mol = Chem.MolFromSmiles(parent)
+    out = set()
+    for a in mol.GetAtoms():
+        if a.GetSymbol() in symbols and not is_near_donor(a):
+            for new in choices(a.GetSymbol()):
+                rw = Chem.RWMol(mol)
+                rw.GetAtomWithIdx(a.GetIdx()).SetAtomicNum(Chem.Atom(new).GetAtomicNum())
+                out.add(safe_smiles(rw))
+    return out - {None}
+
+
+def sample_parents(n=12):
+    db = pd.read_csv("opt_D.csv")
+    ligands = sorted({
+        lig for i in range(1, 7) for lig in db[f"L{i}"].dropna().astype(str)
+        if lig != "X"
+    })
+    # aromatic C-H, ring N / ether O and a halogen: every operator has sites
+    return ligands[:n] + ["Clc1ccc(OCC)cc1", "Brc1ccncc1", "not_a_smiles"]
+
+
+def test_alkylation_matches_reaction_products():
+    for parent in sample_parents()[:-1]:
+        for name in ALKYL_GROUPS:
+            # k above the site count: every site is tried once
+            got = aromatic_alkylation(parent, name, random.Random(0), k=100)
+            assert len(got) == len(set(got))
+            assert set(got) == reaction_products(parent, REACTIONS[name]), (parent, name)
+
+
+def test_atom_swaps_match_baseline_products():
+    for parent in sample_parents()[:-1]:
+        atom_types = swap_products(parent, ATOM_MUTATIONS, ATOM_MUTATIONS.get)
+        halogens = swap_products(parent, HALOGENS,
+                                 lambda sym: [h for h in HALOGENS if h != sym])
+
+        # one random replacement per site and call; over many draws, all of them
+        seen_types, seen_halogens = set(), set()
+        for seed in range(40):
+            got = atom_type_mutation(parent, random.Random(seed), k=100)
+            assert set(got) <= atom_types
+            seen_types.update(got)
+
+            got = halogen_exchange(parent, random.Random(seed), k=100)
+            assert set(got) <= halogens
+            seen_halogens.update(got)
+
+        assert seen_types == atom_types, parent
+        assert seen_halogens == halogens, parent
+
+
+def test_sample_children_returns_k_distinct():
+    sites = list(range(10))
+
+    def edit(mol, site):
+        # four distinct products, one site that does not sanitize
+        return None if site == 9 else f"C{site % 4}"
+
+    for k in (1, 3, 4, 10):
+        got = _sample_children(None, sites, edit, random.Random(k), k)
+        assert len(got) == min(k, 4) and len(set(got)) == len(got)
+
+    # known children are skipped and the next site is tried
+    got = _sample_children(None, sites, edit, random.Random(0), 2,
+                           is_new=lambda smi: smi != "C0")
+    assert len(got) == 2 and "C0" not in got
+
+    assert _sample_children(None, [], edit, random.Random(0), 3) == []
+
+
+def test_mol_cache_round_trip():
+    cache = MolCache()
+    for smi in ["Clc1ccc(OCC)cc1", "c1ccncc1", "not_a_smiles"]:
+        binary, sites = cache.entry(smi)
+        cache.entry(smi)
+
+        mol = Chem.MolFromSmiles(smi)
+        if mol is None:
+            assert (binary, sites) == (None, None)
+            assert cache.get(smi) is None
+            continue
+
+        # the binary is the sanitized parent, sites as found on it
+        assert Chem.MolToSmiles(Chem.Mol(binary)) == Chem.MolToSmiles(mol)
+        assert Chem.MolToSmiles(cache.get(smi)) == Chem.MolToSmiles(mol)
+        assert sites == mutation_sites(mol)
+
+    assert len(cache) == 3
+    # one parse per SMILES; the second entry() and every get() are hits
+    assert (cache.hits, cache.misses) == (6, 3)
+
+    # the parent is copied: editing one Mol leaves the cache intact
+    mol = cache.get("c1ccncc1")
+    Chem.RWMol(mol).GetAtomWithIdx(0).SetAtomicNum(7)
+    assert Chem.MolToSmiles(cache.get("c1ccncc1")) == "c1ccncc1"
+
+
+def test_children_do_not_depend_on_parent_order():
+    parents = sample_parents()
+    cache = MolCache()
+
+    children = {p: mutate_parent(*cache.entry(p), p, gen=3, seed=7, k=2) for p in parents}
+    for p in reversed(parents):
+        assert mutate_parent(*cache.entry(p), p, gen=3, seed=7, k=2) == children[p]
+
+    assert children["not_a_smiles"] == ([], 0)
+    assert all(children[p][0] for p in ["Clc1ccc(OCC)cc1", "Brc1ccncc1"])
+
+    # another generation draws other sites
+    other = {p: mutate_parent(*cache.entry(p), p, gen=4, seed=7, k=2) for p in parents}
+    assert other != children
+
+
+def test_workers_give_the_same_children(tmp_path):
+    parents = sample_parents()
+    modes = {p: {1} for p in parents}
+
+    runs = []
+    for workers in (1, 2):
+        novelty = NoveltyIndex(str(tmp_path / f"novelty_{workers}.u64"))
+        mode_map = {p: set(d) for p, d in modes.items()}
+        try:
+            mutated, lineage = mutate(parents, mode_map, gen=1, seed=42, workers=workers, k=2,
+                                      novelty=novelty)
+        finally:
+            if mutation._POOL is not None:
+                mutation._POOL.shutdown()
+                mutation._POOL = None
+        runs.append((mutated, lineage, mode_map, sorted(novelty._hashes)))
+
+    (m1, l1, modes1, h1), (m2, l2, modes2, h2) = runs
+    assert len(l1) > len(parents)
+    pd.testing.assert_frame_equal(l1, l2)
+    pd.testing.assert_frame_equal(
+        m1.sort_values(["smiles", "donors"]).reset_index(drop=True),
+        m2.sort_values(["smiles", "donors"]).reset_index(drop=True),
+    )
+    assert modes1 == modes2
+    assert h1 == h2
@@ -0,0 +1,71 @@
+# ==========================================================
+# test_novelty.py
+# Append-only novelty index: persistence, sharing between
+# processes, and skipping known children in mutate()
+# ==========================================================
+
+import os
+
+import numpy as np
+
+from engine import novelty
+from engine.mutation import mutate
+from engine.novelty import NoveltyIndex
+
+
+def test_index_persists_and_reloads(tmp_path):
+    path = str(tmp_path / "novelty.u64")
+
+    index = NoveltyIndex(path)
+    assert len(index) == 0 and "CCO" not in index
+    assert index.add_many(["CCO", "CCN", "CCO"]) == 2
+    assert index.add_many(["CCN", "c1ccncc1"]) == 1
+    assert "CCO" in index and "c1ccncc1" in index and "CCC" not in index
+    assert os.path.getsize(path) == 3 * 8
+
+    reopened = NoveltyIndex(path)
+    assert len(reopened) == 3
+    assert all(s in reopened for s in ["CCO", "CCN", "c1ccncc1"])
+
+
+def test_refresh_reads_other_writers(tmp_path):
+    path = str(tmp_path / "novelty.u64")
+    a, b = NoveltyIndex(path), NoveltyIndex(path)
+
+    a.add_many(["CCO"])
+    assert "CCO" not in b
+    b.refresh()
+    assert "CCO" in b
+
+    # a torn write (partial hash) is left for the next refresh
+    with open(path, "ab") as f:
+        f.write(np.asarray([novelty.smiles_hash("CCN")], dtype="<u8").tobytes()[:5])
+    b.refresh()
+    assert len(b) == 1
+    with open(path, "ab") as f:
+        f.write(np.asarray([novelty.smiles_hash("CCN")], dtype="<u8").tobytes()[5:])
+    b.refresh()
+    assert "CCN" in b and len(b) == 2
+
+
+def test_default_path_follows_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setattr(novelty, "NOVELTY_PATH", str(tmp_path / "default.u64"))
+    NoveltyIndex().add_many(["CCO"])
+    assert os.path.exists(tmp_path / "default.u64")
+
+
+def children(lineage):
+    return set(lineage["child"]) if len(lineage) else set()
+
+
+def test_mutate_skips_known_children(tmp_path):
+    parents = ["Clc1ccc(OCC)cc1", "Brc1ccncc1"]
+    index = NoveltyIndex(str(tmp_path / "novelty.u64"))
+
+    _, first = mutate(parents, {p: {1} for p in parents}, gen=1, seed=0, workers=1, novelty=index)
+    assert children(first) and all(s in index for s in children(first))
+
+    # same generation and seed: the children drawn before are skipped
+    _, again = mutate(parents, {p: {1} for p in parents}, gen=1, seed=0, workers=1, novelty=index)
+    assert not children(again) & children(first)
+    assert len(index) == len(children(first) | children(again))
@@ -0,0 +1,140 @@
+# ==========================================================
+# test_oracle.py
+# Elite selection (streamed == in memory)
+# Sharded oracle == in-process oracle on ComplexArrays
+# Node-budget calibration
+# Pre-screen: prediction store hits skip the cascade
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+
+from engine.oracle import (
+    CALIBRATION_BUDGETS, Oracle, ShardedOracle, select_elite, select_elite_stream,
+)
+from engine.prescreen import ESTIMATED, PreScreen
+from engine.registry import N_SLOTS, ComplexArrays, LigandRegistry
+
+
+def scored_frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "complex": np.arange(n),
+        "zfs_pred": rng.normal(-100, 60, n),
+        "ed_pred": rng.uniform(0, 0.33, n),
+    })
+
+
+def sample_arrays(n=300, n_ligands=80, seed=0):
+    db = pd.read_csv("opt_D.csv")
+    ligands = sorted({
+        lig for i in range(1, 7) for lig in db[f"L{i}"].dropna().astype(str)
+        if lig != "X"
+    })[:n_ligands]
+    registry = LigandRegistry(ligands, [[1]] * len(ligands))
+
+    rng = np.random.default_rng(seed)
+    ids = np.full((n, N_SLOTS), -1, dtype=np.int32)
+    donors = np.zeros((n, N_SLOTS), dtype=np.uint8)
+    for r in range(n):
+        k = rng.integers(1, N_SLOTS + 1)
+        ids[r, :k] = rng.choice(len(ligands), k, replace=False)
+        donors[r, :k] = 1
+    return registry, ComplexArrays(ids, donors)
+
+
+def test_select_elite_stream_matches_select_elite():
+    df = scored_frame()
+    expected = select_elite(df, -180.0).reset_index(drop=True)
+
+    for size in (13, 333, 1000, len(df)):
+        chunks = (df.iloc[a:a + size] for a in range(0, len(df), size))
+        got = select_elite_stream(chunks, -180.0, len(df)).reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected)
+
+
+def test_select_elite_stream_top_k():
+    df = scored_frame()
+    chunks = (df.iloc[a:a + 700] for a in range(0, len(df), 700))
+    got = select_elite_stream(chunks, -180.0, len(df), top_k=25)
+
+    expected = select_elite(df, -180.0).head(25)
+    assert got["complex"].tolist() == expected["complex"].tolist()
+
+
+def test_select_elite_stream_without_chunks():
+    got = select_elite_stream(iter([]), -180.0, 0)
+    assert got.empty
+    assert list(got.columns) == ["zfs_pred", "ed_pred", "abs_err"]
+
+    columns = ["complex", "zfs_pred", "ed_pred"]
+    got = select_elite_stream(iter([]), -180.0, 1000, columns=columns)
+    assert list(got.columns) == columns + ["abs_err"]
+
+
+def test_sharded_oracle_screen_arrays():
+    registry, complexes = sample_arrays()
+    expected = Oracle("crystal", store=False).screen_arrays(complexes, registry, verbose=False)
+
+    sharded = ShardedOracle("crystal", workers=2, store=True)
+    try:
+        got = sharded.screen_arrays(complexes, registry, verbose=False)
+        # second screen is served by the (temporary) prediction store
+        again = sharded.screen_arrays(complexes, registry, verbose=False)
+    finally:
+        sharded.pool.shutdown()
+
+    assert list(got.columns) == list(expected.columns)
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-5, atol=1e-5)
+    np.testing.assert_array_equal(again.to_numpy(), got.to_numpy())
+
+
+def test_calibrated_budget_gives_the_same_predictions():
+    registry, complexes = sample_arrays()
+    expected = Oracle("crystal", store=False, node_budget=0).predict_arrays(complexes, registry)
+
+    # cached embeddings: the calibrated budget also packs embedding batches
+    oracle = Oracle("crystal", store=False, node_budget="auto")
+    got = oracle.predict_arrays(complexes, registry)
+    assert oracle.node_budget in (0,) + CALIBRATION_BUDGETS
+    assert oracle.embedding_cache.node_budget == oracle.node_budget
+    np.testing.assert_allclose(got, expected, rtol=1e-4, atol=1e-4)
+
+    # there it times the ligand embedding batches, without caching them
+    n_cached = len(oracle.embedding_cache)
+    best = oracle.calibrate(complexes.take(np.arange(200, 300)).smiles_lists(registry),
+                            budgets=(64, 1024), sample=128)
+    assert best in (0, 64, 1024) and oracle.embedding_cache.node_budget == best
+    assert len(oracle.embedding_cache) == n_cached
+
+    # full graphs: every budget, and the one calibrate() keeps
+    oracle = Oracle("crystal", store=False, embedding_cache=False, node_budget=0)
+    ligand_lists = complexes.smiles_lists(registry)
+    store_rows = oracle._store_rows(ligand_lists)
+    for budget in (0, 64, 1024):
+        np.testing.assert_allclose(oracle._predict_graphs(store_rows, budget), expected,
+                                   rtol=1e-4, atol=1e-4)
+
+    best = oracle.calibrate(ligand_lists, budgets=(64, 1024), sample=128)
+    assert best in (0, 64, 1024)
+    assert oracle.node_budget == best
+    np.testing.assert_allclose(oracle.predict(ligand_lists), expected, rtol=1e-4, atol=1e-4)
+
+
+def test_prescreen_returns_stored_predictions():
+    registry, complexes = sample_arrays(n=600, seed=3)
+    oracle = Oracle("crystal", store=True)
+    known = np.arange(0, 600, 3)
+    stored = oracle.screen_arrays(complexes.take(known), registry, verbose=False)
+
+    oracle.prescreen = PreScreen(frac=0.10, sample=0.05, min_sample=50)
+    got = oracle.screen_arrays(complexes, registry, verbose=False, target_zfs=-100.0)
+
+    assert list(got.columns) == oracle.columns + [ESTIMATED]
+    assert not got[ESTIMATED].iloc[known].any()
+    np.testing.assert_array_equal(got[oracle.columns].to_numpy()[known], stored.to_numpy())
+
+    # the others: GNN-scored or flagged, never an estimate in the columns
+    assert got[ESTIMATED].any()
+    assert got.loc[got[ESTIMATED], oracle.columns].isna().all().all()
+    assert got.loc[~got[ESTIMATED], oracle.columns].notna().all().all()
@@ -0,0 +1,135 @@
+# ==========================================================
+# test_oracle_server.py
+# Oracle server over HTTP with a stub oracle: chunks come back
+# in request order under concurrent requests, errors reach the
+# client as RuntimeError
+# ==========================================================
+
+import queue
+import threading
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from engine.oracle_server import Coalescer, OracleClient, OracleService, make_handler
+
+CHUNK = 7
+
+
+class StubOracle:
+    """
+    Predictions derived from the ligands: [first ligand, count].
+    """
+    columns = ["zfs_pred", "ed_pred"]
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, ligand_lists):
+        if any("boom" in l for l in ligand_lists):
+            raise ValueError("bad ligand")
+        self.batches.append(len(ligand_lists))
+        return np.array([[float(l[0]), len(l)] for l in ligand_lists])
+
+
+def expected(ligand_lists):
+    return np.array([[float(l[0]), len(l)] for l in ligand_lists])
+
+
+@pytest.fixture
+def server(monkeypatch):
+    oracle = StubOracle()
+    service = OracleService(max_batch=64, max_wait_ms=5)
+    service._coalescers[("optimized", False)] = Coalescer(oracle, 64, 5)
+    # several chunks per request
+    stream = service.stream
+    monkeypatch.setattr(service, "stream", lambda *a: stream(*a, chunk=CHUNK))
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        yield OracleClient(f"http://127.0.0.1:{httpd.server_address[1]}", timeout=30), oracle
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_concurrent_requests_reassembled_in_order(server):
+    client, oracle = server
+    requests = [
+        [[str(100 * r + i)] * (1 + i % 3) for i in range(n)]
+        for r, n in enumerate([1, 6, 7, 50, 23, 64, 3, 41])
+    ]
+
+    results, errors = [None] * len(requests), []
+
+    def run(r):
+        try:
+            results[r] = client.predict(requests[r], "optimized")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(r,)) for r in range(len(requests))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    for ligand_lists, (columns, preds) in zip(requests, results):
+        assert columns == StubOracle.columns
+        np.testing.assert_array_equal(preds, expected(ligand_lists))
+
+    # chunks of concurrent requests were coalesced
+    assert sum(oracle.batches) == sum(map(len, requests))
+    assert client.metrics()["requests"] == len(requests)
+
+    offsets = [off for _, off, _ in client.iter_predict(requests[3], "optimized")]
+    assert offsets == list(range(0, 50, CHUNK))
+
+
+def test_errors_reach_the_client(server):
+    client, _ = server
+
+    # failing prediction: error line after the header
+    with pytest.raises(RuntimeError, match="Oracle server: .*ValueError: bad ligand"):
+        client.predict([["1"]] * 10 + [["boom"]], "optimized")
+
+    # rejected request: HTTP 400 with a JSON error body
+    with pytest.raises(RuntimeError, match="Oracle server: ValueError: Unknown MODE: nope"):
+        client.predict([["1"]], "nope")
+
+    # the server keeps serving
+    _, preds = client.predict([["5"], ["6", "7"]], "optimized")
+    np.testing.assert_array_equal(preds, [[5.0, 1], [6.0, 2]])
+
+
+def test_stream_emits_chunks_in_order():
+    """
+    Chunks finishing in reverse order are still yielded by offset.
+    """
+    class ReverseCoalescer:
+        oracle = StubOracle()
+
+        def __init__(self, n_chunks):
+            self.n_chunks = n_chunks
+            self.submitted = []
+
+        def submit(self, ligand_lists, offset, done):
+            self.submitted.append((offset, expected(ligand_lists)))
+            if len(self.submitted) == self.n_chunks:
+                for off, preds in reversed(self.submitted):
+                    done.put((off, preds, None))
+
+    ligand_lists = [[str(i)] for i in range(25)]
+    service = OracleService()
+    service._coalescers[("optimized", False)] = ReverseCoalescer(n_chunks=4)
+
+    msgs = list(service.stream(ligand_lists, "optimized", chunk=CHUNK))
+    assert msgs[0] == {"columns": StubOracle.columns, "n": 25}
+    assert [m["offset"] for m in msgs[1:]] == [0, 7, 14, 21]
+    np.testing.assert_array_equal(
+        np.concatenate([m["predictions"] for m in msgs[1:]]), expected(ligand_lists)
+    )
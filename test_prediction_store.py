@@ -0,0 +1,98 @@
+# ==========================================================
+# test_prediction_store.py
+# Dedup, hit / miss accounting and reuse across screens
+# ==========================================================
+
+import numpy as np
+
+from engine.prediction_store import (
+    PredictionStore, array_keys, complex_key, complex_keys, lookup, screen_with_store,
+)
+from engine.registry import ComplexArrays, LigandRegistry
+
+
+class CountingPredictor:
+    """
+    Stub oracle: one value per key (and its negative) for each row,
+    recording how many rows it was asked to score.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.calls = []
+
+    def __call__(self, rows):
+        self.calls.append(len(rows))
+        values = np.array([hash(self.keys[r]) % 1000 for r in rows], dtype=np.float64)
+        return np.column_stack([values, -values])
+
+
+def test_complex_key_is_order_free():
+    assert complex_key(["A", "B"], [2, 4]) == complex_key(["B", "A"], [4, 2])
+    assert complex_key(["A", "B"], [2, 4]) != complex_key(["A", "B"], [4, 2])
+    # SMILES are taken as spelled
+    assert complex_key(["OS(C)C"], [6]) != complex_key(["C[SH](C)O"], [6])
+
+
+def test_array_keys_match_frame_keys():
+    registry = LigandRegistry(["A", "B", "C"], [[1], [2], [3]])
+    complexes = ComplexArrays([[0, 1, 2, -1, -1, -1], [2, 1, 0, -1, -1, -1]],
+                              [[1, 2, 3, 0, 0, 0], [3, 2, 1, 0, 0, 0]])
+
+    keys = array_keys(complexes, registry)
+    assert keys == complex_keys(complexes.to_frame(registry))
+    assert keys[0] == keys[1]
+
+
+def test_store_dedups_and_reuses_rows(tmp_path):
+    path = str(tmp_path / "predictions.sqlite")
+    keys = ["a", "b", "a", "c", "b", "a"]
+
+    store = PredictionStore("model", path)
+    predict = CountingPredictor(keys)
+    preds, st = screen_with_store(store, keys, predict, 2)
+
+    assert st == {"rows": 6, "unique": 3, "store_hits": 0, "scored": 3}
+    assert predict.calls == [3]
+    assert len(store) == 3
+
+    # duplicates get the prediction of their first row
+    for i, k in enumerate(keys):
+        np.testing.assert_array_equal(preds[i], predict([keys.index(k)])[0])
+
+    # a second screen, in a new connection, only scores the new key
+    store = PredictionStore("model", path)
+    more = ["c", "d", "a"]
+    predict_more = CountingPredictor(more)
+    preds_more, st = screen_with_store(store, more, predict_more, 2)
+
+    assert st == {"rows": 3, "unique": 3, "store_hits": 2, "scored": 1}
+    assert predict_more.calls == [1]
+    np.testing.assert_array_equal(preds_more[0], preds[3])
+    np.testing.assert_array_equal(preds_more[2], preds[0])
+
+    # other checkpoints do not see these rows
+    other = PredictionStore("other-model", path)
+    assert len(other) == 0
+    assert other.get_many(["a"]) == {}
+
+
+def test_store_round_trips_float64_rows(tmp_path):
+    store = PredictionStore("model", str(tmp_path / "predictions.sqlite"))
+    rows = np.array([[1.0 / 3, -2.5e-7, 12345.678], [np.pi, 0.0, -1.0]])
+    store.put_many(["x", "y"], rows)
+
+    found = store.get_many(["x", "y", "z"])
+    assert sorted(found) == ["x", "y"]
+    np.testing.assert_array_equal(found["x"], rows[0])
+    np.testing.assert_array_equal(found["y"], rows[1])
+
+
+def test_lookup_marks_stored_rows(tmp_path):
+    store = PredictionStore("model", str(tmp_path / "predictions.sqlite"))
+    store.put_many(["a", "c"], [[1.0, 2.0], [3.0, 4.0]])
+
+    preds, found = lookup(store, ["c", "b", "a", "c"], 2)
+    assert found.tolist() == [True, False, True, True]
+    np.testing.assert_array_equal(preds[[0, 2, 3]], [[3.0, 4.0], [1.0, 2.0], [3.0, 4.0]])
+    assert np.isnan(preds[1]).all()
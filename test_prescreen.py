@@ -0,0 +1,100 @@
+# ==========================================================
+# test_prescreen.py
+# Pre-screen cascade with a stub GNN score: estimates never
+# stand in for GNN predictions
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+
+from engine.oracle import select_elite
+from engine.prescreen import ESTIMATED, PreScreen
+
+TARGET = -180.0
+ED_CUTOFF = 0.22
+N_COLUMNS = 4
+
+
+def sample_descriptors(n=4000, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, 5))
+
+
+def stub_score(X, calls, ed_fail=0.0):
+    """
+    Deterministic "GNN": (zfs, ed, two checkpoint columns) from X.
+    About ed_fail of the rows get an E/D far over the cutoff.
+    """
+    over = np.quantile(X[:, 2], 1.0 - ed_fail) if ed_fail else np.inf
+
+    def score(rows):
+        calls.append(np.asarray(rows))
+        x = X[rows]
+        zfs = -150.0 + 60.0 * x[:, 0] + 5.0 * x[:, 1]
+        ed = np.where(x[:, 2] >= over, 0.6, 0.2 + 0.05 * x[:, 2])
+        return np.column_stack([zfs, ed, zfs + 1.0, ed + 0.01])
+    return score
+
+
+def screen(audit=False, n=4000, ed_fail=0.0):
+    X = sample_descriptors(n)
+    calls = []
+    score = stub_score(X, calls, ed_fail)
+    prescreen = PreScreen(frac=0.10, sample=0.05, min_sample=200, audit=audit)
+    preds, estimated, st = prescreen.screen(X, score, N_COLUMNS, TARGET, ED_CUTOFF, 0.10)
+    return X, score, calls, preds, estimated, st
+
+
+def test_unscored_rows_are_nan_and_flagged():
+    X, score, calls, preds, estimated, st = screen()
+
+    scored = np.unique(np.concatenate(calls))
+    assert len(scored) == st["sampled"] + st["passed"] < len(X)
+    assert np.array_equal(np.flatnonzero(~estimated), scored)
+
+    # GNN rows carry exactly the GNN scores, estimated rows nothing
+    np.testing.assert_array_equal(preds[~estimated], score(scored))
+    assert np.isnan(preds[estimated]).all()
+
+    df = pd.DataFrame(preds, columns=["zfs_pred", "ed_pred", "zfs_b", "ed_b"])
+    df[ESTIMATED] = estimated
+    elite = select_elite(df, TARGET, ED_CUTOFF)
+    assert len(elite) and not elite[ESTIMATED].any()
+    assert elite["zfs_pred"].notna().all()
+
+    assert 0.0 <= st["sample_recall"] <= 1.0
+
+
+def test_audit_returns_full_scores():
+    X, score, calls, preds, estimated, st = screen(audit=True)
+
+    np.testing.assert_array_equal(preds, score(np.arange(len(X))))
+    assert not estimated.any()
+    assert 0.0 <= st["audit_recall"] <= 1.0 and st["audit_elite"] > 0
+
+
+def test_small_screens_score_everything():
+    X, score, calls, preds, estimated, st = screen(n=220)
+
+    assert len(calls) == 1 and st["passed"] == 0
+    np.testing.assert_array_equal(preds, score(np.arange(len(X))))
+    assert not estimated.any()
+
+
+def test_rows_over_the_ed_margin_are_not_passed():
+    # 97% of the rows fail E/D: fewer than n_keep estimates are finite
+    X, score, calls, preds, estimated, st = screen(ed_fail=0.97)
+
+    n_keep = int(len(X) * 0.10)
+    assert st["passed"] <= n_keep
+    assert (~estimated).sum() == st["sampled"] + st["passed"] < len(X) // 2
+
+
+def test_at_most_n_keep_rows_pass_on_ties():
+    X = sample_descriptors(4000)
+    X = np.round(X / 2)  # few distinct complexes: many equal estimates
+    calls = []
+    prescreen = PreScreen(frac=0.10, sample=0.05, min_sample=200)
+    preds, estimated, st = prescreen.screen(X, stub_score(X, calls), N_COLUMNS,
+                                            TARGET, ED_CUTOFF, 0.10)
+    assert st["passed"] <= int(len(X) * 0.10)
+    assert (~estimated).sum() == st["sampled"] + st["passed"]
@@ -0,0 +1,79 @@
+# ==========================================================
+# test_registry.py
+# LigandRegistry / ComplexArrays round-trips
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+
+from engine.registry import ComplexArrays, LigandRegistry
+
+
+def sample():
+    registry = LigandRegistry.from_mode_map({"CCN": [1], "OCCO": [2, 1], "c1ccncc1": [1]})
+    complexes = ComplexArrays(
+        [[0, 1, 2, -1, -1, -1], [1, 0, -1, -1, -1, -1], [2, 2, 2, 0, 0, 0]],
+        [[1, 2, 1, 0, 0, 0], [2, 1, 0, 0, 0, 0], [1, 1, 1, 1, 1, 1]],
+    )
+    return registry, complexes
+
+
+def test_registry_ids_and_round_trip(tmp_path):
+    registry, _ = sample()
+    assert registry.add("CCN", [2]) == 0
+    assert registry.add("CCO") == 3
+    assert registry.ids(["CCO", "CCN"]).tolist() == [3, 0]
+    assert registry.modes[0] == {1, 2}
+
+    path = str(tmp_path / "registry.npz")
+    registry.save(path)
+    loaded = LigandRegistry.load(path)
+
+    assert loaded.smiles == registry.smiles
+    assert loaded.modes == registry.modes
+    assert loaded.index == registry.index
+
+
+def test_complex_arrays_frame_round_trip(tmp_path):
+    registry, complexes = sample()
+
+    df = complexes.to_frame(registry, pd.DataFrame({"zfs_pred": [1.0, 2.0, 3.0]}))
+    assert df["ligands"].tolist() == [
+        "CCN;OCCO;c1ccncc1", "OCCO;CCN", "c1ccncc1;c1ccncc1;c1ccncc1;CCN;CCN;CCN",
+    ]
+    assert df["donor_list"].tolist() == ["[1, 2, 1]", "[2, 1]", "[1, 1, 1, 1, 1, 1]"]
+    assert df["donor_sum"].tolist() == [4, 3, 6]
+    assert df["zfs_pred"].tolist() == [1.0, 2.0, 3.0]
+
+    back = ComplexArrays.from_frame(df, LigandRegistry(registry.smiles, registry.modes))
+    np.testing.assert_array_equal(back.ids, complexes.ids)
+    np.testing.assert_array_equal(back.donors, complexes.donors)
+
+    back = ComplexArrays.from_columns(complexes.columns())
+    np.testing.assert_array_equal(back.ids, complexes.ids)
+    np.testing.assert_array_equal(back.donors, complexes.donors)
+
+    path = str(tmp_path / "complexes.npz")
+    complexes.save(path)
+    for mmap in (False, True):
+        loaded = ComplexArrays.load(path, mmap=mmap)
+        np.testing.assert_array_equal(loaded.ids, complexes.ids)
+        np.testing.assert_array_equal(loaded.donors, complexes.donors)
+
+
+def test_canonical_rows_are_order_free():
+    complexes = ComplexArrays(
+        [[0, 1, -1, -1, -1, -1], [1, 0, -1, -1, -1, -1], [0, 1, -1, -1, -1, -1], [0, 2, -1, -1, -1, -1]],
+        [[1, 2, 0, 0, 0, 0], [2, 1, 0, 0, 0, 0], [2, 1, 0, 0, 0, 0], [1, 2, 0, 0, 0, 0]],
+    )
+    first, inverse = complexes.canonical_rows()
+
+    # rows 0 and 1 are the same complex; row 2 swaps the denticities
+    assert len(first) == 3
+    assert inverse[0] == inverse[1]
+    assert len({inverse[0], inverse[2], inverse[3]}) == 3
+    assert np.array_equal(first[inverse][[0, 1]], [0, 0])
+
+    empty = ComplexArrays.concat([])
+    assert len(empty) == 0
+    assert len(ComplexArrays.concat([complexes, complexes.take([0])])) == 5
@@ -0,0 +1,152 @@
+# ==========================================================
+# test_stage_cache.py
+# Stage cache: hits restore the outputs, misses on a new
+# source hash / MODE / threshold, STAGE_CACHE=0 always builds
+# ==========================================================
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from engine import db_snapshot, seeding, stage_cache
+from engine.artifacts import read_table
+from engine.modes import MODE_CONFIG, base_path
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(stage_cache, "CACHE_DIR", str(tmp_path / "stage_cache"))
+    monkeypatch.setattr(stage_cache, "ENABLED", True)
+    return tmp_path / "stage_cache"
+
+
+def counted(path, text):
+    built = []
+
+    def build():
+        built.append(text)
+        with open(path, "w") as f:
+            f.write(text)
+    return build, built
+
+
+def test_hit_restores_outputs(cache, tmp_path):
+    out = str(tmp_path / "out.txt")
+    key = stage_cache.stage_key("demo", 1, source="abc")
+    build, built = counted(out, "first")
+
+    assert stage_cache.run_stage("demo", key, [out], build) is False
+    assert built == ["first"] and os.path.isdir(cache / "demo" / key)
+
+    # removed or edited output: copied back from the entry, not built
+    os.remove(out)
+    assert stage_cache.run_stage("demo", key, [out], build) is True
+    with open(out, "w") as f:
+        f.write("edited")
+    assert stage_cache.run_stage("demo", key, [out], build) is True
+    assert built == ["first"]
+    with open(out) as f:
+        assert f.read() == "first"
+
+    # a corrupt entry is built again
+    os.remove(out)
+    with open(cache / "demo" / key / "out.txt", "w") as f:
+        f.write("corrupt")
+    assert stage_cache.run_stage("demo", key, [out], build) is False
+    assert built == ["first", "first"]
+
+
+def test_key_follows_the_inputs(cache, tmp_path):
+    src = tmp_path / "source.csv"
+    src.write_text("a,b\n1,2\n")
+    out = str(tmp_path / "out.txt")
+    build, built = counted(out, "x")
+
+    def run():
+        key = stage_cache.stage_key("demo", 1, source=stage_cache.file_digest(str(src)))
+        return stage_cache.run_stage("demo", key, [out], build)
+
+    assert [run(), run()] == [False, True]
+    src.write_text("a,b\n1,3\n")
+    assert [run(), run()] == [False, True]
+    assert len(built) == 2
+
+    base = stage_cache.stage_key("demo", 1, mode="optimized", threshold=-120)
+    assert base == stage_cache.stage_key("demo", 1, threshold=-120, mode="optimized")
+    assert len({
+        base,
+        stage_cache.stage_key("demo", 2, mode="optimized", threshold=-120),
+        stage_cache.stage_key("demo", 1, mode="crystal", threshold=-120),
+        stage_cache.stage_key("demo", 1, mode="optimized", threshold=-100),
+        stage_cache.stage_key("other", 1, mode="optimized", threshold=-120),
+    }) == 5
+
+
+def test_disabled_always_builds(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(stage_cache, "ENABLED", False)
+    out = str(tmp_path / "out.txt")
+    key = stage_cache.stage_key("demo", 1)
+    build, built = counted(out, "x")
+
+    assert stage_cache.run_stage("demo", key, [out], build) is False
+    assert stage_cache.run_stage("demo", key, [out], build) is False
+    assert len(built) == 2 and not cache.exists()
+
+
+# ----------------------------------------------------------
+# The seeds stage over copies of the databases
+# ----------------------------------------------------------
+@pytest.fixture
+def databases(cache, tmp_path, monkeypatch):
+    copies = {}
+    for mode, cfg in MODE_CONFIG.items():
+        copies[mode] = str(tmp_path / cfg["database"])
+        shutil.copy(base_path(cfg["database"]), copies[mode])
+
+    config = lambda mode: dict(MODE_CONFIG[mode], database=copies[mode])
+    monkeypatch.setattr(db_snapshot, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(db_snapshot, "mode_config", config)
+    monkeypatch.setattr(seeding, "mode_config", config)
+
+    built = []
+    select_seeds = seeding.select_seeds
+    monkeypatch.setattr(seeding, "select_seeds",
+                        lambda *a: built.append(a[1]) or select_seeds(*a))
+
+    db_snapshot._load_snapshot.cache_clear()
+    yield copies, built
+    db_snapshot._load_snapshot.cache_clear()
+
+
+def test_seeds_stage_invalidation(databases, tmp_path, monkeypatch):
+    copies, built = databases
+    out = str(tmp_path / "seeds.npz")
+
+    assert seeding.seeds_stage("optimized", out) is False
+    n_seeds = len(read_table(out))
+    assert seeding.seeds_stage("optimized", out) is True
+    assert built == ["opt_zfs"]
+
+    # another MODE
+    assert seeding.seeds_stage("crystal", out) is False
+    assert seeding.seeds_stage("crystal", out) is True
+    assert built == ["opt_zfs", "zfs"]
+
+    # another threshold
+    monkeypatch.setattr(seeding, "SEED_ZFS_MAX", -100)
+    assert seeding.seeds_stage("optimized", out) is False
+    assert len(read_table(out)) > n_seeds
+    monkeypatch.setattr(seeding, "SEED_ZFS_MAX", -120)
+    assert seeding.seeds_stage("optimized", out) is True
+    assert len(read_table(out)) == n_seeds
+
+    # another source database
+    df = pd.read_csv(copies["optimized"])
+    df.iloc[[0]].assign(opt_zfs=-500.0).to_csv(copies["optimized"], mode="a",
+                                              header=False, index=False)
+    db_snapshot._load_snapshot.cache_clear()
+    assert seeding.seeds_stage("optimized", out) is False
+    assert len(read_table(out)) == n_seeds + 1
+    assert len(built) == 4
@@ -0,0 +1,95 @@
+# ==========================================================
+# test_target_decision.py
+# Sorted ZFS index == brute-force scan of the database
+# ==========================================================
+
+import numpy as np
+import pandas as pd
+
+from engine.target_decision import ZFSIndex, decide_from_database
+
+
+def sample_database(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    zfs = np.round(rng.normal(-50, 80, n), 1).astype(object)
+    zfs[rng.choice(n, 50, replace=False)] = "n/a"
+    names = [str(i) if rng.random() < 0.7 else f"aug_{i}" for i in range(n)]
+    return pd.DataFrame({"FileName": names, "zfs": zfs})
+
+
+def brute_force(df, numeric_only):
+    zfs = pd.to_numeric(df["zfs"], errors="coerce").to_numpy(dtype=np.float64)
+    ok = ~np.isnan(zfs)
+    if numeric_only:
+        ok &= df["FileName"].str.fullmatch(r"\d+").to_numpy()
+    return np.flatnonzero(ok), zfs
+
+
+def test_window_matches_brute_force():
+    df = sample_database()
+    index = ZFSIndex(df, "zfs")
+    targets = [-400.0, -180.0, -50.0, 0.0, 12.3, 250.0]
+
+    for numeric_only in (False, True):
+        rows, zfs = brute_force(df, numeric_only)
+        for tol in (0.0, 0.05, 1.0, 10.0, 1000.0):
+            batch = index.window_many(targets, tol, numeric_only)
+            for t, (b_rows, b_dist) in zip(targets, batch):
+                got_rows, got_dist = index.window(t, tol, numeric_only)
+
+                dist = np.abs(zfs[rows] - t)
+                keep = dist <= tol
+                assert sorted(got_rows.tolist()) == sorted(rows[keep].tolist())
+                assert np.all(np.diff(got_dist) >= 0)
+                np.testing.assert_array_equal(got_dist, np.abs(zfs[got_rows] - t))
+
+                np.testing.assert_array_equal(b_rows, got_rows)
+                np.testing.assert_array_equal(b_dist, got_dist)
+
+
+def test_nearest_matches_brute_force():
+    df = sample_database()
+    index = ZFSIndex(df, "zfs")
+    targets = np.array([-1000.0, -180.0, -50.05, 0.0, 99.9, 1000.0])
+
+    for numeric_only in (False, True):
+        rows, zfs = brute_force(df, numeric_only)
+        for k in (1, 5, 40):
+            batch_rows, batch_dist = index.nearest_many(targets, k, numeric_only)
+            for i, t in enumerate(targets):
+                got_rows, got_dist = index.nearest(t, k, numeric_only)
+                expected = np.sort(np.abs(zfs[rows] - t))[:k]
+
+                # ties may pick different rows; the distances must agree
+                np.testing.assert_array_equal(got_dist, expected)
+                np.testing.assert_array_equal(got_dist, np.abs(zfs[got_rows] - t))
+                assert set(got_rows.tolist()) <= set(rows.tolist())
+
+                np.testing.assert_array_equal(batch_rows[i], got_rows)
+                np.testing.assert_array_equal(batch_dist[i], got_dist)
+
+
+def test_small_and_empty_indexes():
+    df = pd.DataFrame({"FileName": ["1", "2", "x"], "zfs": [-10.0, 5.0, 7.0]})
+    index = ZFSIndex(df, "zfs")
+
+    rows, dist = index.nearest(0.0, k=5)
+    assert rows.tolist() == [1, 0]
+    assert dist.tolist() == [5.0, 10.0]
+
+    rows, dist = index.nearest_many([0.0], k=4, numeric_only=False)
+    assert rows.tolist() == [[1, 2, 0, -1]]
+    assert np.isinf(dist[0, 3])
+
+    hits = index.hits(6.0, tol=1.0, numeric_only=False)
+    assert hits["FileName"].tolist() == ["2", "x"]
+    assert hits["dist"].tolist() == [1.0, 1.0]
+
+    empty = ZFSIndex(df.iloc[:0], "zfs")
+    assert len(empty) == 0
+    assert empty.hits(0.0).empty
+    assert empty.nearest(0.0, k=3)[0].size == 0
+
+    found, table = decide_from_database(df, "zfs", 4.5, tol=1.0)
+    assert found and table["delta"].tolist() == [0.5]
+    assert decide_from_database(df, "zfs", 100.0) == (False, None)